@@ -0,0 +1 @@
+"""Speed benchmarks for the MCP servers and clients (see benchmarks/README.md)."""
@@ -0,0 +1,126 @@
+"""
+Run the benchmark suite and compare it with the stored baseline.
+
+    uv run python -m benchmarks                      # run and compare
+    uv run python -m benchmarks --filter wikipedia   # only matching benchmarks
+    uv run python -m benchmarks --save-baseline      # accept as the new baseline
+"""
+
+import asyncio
+import importlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+BENCHMARKS_DIR = Path(__file__).parent
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCHMARKS_DIR / "results" / "latest.json"
+SUITE_MODULES = ("math", "pydata", "wikipedia", "advanced", "client", "stdio")
+# Baselines are only comparable on the same kind of machine
+MACHINE_KEYS = ("python", "machine", "cpu", "cpu_count")
+
+console = Console()
+
+
+def load_suites() -> list:
+    # No disk cache or prefetching in the in-process Wikipedia server
+    os.environ["WIKIPEDIA_CACHE_DB"] = ""
+    os.environ["WIKIPEDIA_PREFETCH_TOP_K"] = "0"
+    # Per-call INFO logging would dominate the faster benchmarks
+    logging.disable(logging.INFO)
+    return [
+        importlib.import_module(f"benchmarks.bench_{name}").suite
+        for name in SUITE_MODULES
+    ]
+
+
+def print_comparison(comparison: dict[str, Any]) -> None:
+    from benchmarks.harness import format_seconds
+
+    table = Table(
+        title=f"Compared with baseline (tolerance {comparison['tolerance']:.0%})"
+    )
+    table.add_column("Benchmark")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Current", justify="right")
+    table.add_column("Change", justify="right")
+    for status, style in (
+        ("regressions", "red"),
+        ("improvements", "green"),
+        ("unchanged", "dim"),
+    ):
+        for entry in comparison[status]:
+            table.add_row(
+                entry["name"],
+                format_seconds(entry["baseline"]),
+                format_seconds(entry["current"]),
+                f"[{style}]{entry['ratio'] - 1:+.1%}[/{style}]",
+            )
+    console.print(table)
+    for name in comparison["new"]:
+        console.print(f"[cyan]New (no baseline):[/cyan] {name}")
+    for name in comparison["missing"]:
+        console.print(f"[yellow]In baseline but not run:[/yellow] {name}")
+
+    regressions = comparison["regressions"]
+    if regressions:
+        console.print(f"[bold red]{len(regressions)} regression(s):[/bold red]")
+        for entry in regressions:
+            console.print(
+                f"  {entry['name']}: {entry['ratio']:.2f}x slower "
+                f"({format_seconds(entry['baseline'])} -> "
+                f"{format_seconds(entry['current'])})"
+            )
+    else:
+        console.print("[bold green]No regressions[/bold green]")
+
+
+def main(
+    filter: str = typer.Option("", help="Only run benchmarks whose name contains this"),
+    rounds: int = typer.Option(7, help="Timed rounds per benchmark"),
+    output: Path = typer.Option(DEFAULT_OUTPUT, help="Where to write the results"),
+    baseline: Path = typer.Option(DEFAULT_BASELINE, help="Baseline to compare with"),
+    tolerance: float = typer.Option(0.25, help="Allowed slowdown before failing"),
+    save_baseline: bool = typer.Option(False, help="Store the results as baseline"),
+    fail: bool = typer.Option(True, help="Exit with status 1 on regressions"),
+) -> None:
+    """Run the benchmarks and report regressions against the baseline."""
+    from benchmarks.harness import compare, machine_metadata, run_suites
+
+    results = asyncio.run(
+        run_suites(load_suites(), filter, rounds, progress=console.print)
+    )
+    results = {"metadata": machine_metadata(), **results}
+
+    comparison = None
+    if baseline.exists() and not save_baseline:
+        stored = json.loads(baseline.read_text())
+        for key in MACHINE_KEYS:
+            if stored["metadata"].get(key) != results["metadata"][key]:
+                console.print(
+                    f"[yellow]Baseline was measured with a different {key} "
+                    f"({stored['metadata'].get(key)}); expect noise[/yellow]"
+                )
+        comparison = compare(results, stored, tolerance)
+        results["comparison"] = comparison
+        print_comparison(comparison)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    console.print(f"Results written to {output}")
+    if save_baseline:
+        baseline.write_text(json.dumps(results, indent=2) + "\n")
+        console.print(f"Baseline saved to {baseline}")
+
+    if comparison and comparison["regressions"] and fail:
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
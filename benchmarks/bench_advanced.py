@@ -0,0 +1,69 @@
+"""Advanced server tools with a stand-in for the MCP request Context."""
+
+from types import SimpleNamespace
+from typing import Any
+
+from benchmarks import upstream
+from benchmarks.harness import Suite
+from solution.advanced import wikipedia_server as advanced
+
+suite = Suite("advanced")
+_state = {}
+
+
+class FakeContext:
+    """Answers `sample` and `elicit` at once, as if the client replied instantly."""
+
+    def __init__(self, can_sample: bool = True):
+        self.session = SimpleNamespace(
+            check_client_capability=lambda capability: can_sample
+        )
+
+    async def info(self, message: str) -> None:
+        pass
+
+    async def report_progress(
+        self, progress: float, total: float | None = None, message: str | None = None
+    ) -> None:
+        pass
+
+    async def sample(self, messages: Any, **kwargs: Any) -> SimpleNamespace:
+        return SimpleNamespace(text="A concise and engaging summary.")
+
+    async def elicit(self, message: str, response_type: Any = None) -> SimpleNamespace:
+        return SimpleNamespace(action="accept", data="1")
+
+
+ctx = FakeContext()
+no_sampling_ctx = FakeContext(can_sample=False)
+
+
+@suite.setup
+async def setup() -> None:
+    _state["client"] = await upstream.start()
+    await advanced.get_article_with_progress.fn(ctx, upstream.LONG_TITLE)
+
+
+@suite.teardown
+async def teardown() -> None:
+    await upstream.stop(_state.pop("client"))
+
+
+@suite.benchmark()
+async def smart_summarize() -> None:
+    await advanced.smart_summarize.fn(upstream.LONG_TITLE, ctx)
+
+
+@suite.benchmark()
+async def smart_summarize_extractive() -> None:
+    await advanced.smart_summarize.fn(upstream.LONG_TITLE, no_sampling_ctx)
+
+
+@suite.benchmark()
+async def interactive_search() -> None:
+    await advanced.interactive_search.fn("term42 term7", ctx)
+
+
+@suite.benchmark()
+async def get_article_with_progress() -> None:
+    await advanced.get_article_with_progress.fn(ctx, upstream.LONG_TITLE, 2000)
@@ -0,0 +1,44 @@
+"""CLI client: converting a long chat history for display."""
+
+from benchmarks.harness import Skip, Suite
+
+suite = Suite("client")
+_state = {}
+
+TURNS = 50
+
+
+@suite.setup
+async def setup() -> None:
+    try:
+        from pydantic_ai.messages import (
+            ModelRequest,
+            ModelResponse,
+            TextPart,
+            ToolCallPart,
+            ToolReturnPart,
+            UserPromptPart,
+        )
+
+        from solution.clients.cli_client import ChatMessage
+    except ImportError as e:
+        raise Skip(f"client dependencies not installed: {e}") from e
+
+    messages = []
+    for turn in range(TURNS):
+        messages += [
+            ModelRequest(parts=[UserPromptPart(content=f"Question {turn}?")]),
+            ModelResponse(
+                parts=[ToolCallPart("search_wikipedia", {"query": f"topic {turn}"})]
+            ),
+            ModelRequest(
+                parts=[ToolReturnPart("search_wikipedia", ["Python", "Pandas"])]
+            ),
+            ModelResponse(parts=[TextPart(content=f"Answer {turn}. " * 20)]),
+        ]
+    _state.update(convert=ChatMessage.convert_messages_for_display, messages=messages)
+
+
+@suite.benchmark()
+def convert_messages_for_display() -> None:
+    _state["convert"](_state["messages"])
@@ -0,0 +1,39 @@
+"""Math server tools, called directly and through the MCP tool manager."""
+
+import importlib.util
+from pathlib import Path
+
+from mcp.server.fastmcp.exceptions import ToolError
+
+from benchmarks.harness import Suite
+
+suite = Suite("math")
+
+_path = Path(__file__).parents[1] / "solution" / "examples" / "02_math_server.py"
+_spec = importlib.util.spec_from_file_location("math_server", _path)
+math_server = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(math_server)
+
+
+@suite.benchmark()
+def add_numbers() -> None:
+    math_server.add_numbers(5.0, 3.0)
+
+
+@suite.benchmark()
+def sqrt_number() -> None:
+    math_server.sqrt_number(16.0)
+
+
+@suite.benchmark()
+async def call_tool_add_numbers() -> None:
+    # Argument validation and result conversion as done for a real request
+    await math_server.mcp.call_tool("add_numbers", {"a": 5.0, "b": 3.0})
+
+
+@suite.benchmark()
+async def call_tool_divide_by_zero() -> None:
+    try:
+        await math_server.mcp.call_tool("divide_numbers", {"a": 1.0, "b": 0.0})
+    except ToolError:
+        pass
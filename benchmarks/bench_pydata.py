@@ -0,0 +1,60 @@
+"""Flattening of a conference-sized PyData schedule export."""
+
+import importlib.util
+from pathlib import Path
+
+from benchmarks.harness import Suite
+
+suite = Suite("pydata")
+
+_path = Path(__file__).parents[1] / "solution" / "examples" / "03_pydata_server.py"
+_spec = importlib.util.spec_from_file_location("pydata_server", _path)
+pydata_server = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(pydata_server)
+
+
+def make_schedule(days: int = 3, rooms: int = 6, talks: int = 12) -> dict:
+    """A pretalx-style schedule export of `days * rooms * talks` talks."""
+    return {
+        "schedule": {
+            "conference": {
+                "days": [
+                    {
+                        "date": f"2025-09-{24 + day}",
+                        "rooms": {
+                            f"Room {room}": [
+                                {
+                                    "date": f"2025-09-{24 + day}T{9 + talk}:00:00",
+                                    "start": f"{9 + talk}:00",
+                                    "duration": "00:30",
+                                    "room": f"Room {room}",
+                                    "url": f"https://cfp.pydata.org/talk/{day}{room}{talk}",
+                                    "title": f"Talk {talk} in room {room}",
+                                    "abstract": "Dataframes, models and pipelines. "
+                                    * 8,
+                                    "type": "Talk",
+                                    "persons": [
+                                        {"name": f"Speaker {talk}", "url": "https://x"},
+                                        {"name": f"Speaker {talk + 1}", "url": None},
+                                    ],
+                                    "links": [],
+                                    "attachments": [],
+                                }
+                                for talk in range(talks)
+                            ]
+                            for room in range(rooms)
+                        },
+                    }
+                    for day in range(days)
+                ]
+            }
+        }
+    }
+
+
+SCHEDULE = make_schedule()
+
+
+@suite.benchmark()
+def process_pydata_schedule() -> None:
+    pydata_server.process_pydata_schedule(SCHEDULE)
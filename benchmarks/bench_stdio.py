@@ -0,0 +1,70 @@
+"""End-to-end MCP round trips to a Wikipedia server process over stdio.
+
+The server reads a local corpus built from the test fixtures, so the timings
+cover the JSON-RPC and stdio overhead plus the tool itself, not the network.
+"""
+
+import asyncio
+import itertools
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import Suite
+from solution.servers.fake_wikimedia import DEFAULT_FIXTURES
+from solution.servers.load_generator import McpConnection, connect
+from solution.servers.local_corpus import build_corpus, read_dump
+
+suite = Suite("stdio")
+_state = {}
+
+SERVER = Path(__file__).parents[1] / "solution" / "servers" / "wikipedia_server.py"
+TITLE = "Python (programming language)"
+PIPELINED = 50
+
+
+@suite.setup
+async def setup() -> None:
+    workdir = tempfile.TemporaryDirectory()
+    corpus = Path(workdir.name) / "corpus"
+    build_corpus(
+        itertools.chain.from_iterable(read_dump(path) for path in DEFAULT_FIXTURES),
+        corpus,
+    )
+    env = {
+        "WIKIPEDIA_BACKEND": "local",
+        "WIKIPEDIA_CORPUS": str(corpus),
+        "WIKIPEDIA_CACHE_DB": "",
+    }
+    connection = connect(str(SERVER), env)
+    await connection.__aenter__()
+    _state.update(workdir=workdir, connection=connection)
+
+
+@suite.teardown
+async def teardown() -> None:
+    await _state.pop("connection").__aexit__(None, None, None)
+    _state.pop("workdir").cleanup()
+
+
+def _connection() -> McpConnection:
+    return _state["connection"]
+
+
+@suite.benchmark()
+async def ping() -> None:
+    await _connection().request("ping")
+
+
+@suite.benchmark()
+async def get_article_summary() -> None:
+    await _connection().call_tool("get_article_summary", {"title": TITLE})
+
+
+@suite.benchmark(name=f"get_article_summary_x{PIPELINED}_pipelined")
+async def get_article_summary_pipelined() -> None:
+    await asyncio.gather(
+        *(
+            _connection().call_tool("get_article_summary", {"title": TITLE})
+            for _ in range(PIPELINED)
+        )
+    )
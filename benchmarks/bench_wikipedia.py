@@ -0,0 +1,69 @@
+"""Wikipedia server tools against the in-process fake Wikimedia API."""
+
+from benchmarks import upstream
+from benchmarks.harness import Suite
+from solution.servers import wikipedia_server as server
+
+suite = Suite("wikipedia")
+_state = {}
+
+BATCH = [f"Synthetic article {n}" for n in range(1, 11)]
+
+
+@suite.setup
+async def setup() -> None:
+    _state["client"] = await upstream.start()
+    # Warm the cache for the cached-path benchmarks
+    await server.get_article_summaries(BATCH)
+
+
+@suite.teardown
+async def teardown() -> None:
+    await upstream.stop(_state.pop("client"))
+
+
+@suite.benchmark()
+async def search_wikipedia() -> None:
+    await server.search_wikipedia("term42 term7", limit=5)
+
+
+@suite.benchmark(setup=upstream.reset_caches)
+async def get_article_summary_uncached() -> None:
+    await server.get_article_summary(upstream.LONG_TITLE)
+
+
+@suite.benchmark()
+async def get_article_summary_cached() -> None:
+    await server.get_article_summary(upstream.LONG_TITLE)
+
+
+@suite.benchmark()
+async def get_article_content_cached() -> None:
+    await server.get_article_content(upstream.LONG_TITLE, max_length=2000)
+
+
+@suite.benchmark()
+async def get_article_info() -> None:
+    await server.get_article_info(upstream.LONG_TITLE)
+
+
+@suite.benchmark()
+async def list_sections_cached() -> None:
+    await server.list_sections(upstream.LONG_TITLE)
+
+
+@suite.benchmark()
+async def get_article_chunk_walk() -> None:
+    cursor = None
+    while True:
+        chunk = await server.get_article_chunk(
+            upstream.LONG_TITLE, cursor, max_length=500
+        )
+        cursor = chunk["next_cursor"]
+        if cursor is None:
+            break
+
+
+@suite.benchmark(setup=upstream.reset_caches)
+async def get_article_summaries_uncached() -> None:
+    await server.get_article_summaries(BATCH)
@@ -0,0 +1,277 @@
+"""
+Minimal benchmark harness: suites, timing, machine metadata and baselines.
+
+A benchmark module defines a `Suite` and registers zero-argument sync or async
+functions on it. Suites may have async setup and teardown (e.g. to start a
+server); a setup that raises `Skip` marks the whole suite as skipped, for
+example when an optional dependency is missing.
+
+Each benchmark is warmed up, then timed in rounds. A round calls the function
+enough times to take at least `min_round_time`, so sub-microsecond calls are
+still measured accurately; the per-call time of each round is one sample.
+Benchmarks with a per-call `setup` run one call per round, and only the call
+itself is timed.
+
+Results are compared by median against a stored baseline. A benchmark is a
+regression when it is slower than its baseline by more than the tolerance.
+"""
+
+import inspect
+import os
+import platform
+import statistics
+import subprocess
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from importlib import metadata
+from typing import Any
+
+# Packages whose versions are recorded with the results
+TRACKED_PACKAGES = ("mcp", "fastmcp", "httpx", "numpy", "pydantic", "starlette")
+
+
+class Skip(Exception):
+    """Raised by a suite's setup to skip all of its benchmarks."""
+
+
+@dataclass
+class Benchmark:
+    name: str
+    fn: Callable[[], Any]
+    setup: Callable[[], Any] | None = None
+
+
+@dataclass
+class Suite:
+    """A named group of benchmarks sharing setup and teardown."""
+
+    name: str
+    benchmarks: list[Benchmark] = field(default_factory=list)
+    _setup: Callable[[], Awaitable[None]] | None = None
+    _teardown: Callable[[], Awaitable[None]] | None = None
+
+    def benchmark(
+        self, name: str | None = None, setup: Callable[[], Any] | None = None
+    ) -> Callable[[Callable], Callable]:
+        """Register a zero-argument function as `<suite>.<name>`.
+
+        Args:
+            name: Benchmark name (defaults to the function name)
+            setup: Called (and awaited if async) before every timed call
+        """
+
+        def register(fn: Callable) -> Callable:
+            full_name = f"{self.name}.{name or fn.__name__}"
+            self.benchmarks.append(Benchmark(full_name, fn, setup))
+            return fn
+
+        return register
+
+    def setup(self, fn: Callable[[], Awaitable[None]]) -> Callable:
+        self._setup = fn
+        return fn
+
+    def teardown(self, fn: Callable[[], Awaitable[None]]) -> Callable:
+        self._teardown = fn
+        return fn
+
+
+async def _call(fn: Callable[[], Any]) -> Any:
+    result = fn()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def _time_round(benchmark: Benchmark, loops: int) -> float:
+    """Seconds per call over `loops` calls (excluding per-call setup)."""
+    fn = benchmark.fn
+    if benchmark.setup is not None:
+        await _call(benchmark.setup)
+        started = time.perf_counter()
+        await _call(fn)
+        return time.perf_counter() - started
+
+    if inspect.iscoroutinefunction(fn):
+        started = time.perf_counter()
+        for _ in range(loops):
+            await fn()
+    else:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+    return (time.perf_counter() - started) / loops
+
+
+async def measure(
+    benchmark: Benchmark,
+    rounds: int = 7,
+    min_round_time: float = 0.02,
+    warmup_time: float = 0.05,
+) -> dict[str, Any]:
+    """Warm up and time one benchmark.
+
+    Returns:
+        Per-call statistics in seconds: median, mean, min, max, stdev, plus
+        the number of rounds and calls per round
+    """
+    # Warm up, and find how many calls make a round of `min_round_time`
+    loops = 1
+    deadline = time.perf_counter() + warmup_time
+    while True:
+        per_call = await _time_round(benchmark, loops)
+        if benchmark.setup is not None:
+            if time.perf_counter() >= deadline:
+                break
+            continue
+        if per_call * loops >= min_round_time:
+            if time.perf_counter() >= deadline:
+                break
+        else:
+            loops = max(loops * 2, int(min_round_time / max(per_call, 1e-9)))
+
+    samples = [await _time_round(benchmark, loops) for _ in range(rounds)]
+    return {
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "rounds": rounds,
+        "loops": loops if benchmark.setup is None else 1,
+    }
+
+
+async def run_suites(
+    suites: list[Suite],
+    name_filter: str = "",
+    rounds: int = 7,
+    progress: Callable[[str], None] = lambda line: None,
+) -> dict[str, Any]:
+    """Run every benchmark whose name contains `name_filter`.
+
+    Returns:
+        `{"benchmarks": {name: stats}, "skipped": {suite: reason}}`
+    """
+    results: dict[str, Any] = {}
+    skipped: dict[str, str] = {}
+    for suite in suites:
+        selected = [b for b in suite.benchmarks if name_filter in b.name]
+        if not selected:
+            continue
+        try:
+            if suite._setup is not None:
+                await suite._setup()
+        except Skip as e:
+            skipped[suite.name] = str(e)
+            progress(f"{suite.name}: skipped ({e})")
+            continue
+        try:
+            for benchmark in selected:
+                stats = await measure(benchmark, rounds=rounds)
+                results[benchmark.name] = stats
+                progress(f"{benchmark.name}: {format_seconds(stats['median'])}")
+        finally:
+            if suite._teardown is not None:
+                await suite._teardown()
+    return {"benchmarks": results, "skipped": skipped}
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            check=True,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip()
+
+
+def machine_metadata() -> dict[str, Any]:
+    """Describe the machine and software the results were measured on."""
+    packages = {}
+    for package in TRACKED_PACKAGES:
+        try:
+            packages[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            packages[package] = None
+    return {
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "packages": packages,
+    }
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> dict[str, Any]:
+    """Compare median times of two result sets.
+
+    Args:
+        current: Results of this run
+        baseline: Stored results to compare against
+        tolerance: Allowed relative slowdown, e.g. 0.25 for 25%
+
+    Returns:
+        Lists of regressions, improvements and unchanged benchmarks (each
+        with both medians and their ratio), plus names only in one set
+    """
+    now, before = current["benchmarks"], baseline["benchmarks"]
+    report: dict[str, Any] = {
+        "tolerance": tolerance,
+        "regressions": [],
+        "improvements": [],
+        "unchanged": [],
+        "new": sorted(set(now) - set(before)),
+        "missing": sorted(
+            name
+            for name in set(before) - set(now)
+            if name.split(".")[0] not in current.get("skipped", {})
+        ),
+    }
+    for name in sorted(set(now) & set(before)):
+        ratio = now[name]["median"] / before[name]["median"]
+        entry = {
+            "name": name,
+            "baseline": before[name]["median"],
+            "current": now[name]["median"],
+            "ratio": ratio,
+        }
+        if ratio > 1 + tolerance:
+            report["regressions"].append(entry)
+        elif ratio < 1 / (1 + tolerance):
+            report["improvements"].append(entry)
+        else:
+            report["unchanged"].append(entry)
+    return report
+
+
+def format_seconds(seconds: float) -> str:
+    """Format a duration with a unit that keeps 3 significant digits."""
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
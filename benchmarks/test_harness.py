@@ -0,0 +1,74 @@
+import pytest
+
+from benchmarks.harness import Skip, Suite, compare, format_seconds, run_suites
+
+
+def result(**medians: float) -> dict:
+    return {"benchmarks": {name: {"median": t} for name, t in medians.items()}}
+
+
+class TestCompare:
+    def test_classifies_changes_by_tolerance(self) -> None:
+        baseline = result(
+            **{"a.fast": 1.0, "a.same": 1.0, "a.slow": 1.0, "a.gone": 1.0}
+        )
+        current = result(**{"a.fast": 0.5, "a.same": 1.1, "a.slow": 1.5, "a.new": 1.0})
+
+        report = compare(current, baseline, tolerance=0.25)
+
+        assert [e["name"] for e in report["regressions"]] == ["a.slow"]
+        assert report["regressions"][0]["ratio"] == pytest.approx(1.5)
+        assert [e["name"] for e in report["improvements"]] == ["a.fast"]
+        assert [e["name"] for e in report["unchanged"]] == ["a.same"]
+        assert report["new"] == ["a.new"]
+        assert report["missing"] == ["a.gone"]
+
+    def test_skipped_suites_are_not_missing(self) -> None:
+        current = {**result(), "skipped": {"client": "not installed"}}
+
+        report = compare(current, result(**{"client.convert": 1.0}), 0.25)
+
+        assert report["missing"] == []
+
+
+class TestRunSuites:
+    @pytest.mark.asyncio
+    async def test_runs_sync_and_async_benchmarks(self) -> None:
+        suite = Suite("demo")
+        calls = []
+
+        @suite.benchmark()
+        def sync() -> None:
+            calls.append("sync")
+
+        @suite.benchmark(name="sleepy", setup=lambda: calls.append("setup"))
+        async def nap() -> None:
+            calls.append("nap")
+
+        results = await run_suites([suite], rounds=3)
+
+        assert set(results["benchmarks"]) == {"demo.sync", "demo.sleepy"}
+        assert results["benchmarks"]["demo.sleepy"]["loops"] == 1
+        assert results["benchmarks"]["demo.sync"]["loops"] > 1
+        assert calls.count("setup") == calls.count("nap")
+
+    @pytest.mark.asyncio
+    async def test_skip_and_filter(self) -> None:
+        skipped, other = Suite("skipped"), Suite("other")
+
+        @skipped.setup
+        async def missing_dependency() -> None:
+            raise Skip("not installed")
+
+        skipped.benchmark()(lambda: None)
+        other.benchmark(name="unselected")(lambda: None)
+
+        results = await run_suites([skipped, other], name_filter="skipped")
+
+        assert results == {"benchmarks": {}, "skipped": {"skipped": "not installed"}}
+
+
+def test_format_seconds() -> None:
+    assert format_seconds(2.5) == "2.5 s"
+    assert format_seconds(0.0123) == "12.3 ms"
+    assert format_seconds(4.2e-7) == "420 ns"
@@ -0,0 +1,46 @@
+"""The fake Wikimedia API as an in-process upstream for the server benchmarks."""
+
+import httpx
+
+from solution.servers import wikipedia_server
+from solution.servers.fake_wikimedia import (
+    DEFAULT_FIXTURES,
+    FakeWikimedia,
+    create_app,
+    load_articles,
+)
+from solution.servers.rate_limiter import RateLimiter
+from solution.servers.wikipedia_client import WikipediaClient, set_client
+
+# Fixture articles plus generated ones of realistic length
+SYNTHETIC_ARTICLES = 200
+LONG_TITLE = "Synthetic article 7"
+
+fake = FakeWikimedia(load_articles(list(DEFAULT_FIXTURES), SYNTHETIC_ARTICLES))
+
+
+async def start() -> WikipediaClient:
+    """Point the Wikipedia servers at the fake API, without rate limits."""
+    client = WikipediaClient(
+        core_api_url="http://fake/core/v1/wikipedia/en",
+        action_api_url="http://fake/w/api.php",
+        transport=httpx.ASGITransport(create_app(fake)),
+        limiters={
+            endpoint: RateLimiter(rate=1e9, burst=1_000_000, max_concurrent=1000)
+            for endpoint in ("search", "action")
+        },
+    )
+    set_client(client)
+    reset_caches()
+    return client
+
+
+async def stop(client: WikipediaClient) -> None:
+    await client.aclose()
+    set_client(None)
+    reset_caches()
+
+
+def reset_caches() -> None:
+    """Forget cached articles and digests so the next call goes upstream."""
+    wikipedia_server.article_cache.clear()
@@ -1,19 +1,35 @@
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastmcp import Context
 
 from solution.advanced import wikipedia_server
+from solution.servers.summary_memo import SummaryMemo
+from solution.servers.wikipedia_client import WikiPage
+
+
+@pytest.fixture(autouse=True)
+def memo(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    memo = SummaryMemo(tmp_path / "memo.db")
+    monkeypatch.setattr(wikipedia_server, "summary_memo", memo)
+    yield memo
+    memo.close()
+
+
+def make_page(text: str, revid: int | None = None) -> WikiPage:
+    return WikiPage(
+        title="Test Article", url="https://example.org", text=text, revid=revid
+    )
 
 
 class TestSmartSummarize:
-    @patch("solution.advanced.wikipedia_server.wiki")
+    @patch("solution.advanced.wikipedia_server.fetch_article", new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def test_smart_summarize_enhances_content(self, mock_wiki: MagicMock) -> None:
-        mock_page = MagicMock()
-        mock_page.exists.return_value = True
-        mock_page.summary = "Original Wikipedia summary."
-        mock_wiki.page.return_value = mock_page
+    async def test_smart_summarize_enhances_content(
+        self, mock_fetch: AsyncMock
+    ) -> None:
+        mock_fetch.return_value = make_page("Original Wikipedia summary.")
 
         mock_context = AsyncMock(spec=Context)
         mock_sample_response = MagicMock()
@@ -25,30 +41,213 @@ class TestSmartSummarize:
         assert result == "Enhanced AI summary."
         mock_context.sample.assert_called_once()
 
-    @patch("solution.advanced.wikipedia_server.wiki")
+    @patch("solution.advanced.wikipedia_server.fetch_article", new_callable=AsyncMock)
     @pytest.mark.asyncio
     async def test_smart_summarize_handles_nonexistent_article(
-        self, mock_wiki: MagicMock
+        self, mock_fetch: AsyncMock
     ) -> None:
-        mock_page = MagicMock()
-        mock_page.exists.return_value = False
-        mock_wiki.page.return_value = mock_page
+        mock_fetch.side_effect = ValueError(
+            "Article 'Nonexistent' not found on Wikipedia"
+        )
 
         mock_context = AsyncMock(spec=Context)
 
         with pytest.raises(ValueError, match="Article 'Nonexistent' not found"):
             await wikipedia_server.smart_summarize.fn("Nonexistent", mock_context)
 
+    @patch("solution.advanced.wikipedia_server.fetch_article", new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_smart_summarize_samples_long_article_in_parallel_chunks(
+        self, mock_fetch: AsyncMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(wikipedia_server, "SUMMARY_CHUNK_LENGTH", 1000)
+        monkeypatch.setattr(wikipedia_server, "SAMPLING_CONCURRENCY", 2)
+        paragraphs = [f"Paragraph {i} sentence. " * 20 for i in range(8)]
+        mock_fetch.return_value = make_page("\n\n".join(paragraphs))
+
+        in_flight = peak = 0
+
+        async def sample(prompt: str, max_tokens: int) -> MagicMock:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return MagicMock(text="Short part summary.")
+
+        mock_context = AsyncMock(spec=Context)
+        mock_context.sample.side_effect = sample
+
+        result = await wikipedia_server.smart_summarize.fn("Test Article", mock_context)
+
+        assert result == "Short part summary."
+        prompts = [call.args[0] for call in mock_context.sample.call_args_list]
+        chunk_prompts = prompts[:-1]
+        assert len(chunk_prompts) > 1
+        assert all(len(prompt) < 1300 for prompt in chunk_prompts)
+        assert "Paragraph 7" in chunk_prompts[-1]
+        assert "more concise" in prompts[-1]
+        assert peak == 2
+
+        progress = [
+            call.args[:2] for call in mock_context.report_progress.call_args_list
+        ]
+        total = len(prompts)
+        assert progress == [(done, total) for done in range(1, total + 1)]
+
+    @pytest.mark.asyncio
+    async def test_map_reduce_summary_reduces_long_part_summaries_in_rounds(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(wikipedia_server, "SUMMARY_CHUNK_LENGTH", 100)
+        mock_context = AsyncMock(spec=Context)
+        mock_context.sample.return_value = MagicMock(text="x" * 40)
+
+        sampler = wikipedia_server.Sampler(mock_context, total=1)
+
+        result = await wikipedia_server.map_reduce_summary(
+            "Test Article", ["chunk"] * 8, sampler
+        )
+
+        assert result == "x" * 40
+        prompts = [call.args[0] for call in mock_context.sample.call_args_list]
+        assert all(p.startswith("This is part") for p in prompts[:8])
+        assert all(p.startswith("These are summaries") for p in prompts[8:14])
+        # 8 chunks, then 8 summaries of 40 characters grouped in twos (4
+        # calls), then 4 grouped in twos (2 calls), then the final step
+        assert mock_context.sample.call_count == 8 + 4 + 2 + 1
+        done, total = mock_context.report_progress.call_args.args[:2]
+        assert done == total == 15
+        assert sampler.cost.calls == 15
+
+    @patch("solution.advanced.wikipedia_server.fetch_article", new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_smart_summarize_reuses_stored_summary_of_same_revision(
+        self, mock_fetch: AsyncMock, memo: SummaryMemo
+    ) -> None:
+        mock_fetch.return_value = make_page("Original Wikipedia summary.", revid=7)
+        mock_context = AsyncMock(spec=Context)
+        mock_context.sample.return_value = MagicMock(text="Enhanced AI summary.")
+
+        first = await wikipedia_server.smart_summarize.fn("Test Article", mock_context)
+        second = await wikipedia_server.smart_summarize.fn("Test Article", mock_context)
+
+        assert first == second == "Enhanced AI summary."
+        mock_context.sample.assert_called_once()
+        stats = memo.stats()
+        assert stats["hits"] == 1
+        assert stats["sampling_calls_saved"] == 1
+        assert stats["tokens_saved"] > 0
+
+    @patch("solution.advanced.wikipedia_server.fetch_article", new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_smart_summarize_samples_again_for_new_revision_or_refresh(
+        self, mock_fetch: AsyncMock, memo: SummaryMemo
+    ) -> None:
+        mock_context = AsyncMock(spec=Context)
+        mock_context.sample.side_effect = [
+            MagicMock(text=f"Summary {i}.") for i in range(3)
+        ]
+
+        mock_fetch.return_value = make_page("Original text.", revid=7)
+        await wikipedia_server.smart_summarize.fn("Test Article", mock_context)
+        mock_fetch.return_value = make_page("Edited text.", revid=8)
+        edited = await wikipedia_server.smart_summarize.fn("Test Article", mock_context)
+        refreshed = await wikipedia_server.smart_summarize.fn(
+            "Test Article", mock_context, refresh=True
+        )
+
+        assert (edited, refreshed) == ("Summary 1.", "Summary 2.")
+        assert mock_context.sample.call_count == 3
+        assert memo.stats()["refreshes"] == 1
+        assert memo.stats()["entries"] == 1
+
+    def test_group_parts_keeps_at_least_two_parts_per_group(self) -> None:
+        assert wikipedia_server.group_parts(["a" * 10] * 5, 25) == [
+            ["a" * 10] * 2,
+            ["a" * 10] * 3,
+        ]
+        assert wikipedia_server.group_parts(["a" * 50] * 3, 10) == [["a" * 50] * 3]
+
+    @patch("solution.advanced.wikipedia_server.fetch_article", new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_smart_summarize_extracts_sentences_without_sampling_support(
+        self, mock_fetch: AsyncMock
+    ) -> None:
+        mock_fetch.return_value = make_page(
+            "The article is about testing. It covers many testing topics."
+        )
+        mock_context = AsyncMock(spec=Context)
+        mock_context.session.check_client_capability.return_value = False
+
+        result = await wikipedia_server.smart_summarize.fn("Test Article", mock_context)
+
+        assert result.startswith("The article is about testing.")
+        mock_context.sample.assert_not_called()
+
+    @patch("solution.advanced.wikipedia_server.fetch_article", new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_smart_summarize_samples_extract_of_long_article(
+        self, mock_fetch: AsyncMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(wikipedia_server, "EXTRACT_TOKENS", 100)
+        monkeypatch.setattr(wikipedia_server, "SUMMARY_CHUNK_LENGTH", 1000)
+        text = " ".join(
+            f"Sentence {i} talks about topic {i % 7} in some detail."
+            for i in range(300)
+        )
+        mock_fetch.return_value = make_page(text)
+        mock_context = AsyncMock(spec=Context)
+        mock_context.sample.return_value = MagicMock(text="Enhanced AI summary.")
+
+        await wikipedia_server.smart_summarize.fn("Test Article", mock_context)
+
+        mock_context.sample.assert_called_once()
+        prompt = mock_context.sample.call_args.args[0]
+        assert len(prompt) < 600
+        assert "talks about topic" in prompt
+
+    @patch("solution.advanced.wikipedia_server.fetch_article", new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_smart_summarize_splits_oversized_extract_not_full_text(
+        self,
+        mock_fetch: AsyncMock,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        monkeypatch.setattr(wikipedia_server, "EXTRACT_TOKENS", 100)
+        monkeypatch.setattr(wikipedia_server, "SUMMARY_CHUNK_LENGTH", 1000)
+        monkeypatch.setattr(
+            wikipedia_server,
+            "extract_summary",
+            lambda digest, budget: "Key sentence of the extract. " * 50,
+        )
+        mock_fetch.return_value = make_page("Full article text. " * 300)
+        mock_context = AsyncMock(spec=Context)
+        mock_context.sample.return_value = MagicMock(text="Part summary.")
+
+        await wikipedia_server.smart_summarize.fn("Test Article", mock_context)
+
+        prompts = [call.args[0] for call in mock_context.sample.call_args_list]
+        assert len(prompts) == 3
+        assert not any("Full article text" in prompt for prompt in prompts)
+        assert "over the 1000 character prompt limit" in caplog.text
+
 
 class TestInteractiveSearch:
-    @patch("solution.advanced.wikipedia_server.search_wikipedia")
-    @patch("solution.advanced.wikipedia_server.get_article_summary")
+    @patch(
+        "solution.advanced.wikipedia_server.search_wikipedia", new_callable=AsyncMock
+    )
+    @patch(
+        "solution.advanced.wikipedia_server.get_article_summary",
+        new_callable=AsyncMock,
+    )
     @pytest.mark.asyncio
     async def test_interactive_search_single_result_returns_summary(
-        self, mock_get_summary: MagicMock, mock_search: MagicMock
+        self, mock_get_summary: AsyncMock, mock_search: AsyncMock
     ) -> None:
-        mock_search.fn.return_value = ["Single Article"]
-        mock_get_summary.fn.return_value = "Article summary"
+        mock_search.return_value = ["Single Article"]
+        mock_get_summary.return_value = "Article summary"
 
         mock_context = AsyncMock(spec=Context)
 
@@ -59,14 +258,19 @@ class TestInteractiveSearch:
         assert result == "Article summary"
         mock_context.elicit.assert_not_called()
 
-    @patch("solution.advanced.wikipedia_server.search_wikipedia")
-    @patch("solution.advanced.wikipedia_server.get_article_summary")
+    @patch(
+        "solution.advanced.wikipedia_server.search_wikipedia", new_callable=AsyncMock
+    )
+    @patch(
+        "solution.advanced.wikipedia_server.get_article_summary",
+        new_callable=AsyncMock,
+    )
     @pytest.mark.asyncio
     async def test_interactive_search_multiple_results_elicits_choice(
-        self, mock_get_summary: MagicMock, mock_search: MagicMock
+        self, mock_get_summary: AsyncMock, mock_search: AsyncMock
     ) -> None:
-        mock_search.fn.return_value = ["Article 1", "Article 2", "Article 3"]
-        mock_get_summary.fn.return_value = "Selected article summary"
+        mock_search.return_value = ["Article 1", "Article 2", "Article 3"]
+        mock_get_summary.return_value = "Selected article summary"
 
         mock_context = AsyncMock(spec=Context)
         mock_elicit_result = MagicMock()
@@ -81,18 +285,23 @@ class TestInteractiveSearch:
         assert result == "Selected article summary"
         mock_context.elicit.assert_called_once()
 
-    @patch("solution.advanced.wikipedia_server.search_wikipedia")
-    @patch("solution.advanced.wikipedia_server.get_article_summary")
+    @patch(
+        "solution.advanced.wikipedia_server.search_wikipedia", new_callable=AsyncMock
+    )
+    @patch(
+        "solution.advanced.wikipedia_server.get_article_summary",
+        new_callable=AsyncMock,
+    )
     @pytest.mark.asyncio
     async def test_interactive_search_accepts_title_match(
-        self, mock_get_summary: MagicMock, mock_search: MagicMock
+        self, mock_get_summary: AsyncMock, mock_search: AsyncMock
     ) -> None:
-        mock_search.fn.return_value = [
+        mock_search.return_value = [
             "Python (programming language)",
             "Python (mythology)",
             "Python (snake)",
         ]
-        mock_get_summary.fn.return_value = "Programming language summary"
+        mock_get_summary.return_value = "Programming language summary"
 
         mock_context = AsyncMock(spec=Context)
         mock_elicit_result = MagicMock()
@@ -103,14 +312,16 @@ class TestInteractiveSearch:
         result = await wikipedia_server.interactive_search.fn("python", mock_context)
 
         assert result == "Programming language summary"
-        mock_get_summary.fn.assert_called_once_with("Python (programming language)")
+        mock_get_summary.assert_awaited_once_with("Python (programming language)")
 
-    @patch("solution.advanced.wikipedia_server.search_wikipedia")
+    @patch(
+        "solution.advanced.wikipedia_server.search_wikipedia", new_callable=AsyncMock
+    )
     @pytest.mark.asyncio
     async def test_interactive_search_handles_user_cancellation(
-        self, mock_search: MagicMock
+        self, mock_search: AsyncMock
     ) -> None:
-        mock_search.fn.return_value = ["Article 1", "Article 2"]
+        mock_search.return_value = ["Article 1", "Article 2"]
 
         mock_context = AsyncMock(spec=Context)
         mock_elicit_result = MagicMock()
@@ -121,17 +332,98 @@ class TestInteractiveSearch:
 
         assert "cancelled" in result.lower()
 
+    @patch(
+        "solution.advanced.wikipedia_server.search_wikipedia", new_callable=AsyncMock
+    )
+    @patch(
+        "solution.advanced.wikipedia_server.get_article_summary",
+        new_callable=AsyncMock,
+    )
+    @pytest.mark.asyncio
+    async def test_interactive_search_prefetches_candidates_during_elicitation(
+        self, mock_get_summary: AsyncMock, mock_search: AsyncMock
+    ) -> None:
+        mock_search.return_value = ["Article 1", "Article 2", "Article 3"]
+        finished: list[str] = []
+        cancelled: list[str] = []
+
+        async def get_summary(title: str) -> str:
+            try:
+                await asyncio.sleep(0.01 if title != "Article 3" else 10)
+            except asyncio.CancelledError:
+                cancelled.append(title)
+                raise
+            finished.append(title)
+            return f"Summary of {title}"
+
+        mock_get_summary.side_effect = get_summary
+
+        async def elicit(message: str, response_type: type) -> MagicMock:
+            await asyncio.sleep(0.05)  # the user reads the choices
+            return MagicMock(action="accept", data="2")
+
+        mock_context = AsyncMock(spec=Context)
+        mock_context.elicit.side_effect = elicit
+
+        result = await wikipedia_server.interactive_search.fn("query", mock_context)
+
+        assert result == "Summary of Article 2"
+        assert sorted(finished) == ["Article 1", "Article 2"]
+        assert cancelled == ["Article 3"]
+        mock_context.info.assert_any_call("User selected: Article 2 (prefetched)")
+
+    @patch(
+        "solution.advanced.wikipedia_server.search_wikipedia", new_callable=AsyncMock
+    )
+    @patch(
+        "solution.advanced.wikipedia_server.get_article_summary",
+        new_callable=AsyncMock,
+    )
+    @pytest.mark.asyncio
+    async def test_interactive_search_cancels_prefetch_when_user_declines(
+        self, mock_get_summary: AsyncMock, mock_search: AsyncMock
+    ) -> None:
+        mock_search.return_value = ["Article 1", "Article 2"]
+        cancelled: list[str] = []
+
+        async def get_summary(title: str) -> str:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(title)
+                raise
+            return title
+
+        mock_get_summary.side_effect = get_summary
+
+        async def elicit(message: str, response_type: type) -> MagicMock:
+            await asyncio.sleep(0.01)
+            return MagicMock(action="decline")
+
+        mock_context = AsyncMock(spec=Context)
+        mock_context.elicit.side_effect = elicit
+
+        result = await wikipedia_server.interactive_search.fn("query", mock_context)
+
+        assert "cancelled" in result.lower()
+        assert sorted(cancelled) == ["Article 1", "Article 2"]
+
+    def test_select_title_by_name_or_number(self) -> None:
+        titles = ["Python (programming language)", "Python (snake)"]
+
+        assert wikipedia_server.select_title(" snake ", titles) == "Python (snake)"
+        assert wikipedia_server.select_title("1", titles) == titles[0]
+        assert wikipedia_server.select_title("3", titles) is None
+        assert wikipedia_server.select_title("lizard", titles) is None
+
 
 class TestGetArticleWithProgress:
-    @patch("solution.advanced.wikipedia_server.wiki")
+    @patch("solution.advanced.wikipedia_server.fetch_article", new_callable=AsyncMock)
     @pytest.mark.asyncio
     async def test_get_article_with_progress_reports_progress(
-        self, mock_wiki: MagicMock
+        self, mock_fetch: AsyncMock
     ) -> None:
-        mock_page = MagicMock()
-        mock_page.exists.return_value = True
-        mock_page.text = "Short article content."
-        mock_wiki.page.return_value = mock_page
+        mock_fetch.return_value = make_page("Short article content.")
 
         mock_context = AsyncMock(spec=Context)
 
@@ -142,19 +434,17 @@ class TestGetArticleWithProgress:
         assert result == "Short article content."
         progress_calls = mock_context.report_progress.call_args_list
         assert len(progress_calls) >= 2
+        # A page that was not downloaded counts its size in bytes as done
         final_call = progress_calls[-1]
-        assert final_call[0] == (100, 100)
+        assert final_call[0] == (22, 22)
 
-    @patch("solution.advanced.wikipedia_server.wiki")
+    @patch("solution.advanced.wikipedia_server.fetch_article", new_callable=AsyncMock)
     @pytest.mark.asyncio
     async def test_get_article_with_progress_truncates_long_content(
-        self, mock_wiki: MagicMock
+        self, mock_fetch: AsyncMock
     ) -> None:
         long_content = "A" * 3000 + ". More content here."
-        mock_page = MagicMock()
-        mock_page.exists.return_value = True
-        mock_page.text = long_content
-        mock_wiki.page.return_value = mock_page
+        mock_fetch.return_value = make_page(long_content)
 
         mock_context = AsyncMock(spec=Context)
 
@@ -9,34 +9,232 @@ This module demonstrates FastMCP's advanced capabilities:
 Educational code showing next-level MCP server patterns.
 """
 
+import asyncio
 import logging
+import os
+from collections.abc import Iterable
+from typing import Any
 
-import wikipediaapi
 from fastmcp import Context, FastMCP
+from mcp.types import ClientCapabilities, SamplingCapability
+
+from solution.servers.article_digest import ArticleDigest
+from solution.servers.extractive import extract_summary
+from solution.servers.metrics import expose_metrics, metrics
+from solution.servers.persistent_cache import DEFAULT_DB_PATH
+from solution.servers.summary_memo import (
+    SamplingCost,
+    SummaryMemo,
+    estimate_tokens,
+    prompt_hash,
+)
+from solution.servers.wikipedia_client import get_client, wikipedia_lifespan
 
 # These could be util functions in a separate module.
 # For the purposes of the demo, we're borrowing existing functions
-from solution.servers.wikipedia_server import get_article_summary, search_wikipedia
+from solution.servers.wikipedia_server import (
+    digest_of,
+    fetch_article,
+    get_article_summary,
+    search_wikipedia,
+)
 
 logger = logging.getLogger(__name__)
 
-wiki = wikipediaapi.Wikipedia(
-    language="en",
-    extract_format=wikipediaapi.ExtractFormat.WIKI,
-    user_agent="MCP-Wikipedia-Advanced/1.0 (educational-purpose)",
+# Share the basic server's pooled Wikimedia client for the server lifetime
+mcp = FastMCP("Wikipedia Advanced Server", lifespan=wikipedia_lifespan)
+expose_metrics(mcp)
+
+# Articles longer than this (in characters) are summarized chunk by chunk and
+# the chunk summaries combined, with at most WIKIPEDIA_SAMPLING_CONCURRENCY
+# ctx.sample requests in flight
+SUMMARY_CHUNK_LENGTH = int(os.getenv("WIKIPEDIA_SUMMARY_CHUNK_LENGTH", "12000"))
+SAMPLING_CONCURRENCY = int(os.getenv("WIKIPEDIA_SAMPLING_CONCURRENCY", "4"))
+CHUNK_MAX_TOKENS = 300
+SUMMARY_MAX_TOKENS = 800
+# Articles over this many (estimated) tokens are cut down to their most
+# informative sentences before sampling; 0 sends the full text
+EXTRACT_TOKENS = int(os.getenv("WIKIPEDIA_EXTRACT_TOKENS", "0"))
+
+# get_article_with_progress reports download progress at most every this
+# many bytes
+PROGRESS_STEP_BYTES = 16 * 1024
+
+ENHANCE_PROMPT = (
+    "Make this Wikipedia summary more concise and engaging while preserving "
+    "key facts:\n\n{text}"
+)
+CHUNK_PROMPT = (
+    "This is part {part} of {parts} of the Wikipedia article '{title}'. "
+    "Summarize it in one short paragraph, keeping key facts, names, dates and "
+    "numbers:\n\n{text}"
+)
+# Combines part summaries that are still too long for the final step
+REDUCE_PROMPT = (
+    "These are summaries of consecutive parts of the Wikipedia article "
+    "'{title}' (group {part} of {parts}). Merge them into one short paragraph "
+    "without repeating facts, keeping key names, dates and numbers:\n\n{text}"
+)
+# Identifies the prompts and settings a stored summary was produced with
+PROMPT_HASH = prompt_hash(
+    ENHANCE_PROMPT,
+    CHUNK_PROMPT,
+    REDUCE_PROMPT,
+    SUMMARY_CHUNK_LENGTH,
+    CHUNK_MAX_TOKENS,
+    EXTRACT_TOKENS,
+)
+
+# Enhanced summaries by article revision and prompt, kept in the basic
+# server's cache database; WIKIPEDIA_SUMMARY_MEMO_MB=0 disables the memo. Like
+# the persistent cache it is only used with the live backend.
+_memo_path = (
+    os.getenv("WIKIPEDIA_CACHE_DB", str(DEFAULT_DB_PATH))
+    if os.getenv("WIKIPEDIA_BACKEND", "live").lower() == "live"
+    else ""
 )
+_memo_bytes = int(float(os.getenv("WIKIPEDIA_SUMMARY_MEMO_MB", "16")) * 1024 * 1024)
+summary_memo = (
+    SummaryMemo(_memo_path, max_bytes=_memo_bytes)
+    if _memo_path and _memo_bytes
+    else None
+)
+
+
+async def _summary_memo_stats() -> dict[str, Any]:
+    """Stats of the summary memo, read on its worker thread."""
+    return await summary_memo.run(summary_memo.stats) if summary_memo else {}
+
+
+metrics.register_source("summary_memo", _summary_memo_stats)
+
+
+class Sampler:
+    """Runs the ctx.sample calls for one summary.
+
+    Reports each finished call through ctx.report_progress and adds up the
+    sampling cost, which is stored with the summary.
+    """
+
+    def __init__(self, ctx: Context, total: int):
+        self.ctx = ctx
+        self.done = 0
+        self.total = total
+        self.cost = SamplingCost()
+
+    async def sample(self, prompt: str, max_tokens: int) -> str:
+        response = await self.ctx.sample(prompt, max_tokens=max_tokens)
+        self.cost.add(prompt, response.text)
+        return response.text
+
+    async def step(self, message: str) -> None:
+        self.done += 1
+        await self.ctx.report_progress(self.done, self.total, message)
+
+
+async def sample_all(
+    sampler: Sampler, prompts: list[str], max_tokens: int
+) -> list[str]:
+    """Sample all prompts concurrently, at most SAMPLING_CONCURRENCY at a time.
+
+    Returns:
+        The completions, in the order of `prompts`
+    """
+    slots = asyncio.Semaphore(SAMPLING_CONCURRENCY)
+
+    async def sample(i: int, prompt: str) -> str:
+        async with slots:
+            text = await sampler.sample(prompt, max_tokens)
+        await sampler.step(f"Summarized part {i + 1} of {len(prompts)}")
+        return text
+
+    async with asyncio.TaskGroup() as group:
+        tasks = [group.create_task(sample(i, p)) for i, p in enumerate(prompts)]
+    return [task.result() for task in tasks]
 
-mcp = FastMCP("Wikipedia Advanced Server")
+
+def group_parts(parts: list[str], max_length: int) -> list[list[str]]:
+    """Split consecutive parts into groups of at most `max_length` characters.
+
+    Every group holds at least two parts, so each reduce round shrinks the
+    list even when single parts are long.
+    """
+    groups: list[list[str]] = []
+    for part in parts:
+        current = groups[-1] if groups else None
+        if current is not None and (
+            len(current) < 2 or sum(map(len, current)) + len(part) <= max_length
+        ):
+            current.append(part)
+        else:
+            groups.append([part])
+    if len(groups) > 1 and len(groups[-1]) == 1:
+        last = groups.pop()
+        groups[-1].extend(last)
+    return groups
+
+
+async def map_reduce_summary(title: str, chunks: list[str], sampler: Sampler) -> str:
+    """Summarize chunks concurrently, then combine the summaries.
+
+    Chunk summaries that together are still longer than SUMMARY_CHUNK_LENGTH
+    are combined in further concurrent rounds before the final step, so no
+    single prompt exceeds the chunk length.
+    """
+    sampler.total = len(chunks) + 1
+    prompts = [
+        CHUNK_PROMPT.format(part=i + 1, parts=len(chunks), title=title, text=chunk)
+        for i, chunk in enumerate(chunks)
+    ]
+    parts = await sample_all(sampler, prompts, CHUNK_MAX_TOKENS)
+
+    while len(parts) > 1 and sum(map(len, parts)) > SUMMARY_CHUNK_LENGTH:
+        groups = group_parts(parts, SUMMARY_CHUNK_LENGTH)
+        sampler.total += len(groups)
+        prompts = [
+            REDUCE_PROMPT.format(
+                part=i + 1, parts=len(groups), title=title, text="\n\n".join(group)
+            )
+            for i, group in enumerate(groups)
+        ]
+        parts = await sample_all(sampler, prompts, CHUNK_MAX_TOKENS)
+
+    summary = await sampler.sample(
+        ENHANCE_PROMPT.format(text="\n\n".join(parts)), SUMMARY_MAX_TOKENS
+    )
+    await sampler.step("Combined part summaries")
+    return summary
+
+
+def client_can_sample(ctx: Context) -> bool:
+    """Whether the connected client supports sampling requests."""
+    return bool(
+        ctx.session.check_client_capability(
+            ClientCapabilities(sampling=SamplingCapability())
+        )
+    )
 
 
 @mcp.tool()
-async def smart_summarize(title: str, ctx: Context) -> str:
+@metrics.instrument
+async def smart_summarize(title: str, ctx: Context, refresh: bool = False) -> str:
     """Get an AI-enhanced summary of a Wikipedia article.
 
-    Uses ctx.sample() to leverage the client's LLM for better summaries.
+    Uses ctx.sample() to leverage the client's LLM for better summaries. Long
+    articles are split at section and paragraph boundaries; the parts are
+    summarized concurrently and the part summaries combined in a final step,
+    so no prompt exceeds WIKIPEDIA_SUMMARY_CHUNK_LENGTH characters.
+
+    With WIKIPEDIA_EXTRACT_TOKENS set, longer articles are first cut down to
+    their most informative sentences (TextRank). Clients without sampling
+    support get that extractive summary instead of an error.
+
+    Summaries are stored by article revision and prompt, and reused without
+    sampling until the article changes.
 
     Args:
         title: Wikipedia article title
+        refresh: Sample a new summary even if one is stored
 
     Returns:
         AI-enhanced article summary
@@ -46,26 +244,93 @@ async def smart_summarize(title: str, ctx: Context) -> str:
     """
     await ctx.info(f"Creating enhanced summary for: {title}")
 
-    page = wiki.page(title.strip())
-    if not page.exists():
-        raise ValueError(f"Article '{title}' not found on Wikipedia")
-
+    page = await fetch_article(title)
     raw_text = page.text
 
-    enhanced = await ctx.sample(
-        f"Make this Wikipedia summary more concise and engaging while preserving key facts:\n\n{raw_text}",
-        max_tokens=800,
+    # Without a revision id there is no telling whether the article changed
+    memo = summary_memo if page.revid is not None else None
+    memo_key = (
+        get_client().language,
+        page.title,
+        page.revid,
+        PROMPT_HASH,
+        SUMMARY_MAX_TOKENS,
     )
-
+    if memo and refresh:
+        memo.refreshes += 1
+    elif memo and (summary := await memo.run(memo.get, *memo_key)) is not None:
+        await ctx.info(f"Reusing stored summary of revision {page.revid}: {title}")
+        return summary
+
+    if not client_can_sample(ctx):
+        await ctx.info(f"Client cannot sample, extracting key sentences: {title}")
+        return extract_summary(digest_of(page), SUMMARY_MAX_TOKENS)
+
+    extracted = EXTRACT_TOKENS > 0 and estimate_tokens(raw_text) > EXTRACT_TOKENS
+    if extracted:
+        # Capped so that the extract is normally sampled in one prompt
+        budget = min(EXTRACT_TOKENS, SUMMARY_CHUNK_LENGTH // 4)
+        raw_text = extract_summary(digest_of(page), budget)
+
+    sampler = Sampler(ctx, total=1)
+    if len(raw_text) <= SUMMARY_CHUNK_LENGTH:
+        summary = await sampler.sample(
+            ENHANCE_PROMPT.format(text=raw_text), SUMMARY_MAX_TOKENS
+        )
+        await sampler.step("Summary created")
+    else:
+        if extracted:
+            # Token estimates are approximate; summarize the extract in parts
+            # rather than going back to the full article
+            logger.warning(
+                f"Extract of {title} is {len(raw_text)} characters, over the "
+                f"{SUMMARY_CHUNK_LENGTH} character prompt limit"
+            )
+            await ctx.info(f"Extract of {title} is too long for one prompt")
+            digest = ArticleDigest(raw_text)
+        else:
+            digest = digest_of(page)
+        count = len(digest.chunk_ends(SUMMARY_CHUNK_LENGTH))
+        chunks = [digest.chunk(i, SUMMARY_CHUNK_LENGTH) for i in range(count)]
+        await ctx.info(f"Summarizing {title} in {count} parts")
+        summary = await map_reduce_summary(page.title, chunks, sampler)
+
+    if memo:
+        await memo.run(memo.put, *memo_key, summary, sampler.cost)
     await ctx.info(f"Enhanced summary created for: {title}")
-    return enhanced.text
+    return summary
+
+
+async def cancel_all(tasks: Iterable[asyncio.Task]) -> None:
+    """Cancel tasks and wait for them, discarding their results and errors."""
+    tasks = list(tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def select_title(user_input: str, titles: list[str]) -> str | None:
+    """Match the user's answer to a title, by (partial) name or by number."""
+    user_input = user_input.strip()
+    for title in titles:
+        if user_input.lower() in title.lower():
+            return title
+    try:
+        choice_num = int(user_input)
+    except ValueError:
+        return None
+    return titles[choice_num - 1] if 1 <= choice_num <= len(titles) else None
 
 
 @mcp.tool()
+@metrics.instrument
 async def interactive_search(query: str, ctx: Context) -> str:
     """Search Wikipedia with interactive disambiguation.
 
-    Uses ctx.elicit() for user interaction during tool execution.
+    Uses ctx.elicit() for user interaction during tool execution. While the
+    user reads the choices, the summaries of all candidates are fetched
+    concurrently, so the chosen one is usually ready when the answer arrives;
+    fetches still running then are cancelled.
 
     Args:
         query: Search query string
@@ -81,55 +346,59 @@ async def interactive_search(query: str, ctx: Context) -> str:
 
     await ctx.info(f"Interactive search for: {query}")
 
-    search_results = search_wikipedia.fn(query, limit=8)
+    search_results = await search_wikipedia(query, limit=8)
 
     if not search_results:
         return f"No Wikipedia articles found for '{query}'"
 
     if len(search_results) == 1:
         await ctx.info("Only one result found, retrieving summary...")
-        return get_article_summary.fn(search_results[0])
+        return await get_article_summary(search_results[0])
 
     options_text = "\n".join(
         [f"{i + 1}. {title}" for i, title in enumerate(search_results)]
     )
 
-    result = await ctx.elicit(
-        f"Found {len(search_results)} Wikipedia articles for '{query}':\n\n{options_text}\n\nWhich article would you like?",
-        response_type=str,
-    )
+    summaries = {
+        title: asyncio.create_task(get_article_summary(title))
+        for title in search_results
+    }
+    try:
+        result = await ctx.elicit(
+            f"Found {len(search_results)} Wikipedia articles for '{query}':\n\n{options_text}\n\nWhich article would you like?",
+            response_type=str,
+        )
+
+        if result.action != "accept":
+            return "Search cancelled or invalid selection."
 
-    if result.action == "accept":
         user_input = result.data.strip()
+        selected_title = select_title(user_input, search_results)
+        if selected_title is None:
+            return f"Invalid selection '{user_input}'. Please enter a title name or number 1-{len(search_results)}."
 
-        # Try to match by title first (partial match)
-        for title in search_results:
-            if user_input.lower() in title.lower():
-                await ctx.info(f"User selected by title match: {title}")
-                return get_article_summary.fn(title)
-
-        # Fall back to number selection
-        try:
-            choice_num = int(user_input)
-            if 1 <= choice_num <= len(search_results):
-                selected_title = search_results[choice_num - 1]
-                await ctx.info(f"User selected by number: {selected_title}")
-                return get_article_summary.fn(selected_title)
-        except ValueError:
-            pass
-
-        return f"Invalid selection '{user_input}'. Please enter a title name or number 1-{len(search_results)}."
-    else:
-        return "Search cancelled or invalid selection."
+        selected = summaries.pop(selected_title)
+        await ctx.info(
+            f"User selected: {selected_title}"
+            + (" (prefetched)" if selected.done() else "")
+        )
+    finally:
+        await cancel_all(summaries.values())
+    return await selected
 
 
 @mcp.tool()
+@metrics.instrument
 async def get_article_with_progress(
     ctx: Context, title: str, max_length: int = 2000
 ) -> str:
     """Get article content with progress reporting.
 
-    Demonstrates Context integration for progress reporting and logging.
+    Demonstrates Context integration for progress reporting and logging. The
+    article is downloaded as a stream, and progress is reported in bytes
+    received, against the response's Content-Length or else the expected size
+    (that of the previous revision, if known). Cancelling the request aborts
+    the download.
 
     Args:
         title: Wikipedia article title
@@ -148,25 +417,27 @@ async def get_article_with_progress(
         raise ValueError("max_length must be between 100 and 10000")
 
     await ctx.info(f"Retrieving content for: {title}")
-    await ctx.report_progress(0, 100)
+    await ctx.report_progress(0)
 
-    page = wiki.page(title.strip())
+    received = reported = 0
 
-    if not page.exists():
-        raise ValueError(f"Article '{title}' not found on Wikipedia")
+    async def on_bytes(done: int, total: int | None) -> None:
+        nonlocal received, reported
+        received = done
+        if done - reported >= PROGRESS_STEP_BYTES or done == total:
+            reported = done
+            of_total = f" of {total}" if total else ""
+            await ctx.report_progress(done, total, f"Received {done}{of_total} bytes")
 
-    await ctx.report_progress(25, 100)
+    page = await fetch_article(title, progress=on_bytes)
     content = page.text
 
     if not content:
         raise ValueError(f"No content available for article '{title}'")
 
-    await ctx.report_progress(50, 100)
-
     # Truncate if necessary
     if len(content) > max_length:
         await ctx.info(f"Content is {len(content)} chars, truncating to {max_length}")
-        await ctx.report_progress(75, 100)
 
         truncated = content[:max_length]
         last_period = truncated.rfind(".")
@@ -178,7 +449,9 @@ async def get_article_with_progress(
         else:
             content = truncated + "...\n\n[Content truncated...]"
 
-    await ctx.report_progress(100, 100)
+    # Pages served from the caches were not downloaded
+    done = received or len(page.text.encode("utf-8"))
+    await ctx.report_progress(done, done)
     await ctx.info(f"Retrieved content for: {title} ({len(content)} chars)")
     return content
 
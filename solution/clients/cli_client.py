@@ -9,10 +9,12 @@ Works with any MCP server by dynamically discovering available tools.
 import asyncio
 import sys
 from datetime import datetime
+from pathlib import Path
+from typing import Any
 
 import typer
-from pydantic_ai import Agent
-from pydantic_ai.mcp import MCPServerStdio
+from pydantic_ai import Agent, RunContext
+from pydantic_ai.mcp import CallToolFunc, MCPServerStdio, ToolResult
 from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse
 from pydantic_ai.run import AgentRunResult
 from rich.console import Console
@@ -28,6 +30,7 @@ from solution.clients.config import (
     get_wikipedia_server_path,
     validate_environment,
 )
+from solution.servers.tracing import tracer
 
 console = Console()
 
@@ -85,8 +88,20 @@ class ChatMessage:
         return display_messages
 
 
+async def trace_tool_call(
+    ctx: RunContext[Any],
+    call_tool: CallToolFunc,
+    name: str,
+    tool_args: dict[str, Any],
+) -> ToolResult:
+    """Trace an MCP tool call and pass the trace context in the request `_meta`."""
+    with tracer.span(f"call_tool {name}", tool=name):
+        return await call_tool(name, tool_args, tracer.inject())
+
+
 class MCPResearchAssistant:
-    def __init__(self):
+    def __init__(self, trace_file: Path | None = None):
+        self.trace_file = trace_file
         self.agent: Agent | None = None
         self.server: MCPServerStdio | None = None
         self.server_name: str = "MCP Server"
@@ -98,12 +113,20 @@ class MCPResearchAssistant:
             config = get_agent_config()
             server_path = get_wikipedia_server_path()
 
+            env = None
+            if self.trace_file:
+                # The server appends its spans to the same trace file
+                tracer.configure(self.trace_file, service="cli_client")
+                env = {"MCP_TRACE_FILE": str(self.trace_file.resolve())}
+
             # NOTE: Hard locked to Wikipedia Server for purposes of this demo.
             # Can change this to dynamically load n servers through some config file.
             self.server = MCPServerStdio(
                 "uv",
                 args=["run", "python", str(server_path)],
                 timeout=config["timeout"],
+                env=env,
+                process_tool_call=trace_tool_call,
             )
 
             self.agent = Agent(
@@ -205,9 +228,10 @@ class MCPResearchAssistant:
 
                         try:
                             message_history = self.get_message_history_for_next_run()
-                            result = await self.agent.run(
-                                user_input, message_history=message_history
-                            )
+                            with tracer.span("agent.run", history=len(message_history)):
+                                result = await self.agent.run(
+                                    user_input, message_history=message_history
+                                )
                             progress.update(task, description="✅ Request complete")
 
                             self.last_result = result
@@ -240,12 +264,15 @@ class MCPResearchAssistant:
         if self.server:
             try:
                 console.print("🧹 Cleaning up resources...")
+                if self.trace_file:
+                    tracer.configure(None)
+                    console.print(f"📈 Trace written to {self.trace_file}")
             except Exception as e:
                 console.print(f"⚠️  Warning during cleanup: {e}")
 
 
-async def run_session():
-    assistant = MCPResearchAssistant()
+async def run_session(trace_file: Path | None = None):
+    assistant = MCPResearchAssistant(trace_file)
 
     try:
         if await assistant.initialize():
@@ -258,13 +285,20 @@ async def run_session():
 
 
 @app.command()
-def chat():
+def chat(
+    trace: Path | None = typer.Option(
+        None,
+        envvar="MCP_TRACE_FILE",
+        help="Append client and server spans to this Chrome trace file "
+        "(open it in https://ui.perfetto.dev)",
+    ),
+):
     if not validate_environment():
         console.print(f"\n{get_error_help_message()}")
         raise typer.Exit(1)
 
     try:
-        asyncio.run(run_session())
+        asyncio.run(run_session(trace))
     except KeyboardInterrupt:
         console.print("\n👋 Session interrupted. Goodbye!")
     except Exception as e:
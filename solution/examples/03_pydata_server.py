@@ -1,11 +1,16 @@
 import json
+import time
 import httpx
 from fastmcp import FastMCP
 from typing import Any
 
+from solution.servers.metrics import expose_metrics, metrics
+
 mcp = FastMCP(
     name="PyData Amsterdam Server",
 )
+# Call counts and latencies at metrics://server (and /metrics over HTTP)
+expose_metrics(mcp)
 
 @mcp.resource("resource://greeting")
 def get_greeting() -> str:
@@ -18,15 +23,19 @@ def get_greeting() -> str:
         description="Fetches schedule JSON data from the PyData Amsterdam 2025 conference online schedule",
         mime_type="application/json"
         )
+@metrics.instrument
 def get_pydata_schedule() -> json:
     """Fetches schedule JSON data from the PyData Amsterdam 2025 conference online schedule and returns it."""
     url = "https://cfp.pydata.org/pydata-amsterdam-2025/schedule/export/schedule.json"
+    started = time.perf_counter()
     resp = httpx.get(url)
+    metrics.observe_upstream("schedule", time.perf_counter() - started, str(resp.status_code))
     resp.raise_for_status()
     data = process_pydata_schedule(resp.json())
     return json.dumps(data)
 
 @mcp.prompt
+@metrics.instrument
 def linkedIn_post_generator(topic: str) -> str:
     """
     Generates a LinkedIn post for a given topic at the PyData Amsterdam 2025 conference.
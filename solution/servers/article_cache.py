@@ -0,0 +1,154 @@
+"""
+In-process article cache for the Wikipedia MCP servers.
+
+Agents tend to ask for the info, summary and content of the same article in
+quick succession. The cache keeps fetched pages in memory so those follow-up
+calls are served locally. Entries expire after a TTL and the cache is bounded
+by the total size of the stored text rather than by entry count, because
+article sizes range from a few kilobytes to several hundred.
+
+The cache is used from a single event loop and therefore needs no locking.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 60 * 60
+
+
+def normalize_title(title: str) -> str:
+    """Normalize a title the way MediaWiki does for lookups.
+
+    Underscores become spaces, runs of whitespace collapse, and the first
+    character is upper-cased, so "python_(programming  language)" and
+    "Python (programming language)" share one cache entry.
+    """
+    normalized = re.sub(r"\s+", " ", title.replace("_", " ")).strip()
+    return normalized[:1].upper() + normalized[1:]
+
+
+def article_key(title: str, language: str = "en", kind: str = "page") -> tuple:
+    """Build the cache key for an article lookup."""
+    return (language, normalize_title(title), kind)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+
+
+class ArticleCache:
+    """TTL cache with least-recently-used eviction bounded by total bytes.
+
+    Args:
+        max_bytes: Upper bound on the summed size of all cached values
+        ttl: Seconds an entry stays valid after it was stored
+        clock: Monotonic time source (overridable in tests)
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > self.clock()
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value for `key`, or None on a miss or expiry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= self.clock():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def put(self, key: Hashable, value: Any, size: int) -> bool:
+        """Store `value` under `key`, evicting old entries to make room.
+
+        Args:
+            key: Cache key, usually from `article_key`
+            value: Value to store
+            size: Size of the value in bytes
+
+        Returns:
+            False if the value alone exceeds `max_bytes` and was not stored
+        """
+        if key in self._entries:
+            self._remove(key)
+
+        if size > self.max_bytes:
+            return False
+
+        while self._entries and self._bytes + size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+        self._entries[key] = _Entry(value, size, self.clock() + self.ttl)
+        self._bytes += size
+        return True
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop `key` from the cache if present."""
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit, miss and eviction counters plus current usage."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
@@ -0,0 +1,201 @@
+"""
+Per-revision digest of an article's text structure.
+
+The summary and content tools used to re-split or re-scan the whole extract on
+every call. A digest parses a page once per revision into:
+
+- the normalized text (consistent newlines, no trailing whitespace);
+- sentence and paragraph end offsets, stored as compact integer arrays;
+- the section headings with their offsets.
+
+Tools then answer "the first N sentences" or "at most L characters, broken at
+a sentence or paragraph" with a binary search over the offsets, and long
+articles are split into chunks along the same boundaries.
+
+Sentences are found with a rule-based segmenter that understands
+abbreviations ("U.S.", "Dr.", "e.g."), initials ("J. R. R. Tolkien") and
+decimal numbers ("3.14"), and treats every paragraph end as a sentence end.
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+ABBREVIATIONS = frozenset(
+    "mr mrs ms dr prof sr jr st mt ft vs etc al fig no nos vol op ca approx "
+    "inc ltd co corp dept est gen gov col lt sgt rev jan feb mar apr jun jul "
+    "aug sep sept oct nov dec".split()
+)
+# A terminator run, optional closing quotes/brackets, then whitespace or the end
+SENTENCE_END = re.compile(r"(\S*?)([.!?]+)[\"'”’)\]]*(?=\s|$)")
+HEADING = re.compile(r"^(={2,6})\s*(.+?)\s*\1$", re.MULTILINE)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize newlines and whitespace of a plain-text extract.
+
+    Lines lose trailing whitespace and runs of blank lines collapse to one, so
+    offsets computed on the result are stable between revisions.
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"[ \t]+\n", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _is_sentence_end(text: str, word: str, terminator: str, end: int) -> bool:
+    """Decide whether a terminator at `end` closes a sentence."""
+    following = text[end : end + 3].lstrip()
+    if following and following[0].islower():
+        return False
+    if terminator != ".":
+        return True
+    word = word.lstrip("\"'“‘([")
+    if "." in word:  # "U.S.", "e.g."
+        return False
+    if len(word) == 1 and word.isalpha():  # an initial
+        return False
+    return word.lower() not in ABBREVIATIONS
+
+
+@dataclass(frozen=True)
+class Section:
+    """A section heading and the span of text it covers.
+
+    Offsets index into `ArticleDigest.text`: `start` is the heading line,
+    `body_start` the first character after it, and `end` the start of the
+    next heading of the same or a higher level (or the end of the text).
+    """
+
+    title: str
+    level: int
+    start: int
+    body_start: int
+    end: int
+
+
+class ArticleDigest:
+    """Sentence, paragraph and section offsets for one revision of a page.
+
+    Args:
+        text: Plain-text extract with wiki-style `== Heading ==` lines
+        revid: Revision the text belongs to, used to detect stale digests
+    """
+
+    def __init__(self, text: str, revid: int | None = None):
+        self.text = normalize_text(text)
+        self.revid = revid
+        self.sections = self._find_sections()
+        self.lead_end = self.sections[0].start if self.sections else len(self.text)
+        self.paragraph_ends, self.sentence_ends = self._find_boundaries()
+        self._chunk_ends: dict[int, array] = {}
+
+    def _find_sections(self) -> list[Section]:
+        headings = [
+            (m.start(), m.end(), len(m.group(1)), m.group(2))
+            for m in HEADING.finditer(self.text)
+        ]
+        sections = []
+        for i, (start, heading_end, level, title) in enumerate(headings):
+            end = next(
+                (s for s, _, lvl, _ in headings[i + 1 :] if lvl <= level),
+                len(self.text),
+            )
+            body_start = min(heading_end + 1, len(self.text))
+            sections.append(Section(title, level, start, body_start, end))
+        return sections
+
+    def _find_boundaries(self) -> tuple[array, array]:
+        text = self.text
+        heading_lines = {s.start for s in self.sections}
+        paragraph_ends = array("I")
+        sentence_ends = array("I")
+
+        line_start = 0
+        while line_start < len(text):
+            line_end = text.find("\n", line_start)
+            if line_end == -1:
+                line_end = len(text)
+            if line_start not in heading_lines and line_end > line_start:
+                for m in SENTENCE_END.finditer(text, line_start, line_end):
+                    if _is_sentence_end(text, m.group(1), m.group(2), m.end()):
+                        sentence_ends.append(m.end())
+                # A paragraph end always ends a sentence, punctuated or not
+                if not sentence_ends or sentence_ends[-1] != line_end:
+                    sentence_ends.append(line_end)
+                paragraph_ends.append(line_end)
+            line_start = line_end + 1
+        return paragraph_ends, sentence_ends
+
+    @property
+    def size(self) -> int:
+        """Approximate in-memory cost of the digest in bytes."""
+        return (
+            len(self.text.encode("utf-8"))
+            + self.paragraph_ends.itemsize * len(self.paragraph_ends)
+            + self.sentence_ends.itemsize * len(self.sentence_ends)
+        )
+
+    @property
+    def lead(self) -> str:
+        """Lead section (text before the first heading)."""
+        return self.text[: self.lead_end].strip()
+
+    def lead_sentences(self, count: int) -> str:
+        """Return the first `count` sentences of the lead section."""
+        available = bisect_right(self.sentence_ends, self.lead_end)
+        if available == 0:
+            return self.lead
+        return self.text[: self.sentence_ends[min(count, available) - 1]].strip()
+
+    def break_before(self, limit: int, start: int = 0) -> int:
+        """Last sentence or paragraph end in `text[start:limit]`.
+
+        Returns:
+            The offset of the boundary, or `start` if there is none
+        """
+        best = start
+        for ends in (self.sentence_ends, self.paragraph_ends):
+            i = bisect_right(ends, limit) - 1
+            if i >= 0 and ends[i] > best:
+                best = ends[i]
+        return best
+
+    def sentence_count(self, start: int = 0, end: int | None = None) -> int:
+        """Number of sentences ending within `text[start:end]`."""
+        end = len(self.text) if end is None else end
+        return bisect_right(self.sentence_ends, end) - bisect_left(
+            self.sentence_ends, start + 1
+        )
+
+    def chunk_ends(self, max_length: int) -> array:
+        """End offsets of consecutive chunks of at most `max_length` characters.
+
+        Chunks end at the last sentence or paragraph end that fits, and are
+        only cut mid-sentence when a single sentence is longer than
+        `max_length`. The result is computed once per chunk size.
+
+        Raises:
+            ValueError: If `max_length` is less than 1
+        """
+        if max_length < 1:
+            raise ValueError("Chunk length must be at least 1")
+        ends = self._chunk_ends.get(max_length)
+        if ends is None:
+            ends = array("I")
+            start, length = 0, len(self.text)
+            while start < length:
+                limit = start + max_length
+                end = length if limit >= length else self.break_before(limit, start)
+                if end <= start:
+                    end = limit
+                ends.append(end)
+                start = end
+            self._chunk_ends[max_length] = ends
+        return ends
+
+    def chunk(self, index: int, max_length: int) -> str:
+        """Return chunk number `index` (0-based) of the `max_length` split."""
+        ends = self.chunk_ends(max_length)
+        start = ends[index - 1] if index else 0
+        return self.text[start : ends[index]].strip()
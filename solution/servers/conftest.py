@@ -0,0 +1,59 @@
+"""Fixtures shared by the Wikipedia server tests."""
+
+import httpx
+import pytest
+
+from solution.advanced import wikipedia_server as advanced_server
+from solution.servers import wikipedia_client, wikipedia_server
+from solution.servers.metrics import metrics
+from solution.servers.persistent_cache import PersistentCache
+from solution.servers.prefetch import Prefetcher
+from solution.servers.search_index import SearchIndex
+from solution.servers.single_flight import SingleFlight
+from solution.servers.summary_memo import SummaryMemo
+from solution.servers.test_wikipedia_client import fake_wikimedia
+from solution.servers.wikipedia_client import WikipediaClient
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(tmp_path, monkeypatch):
+    store = PersistentCache(tmp_path / "cache.db")
+    memo = SummaryMemo(tmp_path / "cache.db")
+    monkeypatch.setattr(wikipedia_server, "persistent_cache", store)
+    # metrics.snapshot() reads the memo's stats, so it must not open the real DB
+    monkeypatch.setattr(advanced_server, "summary_memo", memo)
+    monkeypatch.setattr(wikipedia_server, "search_index", SearchIndex())
+    monkeypatch.setattr(wikipedia_server, "_search_index_warmed", False)
+    monkeypatch.setattr(wikipedia_server, "single_flight", SingleFlight())
+    monkeypatch.setattr(
+        wikipedia_server,
+        "prefetcher",
+        Prefetcher(
+            load=wikipedia_server._prefetch_article,
+            is_cached=wikipedia_server.prefetcher.is_cached,
+            should_stop=wikipedia_server._prefetch_should_stop,
+        ),
+    )
+    wikipedia_server.article_cache.clear()
+    metrics.reset()
+    yield
+    wikipedia_server.article_cache.clear()
+    memo.close()
+    store.close()
+
+
+@pytest.fixture
+def requests_seen() -> list[httpx.Request]:
+    return []
+
+
+@pytest.fixture
+def client(requests_seen: list[httpx.Request]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        return fake_wikimedia(request)
+
+    client = WikipediaClient(transport=httpx.MockTransport(handler))
+    wikipedia_client.set_client(client)
+    yield client
+    wikipedia_client.set_client(None)
@@ -0,0 +1,184 @@
+"""
+Extractive summaries: an article's most informative sentences.
+
+Sentences come from an `ArticleDigest` and are represented as L2-normalized
+TF-IDF vectors over the search index's terms. Two scorers are available:
+
+- "textrank" ranks sentences with PageRank over their cosine similarity
+  graph, so a sentence scores high when it is similar to many other
+  well-connected sentences;
+- "centroid" scores each sentence by its similarity to the sum of all
+  sentence vectors, i.e. to the article as a whole.
+
+The vectors are kept as sparse (row, column, weight) arrays and all scoring is
+vectorized with `np.bincount`. TextRank never builds the sentence x sentence
+similarity matrix: each power iteration multiplies by it as X (X^T p), which
+costs O(nonzeros) and keeps long articles (thousands of sentences) fast and
+small.
+
+The best sentences are then taken greedily until a token budget is full and
+returned in article order.
+"""
+
+from typing import Literal
+
+import numpy as np
+
+from solution.servers.article_digest import ArticleDigest
+from solution.servers.search_index import tokenize
+from solution.servers.summary_memo import estimate_tokens
+
+Method = Literal["textrank", "centroid"]
+
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+# Sentences with fewer terms carry too little to be worth a place
+MIN_TERMS = 3
+
+
+def sentences(digest: ArticleDigest) -> list[str]:
+    """Split a digest's text into sentences, without heading lines."""
+    text = digest.text
+    result = []
+    start = 0
+    for end in digest.sentence_ends:
+        # Sentences never span lines; anything before the last newline is a
+        # paragraph break or a heading
+        line_start = text.rfind("\n", start, end) + 1
+        result.append(text[max(start, line_start) : end].strip())
+        start = end
+    return result
+
+
+def sentence_vectors(
+    texts: list[str],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """Sparse L2-normalized TF-IDF vectors of `texts`.
+
+    Returns:
+        (rows, cols, weights, vocabulary size); row i holds sentence i
+    """
+    vocabulary: dict[str, int] = {}
+    rows: list[int] = []
+    cols: list[int] = []
+    for i, text in enumerate(texts):
+        terms = tokenize(text)
+        if len(terms) < MIN_TERMS:
+            continue
+        for term in terms:
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+        rows.extend([i] * len(terms))
+
+    size = len(vocabulary)
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0), size
+
+    # Merge repeated (sentence, term) pairs into term frequencies
+    keys, tf = np.unique(
+        np.asarray(rows, dtype=np.int64) * size + np.asarray(cols), return_counts=True
+    )
+    rows_array, cols_array = np.divmod(keys, size)
+    df = np.bincount(cols_array, minlength=size)
+    idf = np.log((len(texts) + 1) / (df + 1)) + 1
+    weights = (1 + np.log(tf)) * idf[cols_array]
+    norms = np.sqrt(np.bincount(rows_array, weights=weights**2, minlength=len(texts)))
+    weights /= norms[rows_array]
+    return rows_array, cols_array, weights, size
+
+
+def textrank_scores(texts: list[str]) -> np.ndarray:
+    """PageRank of each sentence in the cosine similarity graph."""
+    n = len(texts)
+    rows, cols, weights, size = sentence_vectors(texts)
+    if not len(rows):
+        return np.zeros(n)
+
+    def similarity_times(p: np.ndarray) -> np.ndarray:
+        # (X X^T - I_nonempty) p: similarities to the other sentences
+        projected = np.bincount(cols, weights=weights * p[rows], minlength=size)
+        return (
+            np.bincount(rows, weights=weights * projected[cols], minlength=n)
+            - self_similarity * p
+        )
+
+    self_similarity = np.bincount(rows, weights=weights**2, minlength=n)
+    degree = similarity_times(np.ones(n))
+    degree[degree <= 0] = 1.0
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / n + DAMPING * similarity_times(scores / degree)
+        converged = np.abs(updated - scores).sum() < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    scores[self_similarity == 0] = 0.0
+    return scores
+
+
+def centroid_scores(texts: list[str]) -> np.ndarray:
+    """Cosine similarity of each sentence to the sum of all sentences."""
+    n = len(texts)
+    rows, cols, weights, size = sentence_vectors(texts)
+    if not len(rows):
+        return np.zeros(n)
+    centroid = np.bincount(cols, weights=weights, minlength=size)
+    scores = np.bincount(rows, weights=weights * centroid[cols], minlength=n)
+    return scores / np.linalg.norm(centroid)
+
+
+def extract_summary(
+    digest: ArticleDigest, token_budget: int, method: Method = "textrank"
+) -> str:
+    """Pick the highest scoring sentences that fit in `token_budget` tokens.
+
+    Args:
+        digest: Digest of the article to summarize
+        token_budget: Maximum estimated tokens of the result
+        method: "textrank" or "centroid" sentence scoring
+
+    Returns:
+        The selected sentences in article order, one paragraph per original
+        paragraph
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in ("textrank", "centroid"):
+        raise ValueError(f"Unknown extractive method: {method}")
+    texts = sentences(digest)
+    if not texts:
+        return ""
+    if estimate_tokens(digest.text) <= token_budget:
+        return digest.text
+
+    scores = textrank_scores(texts) if method == "textrank" else centroid_scores(texts)
+    # Best first; ties keep article order, which favours the lead
+    order = np.lexsort((np.arange(len(texts)), -scores))
+    chosen = []
+    used = 0
+    for i in order.tolist():
+        if scores[i] <= 0:
+            break
+        cost = estimate_tokens(texts[i]) + 1
+        if used + cost <= token_budget:
+            chosen.append(i)
+            used += cost
+    if not chosen:
+        # No sentence fits the budget: cut the text at a boundary instead
+        limit = 4 * token_budget
+        return digest.text[: digest.break_before(limit) or limit].strip()
+
+    chosen.sort()
+    paragraph_ends = np.asarray(digest.paragraph_ends)
+    paragraphs = np.searchsorted(
+        paragraph_ends, np.asarray(digest.sentence_ends)[chosen]
+    )
+    parts = []
+    for k, i in enumerate(chosen):
+        if k:
+            parts.append(" " if paragraphs[k] == paragraphs[k - 1] else "\n\n")
+        parts.append(texts[i])
+    return "".join(parts)
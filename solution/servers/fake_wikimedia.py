@@ -0,0 +1,477 @@
+"""
+Local stand-in for the Wikimedia APIs, for offline and repeatable load tests.
+
+Timings measured against the live APIs are mostly network noise, and they
+can't be taken on a disconnected machine. This module serves the endpoints
+the Wikipedia client uses from fixture data:
+
+    GET /core/v1/wikipedia/{language}/search/page   Core API page search
+    GET /w/api.php?action=query                     extracts, info, categories
+                                                    and links, with continuation
+    GET /w/api.php?action=parse                     section lists, wikitext and
+                                                    section HTML
+
+Responses use the same shapes as Wikimedia (`formatversion=2` for the action
+API). Articles come from XML or JSONL dumps (the same formats as
+`local_corpus`) and/or are generated deterministically with `--synthetic`.
+
+Faults are configurable at startup and at runtime:
+
+- latency drawn from a log-normal distribution around a median;
+- a fraction of requests failing with an error status;
+- a token-bucket rate limit answered with 429 and Retry-After.
+
+Start it and point a server at it with WIKIPEDIA_API_URL:
+
+    uv run python -m solution.servers.fake_wikimedia --port 8089 --latency-ms 80
+    WIKIPEDIA_API_URL=http://127.0.0.1:8089 uv run solution/servers/wikipedia_server.py
+
+`GET /__fake__/stats` returns request counts per endpoint and status, and
+`POST /__fake__/config` with a JSON body of `FaultConfig` fields changes the
+faults of a running server.
+"""
+
+import asyncio
+import html
+import math
+import random
+import re
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any
+
+import typer
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from solution.servers.article_cache import normalize_title
+from solution.servers.article_digest import HEADING
+from solution.servers.local_corpus import DumpArticle, read_dump
+from solution.servers.search_index import SearchIndex, tokenize
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+DEFAULT_FIXTURES = (
+    FIXTURES_DIR / "sample_dump.xml",
+    FIXTURES_DIR / "sample_articles.jsonl",
+)
+
+# Batch sizes of the real action API: `pllimit=max` returns 500 links
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 500
+EXCERPT_LENGTH = 120
+
+
+@dataclass
+class FaultConfig:
+    """Latency, error and throttling behaviour of the fake server.
+
+    Args:
+        latency_ms: Median response latency
+        jitter: Sigma of the log-normal latency distribution (0 for fixed)
+        error_rate: Fraction of requests answered with `error_status`
+        error_status: Status code of injected errors
+        rate_limit: Sustained requests per second before 429s (0 for none)
+        burst: Requests allowed back-to-back under the rate limit
+        seed: Random seed, so latency and error sequences are repeatable
+    """
+
+    latency_ms: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    rate_limit: float = 0.0
+    burst: int = 10
+    seed: int = 0
+
+
+class FakeWikimedia:
+    """Fixture articles plus the fault model, shared by all request handlers.
+
+    Args:
+        articles: Articles to serve; redirects resolve to their targets
+        faults: Initial fault configuration
+        clock: Monotonic time source (overridable in tests)
+    """
+
+    def __init__(
+        self,
+        articles: list[DumpArticle],
+        faults: FaultConfig | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.pages: dict[str, DumpArticle] = {}
+        self.redirects: dict[str, str] = {}
+        self.index = SearchIndex()
+        for article in articles:
+            key = normalize_title(article.title)
+            if article.redirect:
+                self.redirects[key] = article.redirect
+                continue
+            self.pages[key] = article
+            self.index.add(article.title, article.text)
+        self.clock = clock
+        self.stats: dict[str, dict[str, int]] = {}
+        self.configure(faults or FaultConfig())
+
+    def configure(self, faults: FaultConfig) -> None:
+        """Replace the fault configuration and reset the rate limit bucket."""
+        self.faults = faults
+        self.random = random.Random(faults.seed)
+        self._tokens = float(faults.burst)
+        self._updated = self.clock()
+
+    def _count(self, endpoint: str, status: int) -> None:
+        counts = self.stats.setdefault(endpoint, {})
+        counts[str(status)] = counts.get(str(status), 0) + 1
+
+    def _throttle(self) -> float | None:
+        """Take a rate limit token, or return seconds until one is available."""
+        rate = self.faults.rate_limit
+        if rate <= 0:
+            return None
+        now = self.clock()
+        self._tokens = min(
+            self.faults.burst, self._tokens + (now - self._updated) * rate
+        )
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return None
+        return (1 - self._tokens) / rate
+
+    def latency(self) -> float:
+        """Draw one response latency in seconds."""
+        median = self.faults.latency_ms / 1000
+        if median <= 0:
+            return 0.0
+        if self.faults.jitter <= 0:
+            return median
+        return median * math.exp(self.random.gauss(0, self.faults.jitter))
+
+    async def respond(
+        self,
+        endpoint: str,
+        handler: Callable[[Any], dict[str, Any]],
+        request: Request,
+    ) -> Response:
+        """Apply the fault model, then answer with `handler(query_params)`."""
+        wait = self._throttle()
+        if wait is not None:
+            self._count(endpoint, 429)
+            return JSONResponse(
+                {"error": "rate limited"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+        delay = self.latency()
+        failed = self.random.random() < self.faults.error_rate
+        if delay:
+            await asyncio.sleep(delay)
+        if failed:
+            self._count(endpoint, self.faults.error_status)
+            return JSONResponse(
+                {"error": "injected failure"}, status_code=self.faults.error_status
+            )
+
+        self._count(endpoint, 200)
+        if request.method == "HEAD":
+            return Response(status_code=200)
+        return JSONResponse(handler(request.query_params))
+
+    def resolve(self, title: str) -> tuple[DumpArticle | None, str | None]:
+        """Look up a title, following one redirect.
+
+        Returns:
+            The article (or None) and the redirect target if one was followed
+        """
+        key = normalize_title(title)
+        target = self.redirects.get(key)
+        if target is not None:
+            key = normalize_title(target)
+        return self.pages.get(key), target
+
+    def search(self, params: Any) -> dict[str, Any]:
+        """Core API `search/page` response."""
+        limit = min(int(params.get("limit", DEFAULT_LIMIT)), 100)
+        query = params.get("q", "")
+        pages = []
+        for title in self.index.search(query, limit):
+            article = self.pages[normalize_title(title)]
+            pages.append(
+                {
+                    "id": article.pageid,
+                    "key": article.title.replace(" ", "_"),
+                    "title": article.title,
+                    "excerpt": _excerpt(article.text, tokenize(query)),
+                    "matched_title": None,
+                    "description": None,
+                    "thumbnail": None,
+                }
+            )
+        return {"pages": pages}
+
+    def action(self, params: Any) -> dict[str, Any]:
+        """MediaWiki action API response."""
+        action = params.get("action")
+        if action == "query":
+            return self.query(params)
+        if action == "parse":
+            return self.parse(params)
+        return {"error": {"code": "badvalue", "info": f"Unsupported action {action}"}}
+
+    def query(self, params: Any) -> dict[str, Any]:
+        """`action=query` with `titles` and the extracts/info/categories/links props."""
+        props = set(params.get("prop", "").split("|"))
+        pages: list[dict[str, Any]] = []
+        redirects: list[dict[str, str]] = []
+        continuation: dict[str, str] = {}
+
+        for title in filter(None, params.get("titles", "").split("|")):
+            article, target = self.resolve(title)
+            if target is not None:
+                redirects.append({"from": title, "to": target})
+            if article is None:
+                pages.append({"title": target or title, "missing": True})
+                continue
+
+            page: dict[str, Any] = {
+                "pageid": article.pageid,
+                "ns": 0,
+                "title": article.title,
+            }
+            if "extracts" in props:
+                page["extract"] = article.text
+            if "info" in props:
+                page["lastrevid"] = article.revid
+                page["length"] = len(article.text.encode("utf-8"))
+                if "url" in params.get("inprop", ""):
+                    url = f"https://en.wikipedia.org/wiki/{article.title.replace(' ', '_')}"
+                    page["fullurl"] = url
+            if "categories" in props:
+                page["categories"] = _batch(
+                    [{"ns": 14, "title": c} for c in article.categories or []],
+                    params,
+                    "cl",
+                    article.pageid,
+                    continuation,
+                )
+            if "links" in props:
+                page["links"] = _batch(
+                    [{"ns": 0, "title": t} for t in _link_titles(article)],
+                    params,
+                    "pl",
+                    article.pageid,
+                    continuation,
+                )
+            pages.append(page)
+
+        body: dict[str, Any] = {"batchcomplete": not continuation, "query": {}}
+        if redirects:
+            body["query"]["redirects"] = redirects
+        body["query"]["pages"] = pages
+        if continuation:
+            body["continue"] = {**continuation, "continue": "||"}
+        return body
+
+    def parse(self, params: Any) -> dict[str, Any]:
+        """`action=parse` for `prop=sections`, `prop=wikitext` and `prop=text`."""
+        article, _ = self.resolve(params.get("page", ""))
+        if article is None:
+            return {
+                "error": {"code": "missingtitle", "info": "The page doesn't exist."}
+            }
+
+        headings = list(HEADING.finditer(article.text))
+        if params.get("prop") == "sections":
+            sections = [
+                {
+                    "toclevel": len(m.group(1)) - 1,
+                    "level": str(len(m.group(1))),
+                    "line": html.escape(m.group(2)),
+                    "index": str(i),
+                }
+                for i, m in enumerate(headings, start=1)
+            ]
+            return {"parse": {"title": article.title, "sections": sections}}
+
+        section = params.get("section")
+        text = article.text
+        if section is not None:
+            i = int(section)
+            if i == 0:
+                text = text[: headings[0].start()] if headings else text
+            elif i <= len(headings):
+                level = len(headings[i - 1].group(1))
+                end = next(
+                    (m.start() for m in headings[i:] if len(m.group(1)) <= level),
+                    len(text),
+                )
+                text = text[headings[i - 1].start() : end]
+            else:
+                return {"error": {"code": "nosuchsection", "info": f"No section {i}."}}
+        if params.get("prop") == "text":
+            return {"parse": {"title": article.title, "text": _render(text)}}
+        return {"parse": {"title": article.title, "wikitext": text.strip()}}
+
+
+def _render(text: str) -> str:
+    """HTML for wiki-formatted plain text, shaped like parse API output."""
+    parts = []
+    for line in text.strip().splitlines():
+        if match := HEADING.fullmatch(line):
+            level = len(match.group(1))
+            parts.append(
+                f'<div class="mw-heading mw-heading{level}">'
+                f"<h{level}>{html.escape(match.group(2))}</h{level}></div>"
+            )
+        elif line.strip():
+            parts.append(f"<p>{html.escape(line)}</p>")
+    return '<div class="mw-parser-output">' + "\n".join(parts) + "</div>"
+
+
+def _excerpt(text: str, terms: list[str]) -> str:
+    """Leading text with query terms wrapped like Wikimedia search matches."""
+    excerpt = html.escape(text[:EXCERPT_LENGTH].split("\n==", 1)[0].strip())
+    if not terms:
+        return excerpt
+    pattern = re.compile(r"\b(" + "|".join(map(re.escape, terms)) + r")\b", re.I)
+    return pattern.sub(r'<span class="searchmatch">\1</span>', excerpt)
+
+
+def _link_titles(article: DumpArticle) -> list[str]:
+    # Dumps only record how many links an article has
+    return [f"{article.title} link {i}" for i in range(1, article.links_count + 1)]
+
+
+def _batch(
+    items: list[dict[str, Any]],
+    params: Any,
+    prefix: str,
+    pageid: int,
+    continuation: dict[str, str],
+) -> list[dict[str, Any]]:
+    """Return one `{prefix}limit` batch of items, recording continuation."""
+    limit = params.get(f"{prefix}limit", str(DEFAULT_LIMIT))
+    limit = MAX_LIMIT if limit == "max" else min(int(limit), MAX_LIMIT)
+    offset = 0
+    token = params.get(f"{prefix}continue")
+    if token:
+        page, _, position = token.split("|")
+        offset = int(position) if int(page) == pageid else 0
+    if offset + limit < len(items):
+        continuation[f"{prefix}continue"] = f"{pageid}|0|{offset + limit}"
+    return items[offset : offset + limit]
+
+
+def synthetic_articles(
+    count: int, paragraphs: int = 8, seed: int = 0
+) -> list[DumpArticle]:
+    """Generate `count` deterministic articles of `paragraphs` sections each."""
+    rng = random.Random(seed)
+    words = [f"term{i}" for i in range(2000)]
+    articles = []
+    for n in range(1, count + 1):
+        title = f"Synthetic article {n}"
+        parts = [f"{title} is an article about {rng.choice(words)}."]
+        for section in range(1, paragraphs):
+            sentences = " ".join(
+                " ".join(rng.choices(words, k=rng.randint(8, 20))).capitalize() + "."
+                for _ in range(rng.randint(3, 8))
+            )
+            parts.append(f"== Section {section} ==\n{sentences}")
+        articles.append(
+            DumpArticle(
+                title=title,
+                text="\n\n".join(parts),
+                pageid=1_000_000 + n,
+                revid=2_000_000 + n,
+                categories=[f"Category:Synthetic {n % 10}"],
+                links_count=rng.randint(0, 800),
+            )
+        )
+    return articles
+
+
+def create_app(fake: FakeWikimedia) -> Starlette:
+    """Build the ASGI app serving `fake`."""
+
+    async def search(request: Request) -> Response:
+        return await fake.respond("search", fake.search, request)
+
+    async def action(request: Request) -> Response:
+        return await fake.respond("action", fake.action, request)
+
+    async def core_root(request: Request) -> Response:
+        return await fake.respond("search", lambda params: {}, request)
+
+    async def stats(request: Request) -> Response:
+        return JSONResponse({"faults": asdict(fake.faults), "requests": fake.stats})
+
+    async def configure(request: Request) -> Response:
+        body = await request.json()
+        known = {f.name for f in fields(FaultConfig)}
+        unknown = set(body) - known
+        if unknown:
+            return JSONResponse(
+                {"error": f"Unknown fault options: {sorted(unknown)}"}, status_code=400
+            )
+        fake.configure(FaultConfig(**{**asdict(fake.faults), **body}))
+        fake.stats.clear()
+        return JSONResponse({"faults": asdict(fake.faults)})
+
+    return Starlette(
+        routes=[
+            Route("/core/v1/wikipedia/{language}/search/page", search),
+            Route("/core/v1/wikipedia/{language}", core_root, methods=["GET", "HEAD"]),
+            Route("/w/api.php", action, methods=["GET", "HEAD"]),
+            Route("/__fake__/stats", stats),
+            Route("/__fake__/config", configure, methods=["POST"]),
+        ]
+    )
+
+
+def load_articles(fixtures: list[Path], synthetic: int = 0) -> list[DumpArticle]:
+    """Read fixture dumps and append `synthetic` generated articles."""
+    articles = [article for path in fixtures for article in read_dump(path)]
+    return articles + synthetic_articles(synthetic)
+
+
+def main(
+    host: str = typer.Option("127.0.0.1", help="Interface to listen on"),
+    port: int = typer.Option(8089, help="Port to listen on"),
+    fixtures: list[Path] = typer.Option(
+        list(DEFAULT_FIXTURES), "--fixture", help="XML or JSONL dump to serve"
+    ),
+    synthetic: int = typer.Option(0, help="Generated articles to add"),
+    latency_ms: float = typer.Option(0.0, help="Median response latency"),
+    jitter: float = typer.Option(0.0, help="Log-normal latency sigma"),
+    error_rate: float = typer.Option(0.0, help="Fraction of failed requests"),
+    error_status: int = typer.Option(503, help="Status of failed requests"),
+    rate_limit: float = typer.Option(0.0, help="Requests/second before 429s"),
+    burst: int = typer.Option(10, help="Burst size of the rate limit"),
+    seed: int = typer.Option(0, help="Random seed for latency and errors"),
+) -> None:
+    """Serve fixture articles through a fake Wikimedia API."""
+    import uvicorn
+
+    faults = FaultConfig(
+        latency_ms=latency_ms,
+        jitter=jitter,
+        error_rate=error_rate,
+        error_status=error_status,
+        rate_limit=rate_limit,
+        burst=burst,
+        seed=seed,
+    )
+    fake = FakeWikimedia(load_articles(fixtures, synthetic), faults)
+    typer.echo(f"Serving {len(fake.pages)} articles on http://{host}:{port}")
+    uvicorn.run(create_app(fake), host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,472 @@
+"""
+Pipelined load generator for MCP servers.
+
+The test harness in `test_wikipedia_server.py` sends one request at a time
+and blocks on each response, so it can't say anything about concurrency or
+throughput. This tool talks JSON-RPC to a server the way a real client does:
+
+- it starts a server script over stdio, or connects to a streamable HTTP
+  endpoint, and performs the initialize handshake;
+- requests are pipelined, so many are in flight at once and responses are
+  matched back to their callers by JSON-RPC id;
+- a scripted mix of tool calls is replayed at a target rate (open loop), with
+  a cap on requests in flight.
+
+Latency is measured from the moment a request was scheduled to be sent, so a
+server that falls behind shows up in the percentiles instead of silently
+lowering the request rate.
+
+A mix is a JSON file listing tool calls with optional weights:
+
+    {"calls": [
+        {"tool": "search_wikipedia", "arguments": {"query": "python"}, "weight": 3},
+        {"tool": "get_article_summary", "arguments": {"title": "Python"}}
+    ]}
+
+Run it against a server script or URL and get a JSON report with throughput,
+latency percentiles and error rates:
+
+    uv run python -m solution.servers.load_generator \\
+        solution/servers/wikipedia_server.py --mix mix.json --rate 50 --duration 10
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import random
+import shlex
+import sys
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+import typer
+from mcp.types import LATEST_PROTOCOL_VERSION
+
+CLIENT_INFO = {"name": "mcp-load-generator", "version": "1.0"}
+PERCENTILES = (50, 90, 95, 99)
+
+
+class RpcError(Exception):
+    """A JSON-RPC error response."""
+
+    def __init__(self, error: dict[str, Any]):
+        super().__init__(error.get("message", "JSON-RPC error"))
+        self.code = error.get("code")
+
+
+class StdioTransport:
+    """JSON-RPC over a server subprocess's stdin and stdout.
+
+    Args:
+        command: Server command line, e.g. `[sys.executable, "server.py"]`
+        env: Extra environment variables for the server
+    """
+
+    def __init__(self, command: list[str], env: dict[str, str] | None = None):
+        self.command = command
+        self.env = env
+        self.on_message: Callable[[dict[str, Any]], None] = lambda message: None
+        self._process: asyncio.subprocess.Process | None = None
+        self._reader: asyncio.Task | None = None
+        self.non_json_lines = 0
+
+    async def start(self) -> None:
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env={**os.environ, **(self.env or {})},
+            # Long article responses exceed the default 64 KiB line limit
+            limit=64 * 1024 * 1024,
+        )
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        assert self._process is not None and self._process.stdout is not None
+        while line := await self._process.stdout.readline():
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                # e.g. a startup banner printed to stdout
+                self.non_json_lines += 1
+                continue
+            self.on_message(message)
+        self.on_message({"closed": True})
+
+    async def send(self, message: dict[str, Any]) -> None:
+        assert self._process is not None and self._process.stdin is not None
+        self._process.stdin.write(json.dumps(message).encode() + b"\n")
+        await self._process.stdin.drain()
+
+    async def close(self) -> None:
+        if self._process is None:
+            return
+        if self._process.stdin is not None:
+            self._process.stdin.close()
+        try:
+            await asyncio.wait_for(self._process.wait(), timeout=5)
+        except TimeoutError:
+            self._process.kill()
+            await self._process.wait()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+
+class HttpTransport:
+    """JSON-RPC over the MCP streamable HTTP transport.
+
+    Each message is its own POST, answered with JSON or a short SSE stream,
+    so requests overlap up to the connection pool size.
+
+    Args:
+        url: MCP endpoint, e.g. `http://127.0.0.1:8000/mcp`
+        max_connections: Connection pool size
+    """
+
+    def __init__(self, url: str, max_connections: int = 100):
+        self.url = url
+        self.on_message: Callable[[dict[str, Any]], None] = lambda message: None
+        self.headers = {
+            "Accept": "application/json, text/event-stream",
+            "Content-Type": "application/json",
+        }
+        self._http = httpx.AsyncClient(
+            timeout=None,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._posts: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        pass
+
+    async def send(self, message: dict[str, Any]) -> None:
+        task = asyncio.create_task(self._post(message))
+        self._posts.add(task)
+        task.add_done_callback(self._posts.discard)
+        if message.get("method") == "initialize":
+            # The session id arrives with the response; wait for it
+            await task
+
+    async def _post(self, message: dict[str, Any]) -> None:
+        try:
+            async with self._http.stream(
+                "POST", self.url, json=message, headers=self.headers
+            ) as response:
+                if "mcp-session-id" in response.headers:
+                    self.headers["mcp-session-id"] = response.headers["mcp-session-id"]
+                if response.status_code == 202:
+                    return
+                response.raise_for_status()
+                if response.headers.get("content-type", "").startswith(
+                    "text/event-stream"
+                ):
+                    async for line in response.aiter_lines():
+                        if line.startswith("data:"):
+                            self.on_message(json.loads(line[5:]))
+                else:
+                    self.on_message(json.loads(await response.aread()))
+        except httpx.HTTPError as e:
+            if "id" in message:
+                self.on_message(
+                    {"id": message["id"], "error": {"code": -32000, "message": str(e)}}
+                )
+
+    async def close(self) -> None:
+        if self._posts:
+            await asyncio.gather(*self._posts, return_exceptions=True)
+        if "mcp-session-id" in self.headers:
+            try:
+                await self._http.delete(self.url, headers=self.headers)
+            except httpx.HTTPError:
+                pass
+        await self._http.aclose()
+
+
+class McpConnection:
+    """Pipelined MCP client session over a transport.
+
+    Requests get increasing JSON-RPC ids; responses resolve the matching
+    future, in whatever order the server sends them.
+    """
+
+    def __init__(self, transport: StdioTransport | HttpTransport):
+        self.transport = transport
+        transport.on_message = self._dispatch
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self.server_info: dict[str, Any] = {}
+
+    def _dispatch(self, message: dict[str, Any]) -> None:
+        if message.get("closed"):
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Server closed the stream"))
+            return
+        if "method" in message:
+            if "id" in message:
+                # Server-to-client request (ping, sampling, ...)
+                asyncio.ensure_future(self._answer(message))
+            return
+        future = self._pending.pop(message.get("id"), None)
+        if future is None or future.done():
+            return
+        if "error" in message:
+            future.set_exception(RpcError(message["error"]))
+        else:
+            future.set_result(message.get("result"))
+
+    async def _answer(self, message: dict[str, Any]) -> None:
+        if message["method"] == "ping":
+            reply = {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+        else:
+            error = {"code": -32601, "message": "Not supported by load generator"}
+            reply = {"jsonrpc": "2.0", "id": message["id"], "error": error}
+        await self.transport.send(reply)
+
+    async def request(self, method: str, params: dict[str, Any] | None = None) -> Any:
+        """Send a request and wait for its result.
+
+        Raises:
+            RpcError: If the server answers with a JSON-RPC error
+        """
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        try:
+            await self.transport.send(message)
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def notify(self, method: str, params: dict[str, Any] | None = None) -> None:
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self.transport.send(message)
+
+    async def __aenter__(self) -> "McpConnection":
+        await self.transport.start()
+        try:
+            result = await self.request(
+                "initialize",
+                {
+                    "protocolVersion": LATEST_PROTOCOL_VERSION,
+                    "capabilities": {},
+                    "clientInfo": CLIENT_INFO,
+                },
+            )
+            if isinstance(self.transport, HttpTransport):
+                self.transport.headers["mcp-protocol-version"] = result[
+                    "protocolVersion"
+                ]
+            self.server_info = result.get("serverInfo", {})
+            await self.notify("notifications/initialized")
+        except BaseException:
+            await self.transport.close()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.transport.close()
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+        return await self.request("tools/call", {"name": name, "arguments": arguments})
+
+
+@dataclass
+class ToolCall:
+    """One entry of a workload mix."""
+
+    tool: str
+    arguments: dict[str, Any] = field(default_factory=dict)
+    weight: float = 1.0
+
+
+def load_mix(path: Path) -> list[ToolCall]:
+    """Read a workload mix JSON file."""
+    calls = json.loads(path.read_text())["calls"]
+    return [ToolCall(**call) for call in calls]
+
+
+@dataclass
+class Sample:
+    tool: str
+    latency: float
+    outcome: str  # "ok", "tool_error", "rpc_error", "timeout" or "disconnected"
+
+
+def _percentile(ordered: list[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))]
+
+
+def _latency_summary(latencies: list[float]) -> dict[str, float]:
+    ordered = sorted(latencies)
+    summary = {f"p{p}_ms": 1000 * _percentile(ordered, p) for p in PERCENTILES}
+    summary["max_ms"] = 1000 * ordered[-1] if ordered else 0.0
+    summary["mean_ms"] = 1000 * sum(ordered) / len(ordered) if ordered else 0.0
+    return summary
+
+
+def build_report(
+    samples: list[Sample], elapsed: float, settings: dict[str, Any]
+) -> dict[str, Any]:
+    """Summarize samples into throughput, latency and error figures."""
+    outcomes = Counter(sample.outcome for sample in samples)
+    ok = [sample.latency for sample in samples if sample.outcome == "ok"]
+    tools: dict[str, Any] = {}
+    for name in sorted({sample.tool for sample in samples}):
+        mine = [sample for sample in samples if sample.tool == name]
+        tools[name] = {
+            "requests": len(mine),
+            "errors": sum(sample.outcome != "ok" for sample in mine),
+            "latency": _latency_summary(
+                [sample.latency for sample in mine if sample.outcome == "ok"]
+            ),
+        }
+    return {
+        **settings,
+        "elapsed_s": round(elapsed, 3),
+        "requests": len(samples),
+        "completed": outcomes["ok"],
+        "errors": {k: v for k, v in outcomes.items() if k != "ok"},
+        "error_rate": 1 - outcomes["ok"] / len(samples) if samples else 0.0,
+        "throughput_rps": outcomes["ok"] / elapsed if elapsed else 0.0,
+        "latency": _latency_summary(ok),
+        "tools": tools,
+    }
+
+
+async def run_load(
+    connection: McpConnection,
+    mix: list[ToolCall],
+    rate: float,
+    requests: int = 0,
+    concurrency: int = 64,
+    timeout: float = 30.0,
+    seed: int = 0,
+    duration: float | None = None,
+) -> dict[str, Any]:
+    """Replay calls drawn from `mix` at `rate` requests per second.
+
+    The run stops after `requests` calls, or once `duration` seconds of calls
+    have been scheduled when `requests` is 0.
+
+    Args:
+        connection: An initialized connection
+        mix: Weighted tool calls to draw from
+        rate: Target arrival rate (0 sends as fast as `concurrency` allows)
+        requests: Number of calls to make (0: run for `duration`)
+        concurrency: Maximum requests in flight
+        timeout: Seconds before a call counts as timed out
+        seed: Random seed for the order of calls
+        duration: Seconds to keep sending calls when `requests` is 0
+
+    Returns:
+        The report from `build_report`
+    """
+    if not requests and duration is None:
+        raise ValueError("Either requests or duration is required")
+    rng = random.Random(seed)
+    weights = [call.weight for call in mix]
+    slots = asyncio.Semaphore(concurrency)
+    samples: list[Sample] = []
+
+    async def one(call: ToolCall, scheduled: float) -> None:
+        try:
+            result = await asyncio.wait_for(
+                connection.call_tool(call.tool, call.arguments), timeout
+            )
+            outcome = "tool_error" if result.get("isError") else "ok"
+        except TimeoutError:
+            outcome = "timeout"
+        except RpcError:
+            outcome = "rpc_error"
+        except ConnectionError:
+            outcome = "disconnected"
+        finally:
+            slots.release()
+        samples.append(Sample(call.tool, time.perf_counter() - scheduled, outcome))
+
+    started = time.perf_counter()
+    tasks = []
+    for i in itertools.count():
+        scheduled = started + i / rate if rate > 0 else time.perf_counter()
+        done = i == requests if requests else scheduled - started >= duration
+        if done:
+            break
+        call = rng.choices(mix, weights)[0]
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await slots.acquire()
+        tasks.append(asyncio.create_task(one(call, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    settings = {
+        "server": connection.server_info.get("name"),
+        "target_rate": rate,
+        "concurrency": concurrency,
+    }
+    return build_report(samples, elapsed, settings)
+
+
+def connect(target: str, env: dict[str, str] | None = None) -> McpConnection:
+    """Connect to an `http(s)://` MCP endpoint or a server command or script."""
+    if target.startswith(("http://", "https://")):
+        return McpConnection(HttpTransport(target))
+    command = shlex.split(target)
+    if command[0].endswith(".py"):
+        command = [sys.executable, *command]
+    return McpConnection(StdioTransport(command, env))
+
+
+def main(
+    target: str = typer.Argument(..., help="Server script/command or MCP URL"),
+    mix: Path = typer.Option(..., help="JSON file with the tool call mix"),
+    rate: float = typer.Option(10.0, help="Target requests per second (0: max)"),
+    duration: float = typer.Option(10.0, help="Seconds of load to send"),
+    requests: int = typer.Option(0, help="Number of calls (overrides --duration)"),
+    concurrency: int = typer.Option(64, help="Maximum requests in flight"),
+    timeout: float = typer.Option(30.0, help="Seconds before a call times out"),
+    seed: int = typer.Option(0, help="Random seed for the call order"),
+    output: Path | None = typer.Option(None, help="Write the JSON report here"),
+) -> None:
+    """Run a tool call mix against an MCP server and report the results."""
+
+    async def run() -> dict[str, Any]:
+        async with connect(target) as connection:
+            return await run_load(
+                connection,
+                load_mix(mix),
+                rate,
+                requests,
+                concurrency,
+                timeout,
+                seed,
+                duration,
+            )
+
+    report = json.dumps(asyncio.run(run()), indent=2)
+    if output:
+        output.write_text(report + "\n")
+    typer.echo(report)
+
+
+if __name__ == "__main__":
+    typer.run(main)
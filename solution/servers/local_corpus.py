@@ -0,0 +1,429 @@
+"""
+Offline Wikipedia backend served from a local, pre-processed corpus.
+
+For air-gapped runs and high-throughput benchmarks the Wikipedia servers can
+read articles from disk instead of the live API. A dump is ingested once into
+a compact corpus directory:
+
+    corpus.json   manifest (format version, language, article count)
+    texts.bin     UTF-8 article texts, each followed by a small JSON meta blob
+    keys.bin      normalized titles, concatenated
+    index.bin     fixed-width records sorted by title
+    search_index.json, postings.bin   BM25 full-text index (see search_index)
+
+The texts, keys and index files are memory-mapped. A title lookup is a binary
+search over `index.bin` (O(log n)) and article text is decoded straight out of
+the mapped `texts.bin` without intermediate copies.
+
+Build a corpus from a MediaWiki XML dump or a JSONL extract (optionally
+bz2-compressed):
+
+    uv run python -m solution.servers.local_corpus build enwiki.xml.bz2 corpus/
+
+then start a server with WIKIPEDIA_BACKEND=local and WIKIPEDIA_CORPUS=corpus/.
+"""
+
+import asyncio
+import bz2
+import json
+import mmap
+import re
+import struct
+import xml.etree.ElementTree as ET
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+import typer
+
+from solution.servers.article_cache import normalize_title
+from solution.servers.search_index import SearchIndex
+from solution.servers.wikipedia_client import ProgressCallback, WikiPage
+
+FORMAT_VERSION = 1
+
+# key_offset, key_length, text_offset, text_length, meta_length, pageid, revid
+RECORD = struct.Struct("<QIQIIQQ")
+
+
+@dataclass
+class DumpArticle:
+    """One article as read from a dump, before it is written to the corpus."""
+
+    title: str
+    text: str
+    pageid: int = 0
+    revid: int = 0
+    categories: list[str] | None = None
+    links_count: int = 0
+    redirect: str | None = None
+
+
+def _open_dump(path: Path) -> IO[bytes]:
+    if path.suffix == ".bz2":
+        return bz2.open(path, "rb")
+    return path.open("rb")
+
+
+def read_jsonl_dump(path: Path) -> Iterator[DumpArticle]:
+    """Read a JSONL extract (one `{"title", "text", ...}` object per line)."""
+    with _open_dump(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield DumpArticle(
+                title=record["title"],
+                text=record.get("text", ""),
+                pageid=int(record.get("id") or record.get("pageid") or 0),
+                revid=int(record.get("revid") or 0),
+                categories=record.get("categories"),
+                links_count=int(record.get("links_count") or 0),
+                redirect=record.get("redirect"),
+            )
+
+
+_WIKILINK = re.compile(r"\[\[([^\[\]|]+)(?:\|([^\[\]]*))?\]\]")
+_CATEGORY = re.compile(r"\[\[Category:([^\]|]+)(?:\|[^\]]*)?\]\]")
+_TEMPLATE = re.compile(r"\{\{[^{}]*\}\}")
+_REF = re.compile(r"<ref[^>/]*/>|<ref[^>]*>.*?</ref>", re.DOTALL)
+_TAG = re.compile(r"<[^>]+>")
+_FILE_LINK = re.compile(r"\[\[(?:File|Image):[^\[\]]*(?:\[\[[^\]]*\]\][^\[\]]*)*\]\]")
+
+
+def wikitext_to_plain(wikitext: str) -> str:
+    """Reduce wikitext to plain text with `== Heading ==` section markers.
+
+    This is a light clean-up for offline use, not a full parser: templates,
+    references, files, categories and markup are dropped and links are
+    replaced by their label.
+    """
+    text = _REF.sub("", wikitext)
+    while _TEMPLATE.search(text):
+        text = _TEMPLATE.sub("", text)
+    text = _FILE_LINK.sub("", text)
+    text = _CATEGORY.sub("", text)
+    text = _WIKILINK.sub(lambda m: m.group(2) or m.group(1), text)
+    text = _TAG.sub("", text)
+    text = text.replace("'''", "").replace("''", "")
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def read_xml_dump(path: Path) -> Iterator[DumpArticle]:
+    """Stream main-namespace articles from a MediaWiki XML export."""
+    with _open_dump(path) as f:
+        events = ET.iterparse(f, events=("start", "end"))
+        # The root keeps every parsed page as a child; it is emptied after
+        # each page so memory use doesn't grow with the dump
+        _, root = next(events)
+        for event, elem in events:
+            if event != "end" or elem.tag.rsplit("}", 1)[-1] != "page":
+                continue
+
+            fields = {child.tag.rsplit("}", 1)[-1]: child for child in elem}
+            if fields.get("ns") is not None and fields["ns"].text != "0":
+                root.clear()
+                continue
+
+            revision = fields.get("revision")
+            wikitext, revid = "", 0
+            if revision is not None:
+                for child in revision:
+                    name = child.tag.rsplit("}", 1)[-1]
+                    if name == "text":
+                        wikitext = child.text or ""
+                    elif name == "id":
+                        revid = int(child.text or 0)
+
+            redirect = fields.get("redirect")
+            yield DumpArticle(
+                title=fields["title"].text or "",
+                text="" if redirect is not None else wikitext_to_plain(wikitext),
+                pageid=int(fields["id"].text or 0) if "id" in fields else 0,
+                revid=revid,
+                categories=[
+                    f"Category:{c.strip()}" for c in _CATEGORY.findall(wikitext)
+                ],
+                links_count=sum(
+                    1
+                    for target, _ in _WIKILINK.findall(wikitext)
+                    if not target.startswith(("Category:", "File:", "Image:"))
+                ),
+                redirect=redirect.get("title") if redirect is not None else None,
+            )
+            root.clear()
+
+
+def read_dump(path: Path) -> Iterator[DumpArticle]:
+    """Read a dump, picking the parser from the file name."""
+    name = path.name.removesuffix(".bz2")
+    if name.endswith((".jsonl", ".json", ".ndjson")):
+        return read_jsonl_dump(path)
+    return read_xml_dump(path)
+
+
+def build_corpus(
+    articles: Iterator[DumpArticle], out_dir: Path, language: str = "en"
+) -> int:
+    """Write articles into a corpus directory.
+
+    Texts are streamed to disk as they are read; only titles and offsets are
+    held in memory until the sorted index is written. A BM25 search index
+    over the article texts is built alongside.
+
+    Returns:
+        Number of articles (including redirects) written
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    entries: dict[bytes, tuple[int, int, int, int, int]] = {}
+    search_index = SearchIndex()
+
+    with (out_dir / "texts.bin").open("wb") as texts:
+        offset = 0
+        for article in articles:
+            key = normalize_title(article.title).encode("utf-8")
+            text = article.text.encode("utf-8")
+            meta: dict[str, Any] = {
+                "categories": article.categories or [],
+                "links_count": article.links_count,
+            }
+            if article.redirect:
+                meta["redirect"] = article.redirect
+            meta_bytes = json.dumps(meta).encode("utf-8")
+
+            texts.write(text)
+            texts.write(meta_bytes)
+            if not article.redirect:
+                search_index.add(article.title, article.text)
+            # Later duplicates win, matching a dump with several revisions
+            entries[key] = (
+                offset,
+                len(text),
+                len(meta_bytes),
+                article.pageid,
+                article.revid,
+            )
+            offset += len(text) + len(meta_bytes)
+
+    with (
+        (out_dir / "keys.bin").open("wb") as keys,
+        (out_dir / "index.bin").open("wb") as index,
+    ):
+        key_offset = 0
+        for key in sorted(entries):
+            text_offset, text_len, meta_len, pageid, revid = entries[key]
+            keys.write(key)
+            index.write(
+                RECORD.pack(
+                    key_offset,
+                    len(key),
+                    text_offset,
+                    text_len,
+                    meta_len,
+                    pageid,
+                    revid,
+                )
+            )
+            key_offset += len(key)
+
+    search_index.save(out_dir)
+    manifest = {
+        "format": FORMAT_VERSION,
+        "language": language,
+        "articles": len(entries),
+    }
+    (out_dir / "corpus.json").write_text(json.dumps(manifest, indent=2))
+    return len(entries)
+
+
+def _map(path: Path) -> mmap.mmap | bytes:
+    with path.open("rb") as f:
+        if path.stat().st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class LocalCorpus:
+    """Read-only, memory-mapped corpus with the same interface as the live client.
+
+    Args:
+        path: Corpus directory produced by `build_corpus`
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        manifest = json.loads((self.path / "corpus.json").read_text())
+        if manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported corpus format in {self.path}")
+
+        self.language: str = manifest.get("language", "en")
+        self._texts = _map(self.path / "texts.bin")
+        self._keys = _map(self.path / "keys.bin")
+        self._index = _map(self.path / "index.bin")
+        self._count = len(self._index) // RECORD.size
+        self.search_index = SearchIndex.load(self.path)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        """Unmap the corpus files."""
+        for mapped in (self._texts, self._keys, self._index):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+    def _record(self, i: int) -> tuple[int, int, int, int, int, int, int]:
+        return RECORD.unpack_from(self._index, i * RECORD.size)
+
+    def _key(self, i: int) -> bytes:
+        key_offset, key_len = RECORD.unpack_from(self._index, i * RECORD.size)[:2]
+        return self._keys[key_offset : key_offset + key_len]
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, title: str) -> int | None:
+        """Return the index position of `title`, or None if absent."""
+        key = normalize_title(title).encode("utf-8")
+        i = self._lower_bound(key)
+        if i < self._count and self._key(i) == key:
+            return i
+        return None
+
+    def titles(self) -> Iterator[str]:
+        """Iterate over all titles in sorted order."""
+        for i in range(self._count):
+            yield self._key(i).decode("utf-8")
+
+    def text_view(self, i: int) -> memoryview:
+        """Zero-copy view of the UTF-8 text of the article at position `i`."""
+        _, _, text_offset, text_len, _, _, _ = self._record(i)
+        return memoryview(self._texts)[text_offset : text_offset + text_len]
+
+    def _meta(self, i: int) -> dict[str, Any]:
+        _, _, text_offset, text_len, meta_len, _, _ = self._record(i)
+        start = text_offset + text_len
+        return json.loads(self._texts[start : start + meta_len])
+
+    def _resolve(self, title: str) -> int | None:
+        i = self.find(title)
+        if i is not None:
+            target = self._meta(i).get("redirect")
+            if target:
+                i = self.find(target)
+        return i
+
+    def page_at(self, i: int) -> WikiPage:
+        """Build the WikiPage for the article at index position `i`."""
+        _, _, _, _, _, pageid, revid = self._record(i)
+        title = self._key(i).decode("utf-8")
+        with self.text_view(i) as view:
+            text = str(view, "utf-8")
+        return WikiPage(
+            title=title,
+            url=f"https://{self.language}.wikipedia.org/wiki/{title.replace(' ', '_')}",
+            text=text,
+            pageid=pageid or None,
+            revid=revid or None,
+        )
+
+    def prefix_search(self, prefix: str, limit: int) -> list[str]:
+        """Return up to `limit` titles starting with `prefix`."""
+        key = normalize_title(prefix).encode("utf-8")
+        titles = []
+        i = self._lower_bound(key)
+        while i < self._count and len(titles) < limit:
+            candidate = self._key(i)
+            if not candidate.startswith(key):
+                break
+            if "redirect" not in self._meta(i):
+                titles.append(candidate.decode("utf-8"))
+            i += 1
+        return titles
+
+    # The async methods below mirror WikipediaClient so the servers can switch
+    # backends without changing any tool code.
+
+    async def start(self, warm: bool = True) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+    async def search_pages(self, query: str, limit: int = 5) -> list[dict[str, Any]]:
+        if self.search_index is not None:
+            titles = self.search_index.search(query, limit)
+        else:
+            titles = self.prefix_search(query, limit)
+        return [{"title": title, "key": title.replace(" ", "_")} for title in titles]
+
+    async def fetch_page(
+        self,
+        title: str,
+        progress: ProgressCallback | None = None,
+        expected_size: int | None = None,
+    ) -> WikiPage | None:
+        i = self._resolve(title)
+        if i is None:
+            return None
+        page = self.page_at(i)
+        if progress is not None:
+            size = len(page.text.encode("utf-8"))
+            await progress(size, size)
+        return page
+
+    async def fetch_revision_id(self, title: str) -> int | None:
+        i = self._resolve(title)
+        if i is None:
+            return None
+        return self._record(i)[6] or None
+
+    async def fetch_page_info(
+        self, title: str, category_limit: int = 10
+    ) -> tuple[WikiPage, dict[str, Any]] | None:
+        i = self._resolve(title)
+        if i is None:
+            return None
+        meta = self._meta(i)
+        return self.page_at(i), {
+            "categories": meta["categories"][:category_limit],
+            "links_count": meta["links_count"],
+            "links_count_exact": True,
+        }
+
+
+app = typer.Typer(help="Build and inspect offline Wikipedia corpora")
+
+
+@app.command()
+def build(
+    dump: Path = typer.Argument(..., help="XML or JSONL dump, optionally .bz2"),
+    out_dir: Path = typer.Argument(..., help="Corpus directory to create"),
+    language: str = typer.Option("en", help="Wikipedia language code"),
+) -> None:
+    """Ingest a dump into a memory-mappable corpus directory."""
+    count = build_corpus(read_dump(dump), out_dir, language=language)
+    typer.echo(f"Wrote {count} articles to {out_dir}")
+
+
+@app.command()
+def show(corpus_dir: Path, title: str) -> None:
+    """Print one article from a corpus."""
+    page = asyncio.run(LocalCorpus(corpus_dir).fetch_page(title))
+    if page is None:
+        typer.echo(f"Article '{title}' not found")
+        raise typer.Exit(1)
+    typer.echo(page.text)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,300 @@
+"""
+Lightweight metrics for the MCP servers in this project.
+
+One process-wide `Metrics` registry records:
+
+- per tool: calls, errors, calls in flight and a latency histogram;
+- per upstream endpoint: request latency and response status codes;
+- snapshots of named stats sources such as the article cache. A source may
+  be a coroutine function, for stats that need I/O such as a database query.
+
+Tools opt in with the `metrics.instrument` decorator, placed under the tool
+decorator. Only the outermost tool call is recorded, so a batch tool calling
+`get_article_summary` once per title counts as one call. The same call is
+also traced as a span when tracing is enabled (see `tracing`).
+
+Histograms use fixed, logarithmically spaced buckets, so recording a sample is
+a binary search and an integer increment, and p50/p95/p99 are estimated from
+the bucket counts. The whole per-call overhead is a few microseconds.
+
+`expose_metrics(mcp)` publishes `metrics.snapshot()` as the `metrics://server`
+resource and, when the server runs over HTTP, `metrics.prometheus()` at
+`/metrics`.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import time
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+from solution.servers.tracing import tracer
+
+# 50 microseconds to ~60 seconds, each bucket 1.5 times wider than the last
+BUCKET_BOUNDS = tuple(50e-6 * 1.5**i for i in range(35))
+QUANTILES = (0.5, 0.95, 0.99)
+
+_current_tool: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "current_tool", default=None
+)
+
+
+class Histogram:
+    """Latency histogram over `BUCKET_BOUNDS` (in seconds)."""
+
+    def __init__(self):
+        # One extra bucket for samples above the last bound
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate the `q` quantile by interpolating within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKET_BOUNDS[i - 1] if i else 0.0
+                upper = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else lower
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return BUCKET_BOUNDS[-1]
+
+    def summary(self) -> dict[str, Any]:
+        """Count, mean and quantiles in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": 1000 * self.sum / self.count if self.count else 0.0,
+            **{f"p{round(q * 100)}_ms": 1000 * self.quantile(q) for q in QUANTILES},
+        }
+
+
+class ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latency = Histogram()
+
+
+class UpstreamStats:
+    def __init__(self):
+        self.statuses: Counter[str] = Counter()
+        self.latency = Histogram()
+
+
+class Metrics:
+    """Process-wide registry of tool, upstream and cache metrics."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.tools: dict[str, ToolStats] = {}
+        self.upstream: dict[str, UpstreamStats] = {}
+        self.sources: dict[str, Callable[[], Any]] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def instrument(self, fn: Callable) -> Callable:
+        """Decorate a sync or async tool function to record its calls."""
+        name = fn.__name__
+
+        def start() -> tuple[ToolStats, float, contextvars.Token]:
+            stats = self.tools.get(name)
+            if stats is None:
+                stats = self.tools[name] = ToolStats()
+            stats.calls += 1
+            stats.in_flight += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return stats, self.clock(), _current_tool.set(name)
+
+        def finish(
+            stats: ToolStats, started: float, token: contextvars.Token, failed: bool
+        ) -> None:
+            stats.latency.observe(self.clock() - started)
+            stats.errors += failed
+            stats.in_flight -= 1
+            self.in_flight -= 1
+            _current_tool.reset(token)
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if _current_tool.get() is not None:
+                    return await fn(*args, **kwargs)
+                stats, started, token = start()
+                failed = True
+                try:
+                    with tracer.tool_span(name):
+                        result = await fn(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    finish(stats, started, token, failed)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _current_tool.get() is not None:
+                return fn(*args, **kwargs)
+            stats, started, token = start()
+            failed = True
+            try:
+                with tracer.tool_span(name):
+                    result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                finish(stats, started, token, failed)
+
+        return wrapper
+
+    def observe_upstream(self, endpoint: str, seconds: float, status: str) -> None:
+        """Record one upstream request (`status` is a code or "error")."""
+        stats = self.upstream.get(endpoint)
+        if stats is None:
+            stats = self.upstream[endpoint] = UpstreamStats()
+        stats.statuses[status] += 1
+        stats.latency.observe(seconds)
+
+    def register_source(self, name: str, stats: Callable[[], Any]) -> None:
+        """Include the dict returned (or awaited) by `stats()` in every snapshot."""
+        self.sources[name] = stats
+
+    async def source_stats(self) -> dict[str, dict[str, Any]]:
+        """Collect the stats of every registered source."""
+        collected = {}
+        for name, stats in self.sources.items():
+            result = stats()
+            collected[name] = await result if inspect.isawaitable(result) else result
+        return collected
+
+    def reset(self) -> None:
+        """Forget all recorded tool and upstream metrics (sources are kept)."""
+        self.tools.clear()
+        self.upstream.clear()
+        self.in_flight = self.peak_in_flight = 0
+
+    async def snapshot(self) -> dict[str, Any]:
+        """Return all metrics as a JSON-serializable dict."""
+        return {
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "tools": {
+                name: {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "in_flight": stats.in_flight,
+                    "latency": stats.latency.summary(),
+                }
+                for name, stats in self.tools.items()
+            },
+            "upstream": {
+                endpoint: {
+                    "statuses": dict(stats.statuses),
+                    "latency": stats.latency.summary(),
+                }
+                for endpoint, stats in self.upstream.items()
+            },
+            "sources": await self.source_stats(),
+        }
+
+    async def prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = [
+            "# TYPE mcp_in_flight gauge",
+            f"mcp_in_flight {self.in_flight}",
+            "# TYPE mcp_tool_calls_total counter",
+        ]
+        for name, stats in self.tools.items():
+            lines.append(f'mcp_tool_calls_total{{tool="{name}"}} {stats.calls}')
+        lines.append("# TYPE mcp_tool_errors_total counter")
+        for name, stats in self.tools.items():
+            lines.append(f'mcp_tool_errors_total{{tool="{name}"}} {stats.errors}')
+        lines.append("# TYPE mcp_tool_duration_seconds histogram")
+        for name, stats in self.tools.items():
+            lines += _histogram_lines(
+                "mcp_tool_duration_seconds", f'tool="{name}"', stats.latency
+            )
+        lines.append("# TYPE mcp_upstream_requests_total counter")
+        for endpoint, stats in self.upstream.items():
+            for status, count in stats.statuses.items():
+                labels = f'endpoint="{endpoint}",status="{status}"'
+                lines.append(f"mcp_upstream_requests_total{{{labels}}} {count}")
+        lines.append("# TYPE mcp_upstream_duration_seconds histogram")
+        for endpoint, stats in self.upstream.items():
+            lines += _histogram_lines(
+                "mcp_upstream_duration_seconds", f'endpoint="{endpoint}"', stats.latency
+            )
+        for source, stats in (await self.source_stats()).items():
+            for field, value in _numeric_fields(stats):
+                lines.append(f'mcp_{field}{{source="{source}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(metric: str, labels: str, histogram: Histogram) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(BUCKET_BOUNDS, histogram.counts, strict=False):
+        cumulative += count
+        lines.append(f'{metric}_bucket{{{labels},le="{bound:.6g}"}} {cumulative}')
+    lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+def _numeric_fields(stats: dict[str, Any], prefix: str = "") -> list[tuple[str, Any]]:
+    """Flatten nested stats into (name, number) pairs for Prometheus."""
+    fields = []
+    for key, value in stats.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            fields += _numeric_fields(value, f"{name}_")
+        elif isinstance(value, bool):
+            fields.append((name, int(value)))
+        elif isinstance(value, int | float):
+            fields.append((name, value))
+    return fields
+
+
+metrics = Metrics()
+
+
+def expose_metrics(server: Any) -> None:
+    """Add the metrics resource and Prometheus route to a FastMCP server.
+
+    Works with both the `mcp` SDK's FastMCP and the `fastmcp` package. The
+    `/metrics` route is only served when the server runs over HTTP.
+    """
+    from starlette.requests import Request
+    from starlette.responses import PlainTextResponse
+
+    @server.resource(
+        "metrics://server",
+        description="Per-tool call counts, errors and latency percentiles, "
+        "upstream HTTP latency and status codes, cache statistics and "
+        "in-flight concurrency",
+        mime_type="application/json",
+    )
+    async def server_metrics() -> str:
+        return json.dumps(await metrics.snapshot())
+
+    @server.custom_route("/metrics", methods=["GET"])
+    async def prometheus_metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(
+            await metrics.prometheus(), media_type="text/plain; version=0.0.4"
+        )
@@ -0,0 +1,299 @@
+"""
+On-disk cache for Wikipedia search results and article extracts.
+
+Every CLI session spawns a fresh server process, so the in-memory article
+cache starts empty each time. This SQLite-backed store survives restarts and
+is shared by every server process on the machine: the database runs in WAL
+mode, so readers never block the single writer and concurrent processes can
+use it safely.
+
+Each page records the revision id it was fetched at. Once an entry is older
+than the TTL it is not thrown away; the caller asks Wikipedia for the current
+revision id (a tiny request) and keeps the stored text if nothing changed.
+The pages are bounded by their total text size: the least recently fetched
+(or revalidated) pages are pruned first, along with expired search results.
+Each page stores its size, and the total is kept as a running count, so a
+write only recounts the table when it may be over the limit (other processes
+sharing the file add pages too).
+
+SQLite calls block, and a busy writer in another process can hold them for
+up to the connection timeout, so async code runs them with `run`, which hands
+them to a single worker thread instead of the event loop.
+"""
+
+import asyncio
+import json
+import sqlite3
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, TypeVar
+
+from solution.servers.article_cache import normalize_title
+from solution.servers.wikipedia_client import WikiPage
+
+DEFAULT_DB_PATH = Path.home() / ".cache" / "mcp-wikipedia" / "wikipedia.sqlite3"
+DEFAULT_DB_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_DB_MAX_BYTES = 256 * 1024 * 1024
+
+T = TypeVar("T")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    language TEXT NOT NULL,
+    key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    text TEXT NOT NULL,
+    pageid INTEGER,
+    revid INTEGER,
+    meta TEXT,
+    fetched_at REAL NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (language, key)
+);
+CREATE TABLE IF NOT EXISTS searches (
+    language TEXT NOT NULL,
+    query TEXT NOT NULL,
+    result_limit INTEGER NOT NULL,
+    results TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (language, query, result_limit)
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS pages_fetched_at ON pages (fetched_at, size);
+CREATE INDEX IF NOT EXISTS searches_fetched_at ON searches (fetched_at);
+"""
+
+
+@dataclass
+class StoredPage:
+    """A page read back from the persistent cache."""
+
+    page: WikiPage
+    meta: dict[str, Any] | None
+    fetched_at: float
+
+
+class PersistentCache:
+    """SQLite store for search results and page extracts.
+
+    The database is opened lazily on first use, so constructing the cache has
+    no side effects on disk.
+
+    Args:
+        path: Location of the SQLite database file
+        ttl: Seconds before an entry needs revalidation
+        max_bytes: Total page text size kept before pruning the least recently
+            fetched pages
+        clock: Wall-clock time source (overridable in tests)
+    """
+
+    def __init__(
+        self,
+        path: Path | str = DEFAULT_DB_PATH,
+        ttl: float = DEFAULT_DB_TTL_SECONDS,
+        max_bytes: int = DEFAULT_DB_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path).expanduser()
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.evictions = 0
+        self._bytes = 0
+        self._conn: sqlite3.Connection | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit mode: every statement is its own short transaction,
+            # which keeps write locks brief when several processes share the file.
+            # The connection is used from the worker thread behind `run`.
+            conn = sqlite3.connect(
+                self.path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+            if "size" not in columns:  # created before sizes were stored
+                conn.execute(
+                    "ALTER TABLE pages ADD COLUMN size INTEGER NOT NULL DEFAULT 0"
+                )
+                conn.execute("UPDATE pages SET size = length(CAST(text AS BLOB))")
+            conn.executescript(INDEXES)
+            self._conn = conn
+            self._bytes = self._total_bytes()
+        return self._conn
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def run(self, method: Callable[..., T], *args: Any) -> T:
+        """Run a blocking cache method off the event loop.
+
+        Calls are serialized on one worker thread, so they keep their order
+        and never contend for the connection.
+
+        Args:
+            method: Bound method of this cache, e.g. `cache.get_page`
+            *args: Arguments for `method`
+
+        Returns:
+            Whatever `method` returns
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="wikipedia-cache"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(method, *args))
+
+    def is_fresh(self, fetched_at: float) -> bool:
+        """Whether an entry fetched at `fetched_at` is still within the TTL."""
+        return self.clock() - fetched_at < self.ttl
+
+    def get_page(self, language: str, title: str) -> StoredPage | None:
+        """Return the stored page for `title`, fresh or stale, or None."""
+        row = self.conn.execute(
+            "SELECT title, url, text, pageid, revid, meta, fetched_at "
+            "FROM pages WHERE language = ? AND key = ?",
+            (language, normalize_title(title)),
+        ).fetchone()
+        if row is None:
+            return None
+
+        page = WikiPage(
+            title=row[0], url=row[1], text=row[2], pageid=row[3], revid=row[4]
+        )
+        meta = json.loads(row[5]) if row[5] else None
+        return StoredPage(page=page, meta=meta, fetched_at=row[6])
+
+    def put_page(
+        self,
+        language: str,
+        title: str,
+        page: WikiPage,
+        meta: dict[str, Any] | None = None,
+    ) -> None:
+        """Store a freshly fetched page under the requested title."""
+        key = normalize_title(title)
+        size = len(page.text.encode())
+        replaced = self.conn.execute(
+            "SELECT size FROM pages WHERE language = ? AND key = ?", (language, key)
+        ).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages "
+            "(language, key, title, url, text, pageid, revid, meta, fetched_at, size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                language,
+                key,
+                page.title,
+                page.url,
+                page.text,
+                page.pageid,
+                page.revid,
+                json.dumps(meta) if meta is not None else None,
+                self.clock(),
+                size,
+            ),
+        )
+        self._bytes += size - (replaced[0] if replaced else 0)
+        self._prune()
+
+    def _total_bytes(self) -> int:
+        row = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()
+        return row[0]
+
+    def _prune(self) -> None:
+        """Delete the oldest pages beyond `max_bytes` and expired searches."""
+        if self._bytes > self.max_bytes:
+            self._bytes = self._total_bytes()
+        if self._bytes > self.max_bytes:
+            # Walk the fetched_at index from the oldest page up to the last
+            # one that has to go, then delete them all in one statement
+            oldest = self.conn.execute(
+                "SELECT fetched_at, rowid, size FROM pages ORDER BY fetched_at, rowid"
+            )
+            for fetched_at, rowid, size in oldest:
+                self._bytes -= size
+                if self._bytes <= self.max_bytes:
+                    break
+            oldest.close()
+            cursor = self.conn.execute(
+                "DELETE FROM pages WHERE (fetched_at, rowid) <= (?, ?)",
+                (fetched_at, rowid),
+            )
+            self.evictions += cursor.rowcount
+        self.conn.execute(
+            "DELETE FROM searches WHERE fetched_at <= ?", (self.clock() - self.ttl,)
+        )
+
+    def page_batch(
+        self, language: str, after: int = 0, limit: int = 100
+    ) -> list[tuple[int, str, str]]:
+        """Return up to `limit` (rowid, title, text) pages in rowid order.
+
+        Pass the last rowid of a batch as `after` to get the next one.
+        """
+        return self.conn.execute(
+            "SELECT rowid, title, text FROM pages "
+            "WHERE language = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+            (language, after, limit),
+        ).fetchall()
+
+    def touch_page(self, language: str, title: str) -> None:
+        """Mark a stored page as revalidated now."""
+        self.conn.execute(
+            "UPDATE pages SET fetched_at = ? WHERE language = ? AND key = ?",
+            (self.clock(), language, normalize_title(title)),
+        )
+
+    def get_search(self, language: str, query: str, limit: int) -> list[Any] | None:
+        """Return cached search results if they are still within the TTL."""
+        row = self.conn.execute(
+            "SELECT results, fetched_at FROM searches "
+            "WHERE language = ? AND query = ? AND result_limit = ?",
+            (language, query.strip().lower(), limit),
+        ).fetchone()
+        if row is None or not self.is_fresh(row[1]):
+            return None
+        return json.loads(row[0])
+
+    def put_search(
+        self, language: str, query: str, limit: int, results: list[Any]
+    ) -> None:
+        """Store the (JSON-serializable) results returned for a search query."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO searches "
+            "(language, query, result_limit, results, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (language, query.strip().lower(), limit, json.dumps(results), self.clock()),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Return entry counts, page text size and the database location."""
+        pages = self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        searches = self.conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+        return {
+            "path": str(self.path),
+            "pages": pages,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "searches": searches,
+        }
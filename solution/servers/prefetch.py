@@ -0,0 +1,151 @@
+"""
+Speculative prefetch of search results into the article cache.
+
+After `search_wikipedia` an agent almost always asks for the summaries of the
+first few results. The prefetcher starts loading those pages in the background
+as soon as the search returns, so the follow-up calls are cache hits.
+
+Prefetching must never slow down the requests the agent is actually waiting
+for, so it runs at low priority:
+
+- pages are loaded one at a time, after the search response has been sent;
+- a new search supersedes the previous one's outstanding prefetches;
+- prefetching stops as soon as the cache is nearly full or the upstream rate
+  limiter is saturated.
+
+Each prefetched page is tracked until it is either read (a hit) or leaves the
+cache unread (waste), so the usefulness of prefetching can be measured. Pages
+still unread when more than `MAX_TRACKED` are tracked also count as waste.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from solution.servers.article_cache import normalize_title
+
+logger = logging.getLogger(__name__)
+
+# Prefetched pages tracked for hit/waste accounting at any one time
+MAX_TRACKED = 1024
+
+
+class Prefetcher:
+    """Loads the top search results in the background.
+
+    Args:
+        load: Coroutine function loading one title into the cache
+        is_cached: Whether a title is already in the memory cache
+        should_stop: Whether prefetching must back off right now
+        top_k: Number of leading results to prefetch (0 disables prefetching)
+    """
+
+    def __init__(
+        self,
+        load: Callable[[str], Awaitable[Any]],
+        is_cached: Callable[[str], bool],
+        should_stop: Callable[[], bool],
+        top_k: int = 0,
+    ):
+        self.load = load
+        self.is_cached = is_cached
+        self.should_stop = should_stop
+        self.top_k = top_k
+        self._task: asyncio.Task | None = None
+        self._in_flight: str | None = None
+        self._unused: dict[str, None] = {}
+        self.scheduled = 0
+        self.fetched = 0
+        self.hits = 0
+        self.wasted = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def schedule(self, titles: list[str]) -> None:
+        """Start prefetching the first `top_k` titles not already cached."""
+        if self.top_k <= 0:
+            return
+
+        todo = [title for title in titles[: self.top_k] if not self.is_cached(title)]
+        if not todo:
+            return
+
+        self.cancel()
+        self.scheduled += len(todo)
+        self._task = asyncio.create_task(self._run(todo))
+
+    async def _run(self, titles: list[str]) -> None:
+        # Let the search response go out before any prefetch request
+        await asyncio.sleep(0)
+        for i, title in enumerate(titles):
+            if self.should_stop():
+                self.cancelled += len(titles) - i
+                logger.info(f"Prefetch stopped, skipped {len(titles) - i} pages")
+                return
+            key = self._in_flight = normalize_title(title)
+            try:
+                await self.load(title)
+            except asyncio.CancelledError:
+                self.cancelled += len(titles) - i
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.info(f"Prefetch of {title} failed: {e}")
+            else:
+                self.fetched += 1
+                # Unless a request already joined it while in flight
+                if self._in_flight == key:
+                    self._track(key)
+            finally:
+                self._in_flight = None
+
+    def _track(self, key: str) -> None:
+        self._unused[key] = None
+        while len(self._unused) > MAX_TRACKED:
+            del self._unused[next(iter(self._unused))]
+            self.wasted += 1
+
+    def record_use(self, title: str) -> None:
+        """Note an interactive request for `title`, counting prefetch hits.
+
+        Only call this for loads a prefetched page can serve, i.e. the ones
+        made on behalf of a tool call that need nothing but the page.
+        """
+        key = normalize_title(title)
+        if key == self._in_flight:
+            # The request joins the prefetch already under way
+            self.hits += 1
+            self._in_flight = None
+        elif key in self._unused:
+            del self._unused[key]
+            self.hits += 1
+
+    def cancel(self) -> None:
+        """Cancel outstanding prefetches."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def wait(self) -> None:
+        """Wait for the current prefetch run to finish (used by tests)."""
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Return prefetch counters with hit and waste rates."""
+        for key in [key for key in self._unused if not self.is_cached(key)]:
+            del self._unused[key]
+            self.wasted += 1
+        return {
+            "top_k": self.top_k,
+            "scheduled": self.scheduled,
+            "fetched": self.fetched,
+            "hits": self.hits,
+            "wasted": self.wasted,
+            "pending_use": len(self._unused),
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "hit_rate": self.hits / self.fetched if self.fetched else 0.0,
+            "waste_rate": self.wasted / self.fetched if self.fetched else 0.0,
+        }
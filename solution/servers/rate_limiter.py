@@ -0,0 +1,178 @@
+"""
+Client-side rate limiting and retries for Wikimedia requests.
+
+Wikimedia answers bursts of traffic with HTTP 429 or 503. Rather than passing
+those straight to the agent as tool errors, every upstream request goes
+through a per-endpoint `RateLimiter`:
+
+- a token bucket caps the sustained request rate while allowing short
+  bursts, and callers that find it empty wait their turn in FIFO order, so a
+  burst of tool calls is smoothed out instead of failing;
+- a semaphore caps how many requests are in flight at once;
+- when Wikimedia pushes back, the whole endpoint pauses (for `Retry-After`
+  if given) and its rate is halved, then recovers step by step as requests
+  succeed again.
+
+`RetryPolicy` decides how long to wait before retrying a failed request:
+whatever `Retry-After` asks for, otherwise exponential backoff with full
+jitter so that concurrent callers don't retry in lockstep.
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+# Statuses that mean "try again later" rather than "this request is wrong"
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delay seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max((when - datetime.now(UTC)).total_seconds(), 0.0)
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff schedule for retryable upstream failures.
+
+    Args:
+        max_retries: Retries after the first attempt before giving up
+        base_delay: Upper bound of the first backoff, doubled per attempt
+        max_delay: Longest wait; a longer Retry-After means giving up instead
+    """
+
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float | None:
+        """Seconds to wait before retry number `attempt` (0-based).
+
+        Returns:
+            The delay, or None if the server asked for more than `max_delay`
+        """
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class RateLimiter:
+    """Token bucket with a FIFO wait queue and a concurrency cap.
+
+    Args:
+        rate: Sustained requests per second
+        burst: Requests allowed back-to-back after an idle period
+        max_concurrent: Requests allowed in flight at once
+        clock: Monotonic time source (overridable in tests)
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        max_concurrent: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        # asyncio.Lock wakes waiters in arrival order, which makes it the queue
+        self._queue = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.requests = 0
+        self.waited = 0.0
+        self.throttled = 0
+
+    def _refill(self) -> None:
+        now = self.clock()
+        elapsed = max(now - self._updated, 0.0)
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = max(now, self._updated)
+
+    async def acquire(self) -> None:
+        """Wait for a token and a free request slot."""
+        async with self._queue:
+            while True:
+                self._refill()
+                wait = self._paused_until - self.clock()
+                if wait <= 0 and self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                if wait <= 0:
+                    wait = (1 - self._tokens) / self.rate
+                self.waited += wait
+                await asyncio.sleep(wait)
+        await self._slots.acquire()
+        self.requests += 1
+
+    @property
+    def saturated(self) -> bool:
+        """Whether a new request would have to wait for the limiter."""
+        self._refill()
+        return (
+            self._queue.locked()
+            or self._slots.locked()
+            or self._tokens < 1
+            or self.clock() < self._paused_until
+        )
+
+    def release(self) -> None:
+        """Free the request slot taken by `acquire`."""
+        self._slots.release()
+
+    async def __aenter__(self) -> "RateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for `seconds` and halve the sustained rate."""
+        now = self.clock()
+        self._paused_until = max(self._paused_until, now + seconds)
+        # One request probes the endpoint as soon as the pause is over; the
+        # bucket only starts refilling from then on
+        self._tokens = 1.0
+        self._updated = self._paused_until
+        self.rate = max(self.rate / 2, self.max_rate / 16)
+        self.throttled += 1
+
+    def record_success(self) -> None:
+        """Step the rate back towards its configured maximum."""
+        if self.rate < self.max_rate:
+            self.rate = min(self.rate + self.max_rate / 20, self.max_rate)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the current rate and request, wait and throttle counters."""
+        return {
+            "rate": self.rate,
+            "max_rate": self.max_rate,
+            "burst": self.burst,
+            "max_concurrent": self.max_concurrent,
+            "requests": self.requests,
+            "waited_seconds": round(self.waited, 3),
+            "throttled": self.throttled,
+        }
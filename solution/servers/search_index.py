@@ -0,0 +1,336 @@
+"""
+Local full-text search over Wikipedia articles with BM25 ranking.
+
+The index lets `search_wikipedia` answer without the Wikimedia search
+endpoint: over a local corpus, or over the pages that have passed through the
+server's caches. It is a classic inverted index:
+
+- text is tokenized into lower-case word terms, minus common stopwords;
+- each term maps to a posting list of (document gap, term frequency) pairs,
+  varint-encoded into a bytearray so long lists stay compact;
+- queries are scored with Okapi BM25 using NumPy over the decoded posting
+  lists, and the best `limit` documents are picked with a partial sort
+  instead of sorting every match.
+
+Documents can be added at any time. Re-adding a title replaces the old
+document (unless it is given the revision id already indexed), which is tombstoned and skipped at query time; its terms no longer
+count towards the document frequencies. With `max_docs` set, adding past the
+limit drops the oldest documents the same way. Once tombstones outnumber the
+live documents (and there are at least `COMPACT_MIN_TOMBSTONES` of them) the
+posting lists are rewritten without them.
+
+The index may be filled from a worker thread while the event loop searches
+it; a lock keeps each `add`, `search` and `stats` call atomic.
+"""
+
+import json
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from solution.servers.article_cache import normalize_title
+
+TOKEN = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has he in is it its of on or that the "
+    "this to was were which with".split()
+)
+TITLE_WEIGHT = 3
+# Rewriting the posting lists costs a pass over every term, so small indexes
+# let tombstones pile up to this many before compacting
+COMPACT_MIN_TOMBSTONES = 1024
+INDEX_FILE = "search_index.json"
+POSTINGS_FILE = "postings.bin"
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lower-case terms, dropping stopwords."""
+    return [t for t in TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _write_varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_postings(data: bytes | bytearray) -> tuple[np.ndarray, np.ndarray]:
+    """Decode a posting list into parallel (doc_id, term_frequency) arrays.
+
+    Decoding is vectorized: the last byte of every varint is the one without
+    the continuation bit, so each byte's value index and bit shift can be
+    computed with array operations instead of a Python loop.
+    """
+    raw = np.frombuffer(bytes(data), dtype=np.uint8)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    value_index = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shifts = (np.arange(len(raw)) - starts[value_index]) * 7
+    parts = (raw & 0x7F).astype(np.int64) << shifts
+    values = np.bincount(value_index, weights=parts, minlength=len(ends))
+    values = values.astype(np.int64)
+    return np.cumsum(values[0::2]), values[1::2]
+
+
+def _encode_postings(docs: np.ndarray, freqs: np.ndarray) -> bytearray:
+    """Encode parallel (doc_id, term_frequency) arrays as a posting list."""
+    out = bytearray()
+    previous = 0
+    for doc_id, freq in zip(docs.tolist(), freqs.tolist(), strict=True):
+        _write_varint(doc_id - previous, out)
+        _write_varint(freq, out)
+        previous = doc_id
+    return out
+
+
+class SearchIndex:
+    """Incremental inverted index with BM25 scoring.
+
+    Args:
+        k1: BM25 term-frequency saturation
+        b: BM25 document-length normalization
+        max_docs: Documents kept before the oldest are dropped (None for no
+            limit)
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_docs: int | None = None):
+        self.k1 = k1
+        self.b = b
+        self.max_docs = max_docs
+        self._postings: dict[str, bytearray] = {}
+        self._last_doc: dict[str, int] = {}
+        self._df: Counter[str] = Counter()
+        self._titles: list[str] = []
+        self._lengths = array("I")
+        self._doc_ids: dict[str, int] = {}
+        # Revision ids of documents added with one, to skip unchanged re-adds
+        self._revids: dict[str, int] = {}
+        # Terms of each live document added here, to undo its document
+        # frequencies when it is replaced or dropped
+        self._doc_terms: dict[int, tuple[str, ...]] = {}
+        self._deleted: set[int] = set()
+        self._oldest = 0
+        self._total_length = 0
+        self._postings_bytes = 0
+        self.evictions = self.compactions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def __contains__(self, title: str) -> bool:
+        return normalize_title(title) in self._doc_ids
+
+    def add(self, title: str, text: str, revid: int | None = None) -> None:
+        """Index a document, replacing any earlier version of the same title.
+
+        Args:
+            title: Document title (also indexed, with extra weight)
+            text: Document text
+            revid: Revision id of the text; adding the revision already
+                indexed for this title does nothing
+        """
+        key = normalize_title(title)
+        if revid is not None and self._revids.get(key) == revid:
+            return
+
+        terms = Counter(tokenize(text))
+        for term in tokenize(title):
+            terms[term] += TITLE_WEIGHT
+
+        with self._lock:
+            previous = self._doc_ids.pop(key, None)
+            if previous is not None:
+                self._remove(previous)
+            if revid is None:
+                self._revids.pop(key, None)
+            else:
+                self._revids[key] = revid
+
+            doc_id = len(self._titles)
+            self._titles.append(title)
+            length = sum(terms.values())
+            self._lengths.append(length)
+            self._total_length += length
+            self._doc_ids[key] = doc_id
+            self._doc_terms[doc_id] = tuple(terms)
+
+            for term, freq in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = bytearray()
+                size = len(postings)
+                _write_varint(doc_id - self._last_doc.get(term, 0), postings)
+                _write_varint(freq, postings)
+                self._postings_bytes += len(postings) - size
+                self._last_doc[term] = doc_id
+                self._df[term] += 1
+
+            while self.max_docs is not None and len(self._doc_ids) > self.max_docs:
+                self._evict_oldest()
+            if len(self._deleted) > max(len(self._doc_ids), COMPACT_MIN_TOMBSTONES):
+                self._compact()
+
+    def _remove(self, doc_id: int) -> None:
+        """Tombstone a document (already gone from `_doc_ids`)."""
+        self._deleted.add(doc_id)
+        self._total_length -= self._lengths[doc_id]
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            terms = self._terms_of(doc_id)
+        for term in terms:
+            self._df[term] -= 1
+            if not self._df[term]:
+                del self._df[term]
+
+    def _terms_of(self, doc_id: int) -> list[str]:
+        """Terms of a document loaded from disk, found by scanning postings."""
+        terms = []
+        for term, postings in self._postings.items():
+            docs, _ = _decode_postings(postings)
+            i = np.searchsorted(docs, doc_id)
+            if i < len(docs) and docs[i] == doc_id:
+                terms.append(term)
+        return terms
+
+    def _evict_oldest(self) -> None:
+        while self._oldest in self._deleted:
+            self._oldest += 1
+        key = normalize_title(self._titles[self._oldest])
+        del self._doc_ids[key]
+        self._revids.pop(key, None)
+        self._remove(self._oldest)
+        self.evictions += 1
+
+    def _compact(self) -> None:
+        """Rewrite the posting lists without tombstoned documents."""
+        live = np.ones(len(self._titles), dtype=bool)
+        live[list(self._deleted)] = False
+        new_ids = np.cumsum(live) - 1
+
+        postings: dict[str, bytearray] = {}
+        last_doc: dict[str, int] = {}
+        for term, data in self._postings.items():
+            docs, freqs = _decode_postings(data)
+            keep = live[docs]
+            if keep.any():
+                docs = new_ids[docs[keep]]
+                postings[term] = _encode_postings(docs, freqs[keep])
+                last_doc[term] = int(docs[-1])
+        self._postings = postings
+        self._postings_bytes = sum(len(p) for p in postings.values())
+        self._last_doc = last_doc
+
+        kept = np.flatnonzero(live).tolist()
+        self._titles = [self._titles[i] for i in kept]
+        self._lengths = array("I", (self._lengths[i] for i in kept))
+        self._doc_ids = {key: int(new_ids[i]) for key, i in self._doc_ids.items()}
+        self._doc_terms = {
+            int(new_ids[i]): terms for i, terms in self._doc_terms.items()
+        }
+        self._deleted = set()
+        self._oldest = 0
+        self.compactions += 1
+
+    def stats(self) -> dict[str, int | None]:
+        """Return document, tombstone and term counts."""
+        with self._lock:
+            return {
+                "documents": len(self._doc_ids),
+                "max_documents": self.max_docs,
+                "tombstones": len(self._deleted),
+                "terms": len(self._postings),
+                "postings_bytes": self._postings_bytes,
+                "evictions": self.evictions,
+                "compactions": self.compactions,
+            }
+
+    def search(self, query: str, limit: int = 5) -> list[str]:
+        """Return up to `limit` titles ranked by BM25 score for `query`."""
+        with self._lock:
+            return self._search(query, limit)
+
+    def _search(self, query: str, limit: int) -> list[str]:
+        live_docs = len(self._doc_ids)
+        if not live_docs:
+            return []
+
+        k1, b = self.k1, self.b
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+        norms = k1 * (1 - b + b * lengths / (self._total_length / live_docs))
+        scores = np.zeros(len(lengths))
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            df = self._df[term]
+            idf = math.log(1 + (live_docs - df + 0.5) / (df + 0.5))
+            docs, freqs = _decode_postings(postings)
+            scores[docs] += idf * freqs * (k1 + 1) / (freqs + norms[docs])
+
+        if self._deleted:
+            scores[list(self._deleted)] = 0.0
+        matches = np.flatnonzero(scores > 0)
+        if len(matches) > limit:
+            top = np.argpartition(scores[matches], -limit)[-limit:]
+            matches = matches[top]
+        ranked = matches[np.argsort(-scores[matches], kind="stable")]
+        return [self._titles[doc_id] for doc_id in ranked]
+
+    def save(self, directory: Path) -> None:
+        """Write the index next to a corpus (`search_index.json` + postings)."""
+        vocab = {}
+        with (directory / POSTINGS_FILE).open("wb") as f:
+            offset = 0
+            for term, postings in self._postings.items():
+                f.write(postings)
+                vocab[term] = [
+                    offset,
+                    len(postings),
+                    self._df[term],
+                    self._last_doc[term],
+                ]
+                offset += len(postings)
+
+        (directory / INDEX_FILE).write_text(
+            json.dumps(
+                {
+                    "k1": self.k1,
+                    "b": self.b,
+                    "titles": self._titles,
+                    "lengths": self._lengths.tolist(),
+                    "deleted": sorted(self._deleted),
+                    "vocab": vocab,
+                }
+            )
+        )
+
+    @classmethod
+    def load(cls, directory: Path) -> "SearchIndex | None":
+        """Load an index saved with `save`, or return None if there is none."""
+        index_path = directory / INDEX_FILE
+        if not index_path.exists():
+            return None
+
+        data = json.loads(index_path.read_text())
+        blob = (directory / POSTINGS_FILE).read_bytes()
+        index = cls(k1=data["k1"], b=data["b"])
+        index._titles = data["titles"]
+        index._lengths = array("I", data["lengths"])
+        index._deleted = set(data["deleted"])
+        for term, (offset, size, df, last_doc) in data["vocab"].items():
+            index._postings[term] = bytearray(blob[offset : offset + size])
+            index._postings_bytes += size
+            index._df[term] = df
+            index._last_doc[term] = last_doc
+        for doc_id, title in enumerate(index._titles):
+            if doc_id not in index._deleted:
+                index._doc_ids[normalize_title(title)] = doc_id
+                index._total_length += index._lengths[doc_id]
+        return index
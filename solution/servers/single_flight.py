@@ -0,0 +1,88 @@
+"""
+Single-flight coalescing of concurrent identical lookups.
+
+Parallel tool calls from one model response, or several agents sharing a
+server, often ask for the same article or query at the same moment. Without
+coalescing each call misses the cache and makes its own upstream request.
+`SingleFlight` runs one fetch per key; callers arriving while it is in flight
+wait for it and share its result or its exception.
+
+The fetch runs in its own task, so a cancelled caller never cancels the
+request the other callers are waiting on. Once every caller of a fetch has
+been cancelled nobody needs its result, and the fetch is cancelled too. Like
+the article cache it is used from a single event loop and needs no locking.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    # Avoid "exception was never retrieved" when every caller was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key."""
+
+    def __init__(self):
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[T]]) -> T:
+        """Run `fetch` unless a call with the same key is already in flight.
+
+        Args:
+            key: Identity of the lookup, e.g. an article cache key
+            fetch: Zero-argument coroutine function performing the lookup
+
+        Returns:
+            The result of the (possibly shared) fetch
+
+        Raises:
+            Exception: Whatever the shared fetch raised
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+            task.add_done_callback(_consume_exception)
+        else:
+            self.coalesced += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and task.cancel():
+                self.abandoned += 1
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def stats(self) -> dict[str, Any]:
+        """Return call counters and the number of fetches in flight."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,241 @@
+"""
+Persistent memo of LLM-enhanced article summaries.
+
+`smart_summarize` asks the client's LLM (via `ctx.sample`) to rewrite an
+article, which is by far the most expensive call the advanced server makes.
+The result only depends on the article revision and the prompts used, so it
+is stored in SQLite under (language, title, revision id, prompt hash,
+max_tokens) and returned as-is until the article or the prompts change.
+
+Each entry records how many sampling calls and (estimated) tokens it cost, so
+every hit adds to the `sampling_calls_saved` and `tokens_saved` counters. The
+store is bounded by the total size of the stored summaries; the least
+recently used entries are evicted first.
+
+Like `PersistentCache`, whose database file it usually shares, the memo's
+blocking SQLite calls are run from async code with `run`, on a single worker
+thread.
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, TypeVar
+
+from solution.servers.article_cache import normalize_title
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+T = TypeVar("T")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    language TEXT NOT NULL,
+    key TEXT NOT NULL,
+    revid INTEGER NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    max_tokens INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sampling_calls INTEGER NOT NULL,
+    tokens INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (language, key, revid, prompt_hash, max_tokens)
+);
+CREATE INDEX IF NOT EXISTS summaries_used_at ON summaries (used_at);
+"""
+
+
+def prompt_hash(*parts: Any) -> str:
+    """Hash the prompt templates and settings a summary was produced with."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of `text` (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class SamplingCost:
+    """Sampling calls and estimated tokens spent producing one summary."""
+
+    calls: int = 0
+    tokens: int = 0
+
+    def add(self, prompt: str, completion: str) -> None:
+        self.calls += 1
+        self.tokens += estimate_tokens(prompt) + estimate_tokens(completion)
+
+
+class SummaryMemo:
+    """SQLite store of enhanced summaries, bounded by total summary size.
+
+    Shares the database file with `PersistentCache` when given the same path;
+    the database is opened lazily on first use.
+
+    Args:
+        path: Location of the SQLite database file
+        max_bytes: Total summary size kept before evicting the least recently
+            used entries
+        clock: Wall-clock time source (overridable in tests)
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path).expanduser()
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._conn: sqlite3.Connection | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self.hits = self.misses = self.refreshes = self.evictions = 0
+        self.sampling_calls_saved = self.tokens_saved = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # The connection is used from the worker thread behind `run`
+            conn = sqlite3.connect(
+                self.path, timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def run(self, method: Callable[..., T], *args: Any) -> T:
+        """Run a blocking memo method, e.g. `memo.get`, on the worker thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="summary-memo"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(method, *args))
+
+    def get(
+        self,
+        language: str,
+        title: str,
+        revid: int,
+        prompt_hash: str,
+        max_tokens: int,
+    ) -> str | None:
+        """Return the stored summary for this revision and prompt, or None."""
+        key = (language, normalize_title(title), revid, prompt_hash, max_tokens)
+        row = self.conn.execute(
+            "SELECT summary, sampling_calls, tokens FROM summaries "
+            "WHERE language = ? AND key = ? AND revid = ? AND prompt_hash = ? "
+            "AND max_tokens = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.conn.execute(
+            "UPDATE summaries SET used_at = ? "
+            "WHERE language = ? AND key = ? AND revid = ? AND prompt_hash = ? "
+            "AND max_tokens = ?",
+            (self.clock(), *key),
+        )
+        self.hits += 1
+        self.sampling_calls_saved += row[1]
+        self.tokens_saved += row[2]
+        return row[0]
+
+    def put(
+        self,
+        language: str,
+        title: str,
+        revid: int,
+        prompt_hash: str,
+        max_tokens: int,
+        summary: str,
+        cost: SamplingCost,
+    ) -> None:
+        """Store a summary, replacing older revisions of the same article."""
+        key = normalize_title(title)
+        size = len(summary.encode())
+        now = self.clock()
+        self.conn.execute(
+            "DELETE FROM summaries WHERE language = ? AND key = ? AND revid != ?",
+            (language, key, revid),
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO summaries "
+            "(language, key, revid, prompt_hash, max_tokens, summary, size, "
+            "sampling_calls, tokens, created_at, used_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                language,
+                key,
+                revid,
+                prompt_hash,
+                max_tokens,
+                summary,
+                size,
+                cost.calls,
+                cost.tokens,
+                now,
+                now,
+            ),
+        )
+        self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries beyond `max_bytes` in total."""
+        cursor = self.conn.execute(
+            "DELETE FROM summaries WHERE rowid IN ("
+            "  SELECT rowid FROM ("
+            "    SELECT rowid, SUM(size) OVER ("
+            "      ORDER BY used_at DESC, rowid DESC"
+            "    ) AS total FROM summaries"
+            "  ) WHERE total > ?"
+            ")",
+            (self.max_bytes,),
+        )
+        self.evictions += cursor.rowcount
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit and eviction counters, savings and current usage."""
+        entries, size = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries"
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "evictions": self.evictions,
+            "sampling_calls_saved": self.sampling_calls_saved,
+            "tokens_saved": self.tokens_saved,
+        }
@@ -0,0 +1,70 @@
+from solution.servers.article_cache import ArticleCache, article_key, normalize_title
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestNormalizeTitle:
+    def test_underscores_whitespace_and_case(self) -> None:
+        assert normalize_title(" python_(programming  language) ") == (
+            "Python (programming language)"
+        )
+
+    def test_key_includes_language(self) -> None:
+        assert article_key("Python", "en") != article_key("Python", "nl")
+        assert article_key("python", "en") == article_key("Python", "en")
+
+
+class TestArticleCache:
+    def test_hit_and_miss_counters(self) -> None:
+        cache = ArticleCache(max_bytes=100)
+        cache.put("a", "value", 10)
+
+        assert cache.get("a") == "value"
+        assert cache.get("b") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_entries_expire_after_ttl(self) -> None:
+        clock = FakeClock()
+        cache = ArticleCache(max_bytes=100, ttl=10, clock=clock)
+        cache.put("a", "value", 10)
+
+        clock.now = 11
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+        assert cache.bytes_used == 0
+
+    def test_evicts_least_recently_used_by_bytes(self) -> None:
+        cache = ArticleCache(max_bytes=100)
+        cache.put("a", "A", 40)
+        cache.put("b", "B", 40)
+        cache.get("a")  # "b" is now the least recently used entry
+        cache.put("c", "C", 40)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.bytes_used == 80
+        assert cache.stats()["evictions"] == 1
+
+    def test_oversized_value_is_not_stored(self) -> None:
+        cache = ArticleCache(max_bytes=100)
+        cache.put("a", "A", 40)
+
+        assert cache.put("big", "B", 500) is False
+        assert "a" in cache
+        assert cache.bytes_used == 40
+
+    def test_replacing_key_updates_size(self) -> None:
+        cache = ArticleCache(max_bytes=100)
+        cache.put("a", "A", 40)
+        cache.put("a", "AA", 60)
+
+        assert cache.get("a") == "AA"
+        assert cache.bytes_used == 60
@@ -0,0 +1,170 @@
+import pytest
+
+from solution.servers import wikipedia_client, wikipedia_server
+from solution.servers.article_digest import ArticleDigest, normalize_text
+from solution.servers.wikipedia_client import WikipediaClient
+
+TEXT = (
+    "The U.S. Census counted 3.14 million people. Dr. Smith disagreed!\n"
+    "J. R. R. Tolkien lived in Oxford (England). A list without a full stop\n\n\n"
+    "== History ==\n"
+    "It began in 1990. It grew.\n\n"
+    "=== Early years ===\n"
+    "Slow at first.\n\n"
+    "== Legacy ==\n"
+    "Is it over? Not yet."
+)
+
+
+def sentences(digest: ArticleDigest) -> list[str]:
+    starts = [0, *digest.sentence_ends[:-1]]
+    return [
+        # Drop a heading line sitting between two sentences
+        digest.text[start:end].strip().split("==\n")[-1]
+        for start, end in zip(starts, digest.sentence_ends, strict=True)
+    ]
+
+
+class TestArticleDigest:
+    def test_normalizes_whitespace(self) -> None:
+        assert normalize_text("a  \r\nb\n\n\n\nc\n") == "a\nb\n\nc"
+
+    def test_segments_sentences(self) -> None:
+        digest = ArticleDigest(TEXT)
+
+        assert sentences(digest)[:4] == [
+            "The U.S. Census counted 3.14 million people.",
+            "Dr. Smith disagreed!",
+            "J. R. R. Tolkien lived in Oxford (England).",
+            "A list without a full stop",
+        ]
+        assert sentences(digest)[-2:] == ["Is it over?", "Not yet."]
+
+    def test_headings_are_not_sentences(self) -> None:
+        digest = ArticleDigest(TEXT)
+
+        for section in digest.sections:
+            assert not any(
+                section.start <= end < section.body_start
+                for end in digest.sentence_ends
+            )
+
+    def test_sections(self) -> None:
+        digest = ArticleDigest(TEXT)
+
+        assert [(s.title, s.level) for s in digest.sections] == [
+            ("History", 2),
+            ("Early years", 3),
+            ("Legacy", 2),
+        ]
+        history = digest.sections[0]
+        assert digest.text[history.body_start : history.end].strip() == (
+            "It began in 1990. It grew.\n\n=== Early years ===\nSlow at first."
+        )
+        assert digest.lead.endswith("A list without a full stop")
+
+    def test_lead_sentences(self) -> None:
+        digest = ArticleDigest(TEXT)
+
+        assert digest.lead_sentences(2) == (
+            "The U.S. Census counted 3.14 million people. Dr. Smith disagreed!"
+        )
+        # Asking for more than the lead has returns the whole lead only
+        assert digest.lead_sentences(10) == digest.lead
+
+    def test_break_before_prefers_latest_boundary(self) -> None:
+        digest = ArticleDigest(TEXT)
+        limit = digest.text.index("Dr.") + 10
+
+        assert digest.break_before(limit) == digest.text.index(" Dr.")
+        assert digest.break_before(5) == 0
+
+    def test_sentence_count(self) -> None:
+        digest = ArticleDigest(TEXT)
+
+        assert digest.sentence_count(end=digest.lead_end) == 4
+        assert digest.sentence_count() == len(digest.sentence_ends)
+
+
+class TestServerUsesDigest:
+    @pytest.mark.asyncio
+    async def test_digest_is_built_once_per_revision(
+        self, client: WikipediaClient
+    ) -> None:
+        first = await wikipedia_server.load_digest("Python")
+        await wikipedia_server.get_article_summary("Python", 1)
+        await wikipedia_server.get_article_content("Python", 100)
+
+        assert await wikipedia_server.load_digest("python") is first
+        assert first.revid == 42
+
+    @pytest.mark.asyncio
+    async def test_new_revision_rebuilds_digest(self, client: WikipediaClient) -> None:
+        first = await wikipedia_server.load_digest("Python")
+        page = await wikipedia_server.fetch_article("Python")
+        page.revid = 43
+
+        rebuilt = await wikipedia_server.load_digest("Python")
+
+        assert rebuilt is not first
+        assert rebuilt.revid == 43
+
+    def test_pages_without_revision_are_keyed_by_text(
+        self, client: WikipediaClient
+    ) -> None:
+        page = wikipedia_client.WikiPage(title="US", url="u", text=TEXT)
+
+        first = wikipedia_server.digest_of(page)
+        same = wikipedia_server.digest_of(
+            wikipedia_client.WikiPage(title="US", url="u", text=TEXT)
+        )
+        page.text = TEXT + " Edited."
+
+        assert same is first
+        assert wikipedia_server.digest_of(page) is not first
+
+    @pytest.mark.asyncio
+    async def test_summary_keeps_abbreviations(self, monkeypatch) -> None:
+        page = wikipedia_client.WikiPage(
+            title="US", url="u", text="The U.S. is large. It has 50 states."
+        )
+
+        async def fake_fetch(title: str) -> wikipedia_client.WikiPage:
+            return page
+
+        monkeypatch.setattr(wikipedia_server, "fetch_article", fake_fetch)
+
+        assert await wikipedia_server.get_article_summary("US", 1) == (
+            "The U.S. is large."
+        )
+
+
+class TestChunks:
+    def test_chunks_break_at_boundaries_and_cover_text(self) -> None:
+        digest = ArticleDigest(TEXT)
+
+        ends = digest.chunk_ends(60)
+        chunks = [digest.chunk(i, 60) for i in range(len(ends))]
+
+        assert ends[-1] == len(digest.text)
+        assert all(len(chunk) <= 60 for chunk in chunks)
+        assert all(end in digest.sentence_ends for end in ends)
+        assert "".join(chunks).replace(" ", "").replace("\n", "") == (
+            digest.text.replace(" ", "").replace("\n", "")
+        )
+
+    def test_long_sentence_is_cut(self) -> None:
+        digest = ArticleDigest("x" * 250)
+
+        assert list(digest.chunk_ends(100)) == [100, 200, 250]
+
+    def test_chunk_split_is_cached(self) -> None:
+        digest = ArticleDigest(TEXT)
+
+        assert digest.chunk_ends(80) is digest.chunk_ends(80)
+
+    def test_rejects_non_positive_length(self) -> None:
+        digest = ArticleDigest(TEXT)
+
+        with pytest.raises(ValueError, match="at least 1"):
+            digest.chunk_ends(0)
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from solution.servers.article_digest import ArticleDigest
+from solution.servers.extractive import (
+    centroid_scores,
+    extract_summary,
+    sentence_vectors,
+    sentences,
+    textrank_scores,
+)
+from solution.servers.summary_memo import estimate_tokens
+
+ARTICLE = """Python is a programming language created by Guido van Rossum.
+Python emphasizes code readability with significant indentation.
+
+== History ==
+Python was conceived in the late 1980s by Guido van Rossum.
+The first Python release appeared in 1991.
+Bananas are yellow fruit grown in tropical climates.
+
+== Design ==
+Python is dynamically typed and garbage collected.
+The Python language supports multiple programming paradigms."""
+
+
+@pytest.fixture
+def digest() -> ArticleDigest:
+    return ArticleDigest(ARTICLE)
+
+
+class TestSentences:
+    def test_splits_sentences_without_headings(self, digest: ArticleDigest) -> None:
+        result = sentences(digest)
+
+        assert len(result) == 7
+        assert result[2] == (
+            "Python was conceived in the late 1980s by Guido van Rossum."
+        )
+        assert not any("==" in sentence for sentence in result)
+
+
+class TestScores:
+    @pytest.mark.parametrize("score", [textrank_scores, centroid_scores])
+    def test_off_topic_sentence_scores_lowest(self, score, digest) -> None:
+        texts = sentences(digest)
+
+        scores = score(texts)
+
+        assert scores.shape == (len(texts),)
+        assert int(np.argmin(scores)) == 4  # the bananas
+
+    def test_textrank_matches_dense_pagerank(self, digest: ArticleDigest) -> None:
+        texts = sentences(digest)
+        rows, cols, weights, size = sentence_vectors(texts)
+        dense = np.zeros((len(texts), size))
+        dense[rows, cols] = weights
+        similarity = dense @ dense.T
+        np.fill_diagonal(similarity, 0)
+        degree = similarity.sum(axis=1, keepdims=True)
+        # The off-topic sentence has no edges; it keeps only the teleport share
+        transition = similarity / np.where(degree > 0, degree, 1)
+        expected = np.full(len(texts), 1 / len(texts))
+        for _ in range(200):
+            expected = 0.15 / len(texts) + 0.85 * transition.T @ expected
+
+        np.testing.assert_allclose(textrank_scores(texts), expected, atol=1e-5)
+
+    def test_short_sentences_score_zero(self) -> None:
+        assert textrank_scores(["Yes.", "No."]).tolist() == [0.0, 0.0]
+
+
+class TestExtractSummary:
+    def test_returns_short_text_unchanged(self, digest: ArticleDigest) -> None:
+        assert extract_summary(digest, 10_000) == digest.text
+
+    @pytest.mark.parametrize("method", ["textrank", "centroid"])
+    def test_fits_budget_and_keeps_article_order(
+        self, digest: ArticleDigest, method
+    ) -> None:
+        summary = extract_summary(digest, 40, method=method)
+
+        assert estimate_tokens(summary) <= 40
+        assert "Bananas" not in summary
+        picked = [s for s in sentences(digest) if s in summary]
+        assert len(picked) >= 2
+        assert summary.index(picked[0]) < summary.index(picked[-1])
+
+    def test_separates_paragraphs(self, digest: ArticleDigest) -> None:
+        summary = extract_summary(digest, 80)
+
+        assert "\n\n" in summary
+        assert "==" not in summary
+
+    def test_cuts_text_when_no_sentence_fits(self, digest: ArticleDigest) -> None:
+        assert extract_summary(digest, 3) == "Python is a"
+
+    def test_rejects_unknown_method(self, digest: ArticleDigest) -> None:
+        with pytest.raises(ValueError, match="Unknown extractive method"):
+            extract_summary(digest, 40, method="lexrank")
@@ -0,0 +1,162 @@
+import time
+
+import httpx
+import pytest
+
+from solution.servers import wikipedia_client
+from solution.servers.fake_wikimedia import (
+    DEFAULT_FIXTURES,
+    FakeWikimedia,
+    FaultConfig,
+    create_app,
+    load_articles,
+    synthetic_articles,
+)
+from solution.servers.local_corpus import DumpArticle
+from solution.servers.rate_limiter import RetryPolicy
+from solution.servers.wikipedia_client import WikipediaClient
+
+BASE_URL = "http://fake.test"
+
+
+def client_for(fake: FakeWikimedia, **kwargs) -> WikipediaClient:
+    return WikipediaClient(
+        core_api_url=f"{BASE_URL}/core/v1/wikipedia/en",
+        action_api_url=f"{BASE_URL}/w/api.php",
+        transport=httpx.ASGITransport(create_app(fake)),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def fake() -> FakeWikimedia:
+    return FakeWikimedia(load_articles(list(DEFAULT_FIXTURES)))
+
+
+class TestEndpoints:
+    @pytest.mark.asyncio
+    async def test_search_ranks_fixture_articles(self, fake: FakeWikimedia) -> None:
+        pages = await client_for(fake).search_pages("pandas data analysis", 2)
+
+        assert pages[0]["title"] == "Pandas (software)"
+        assert pages[0]["key"] == "Pandas_(software)"
+        assert '<span class="searchmatch">' in pages[0]["excerpt"]
+
+    @pytest.mark.asyncio
+    async def test_pages_redirects_and_missing_titles(
+        self, fake: FakeWikimedia
+    ) -> None:
+        client = client_for(fake)
+
+        page = await client.fetch_page("Python language")
+        missing = await client.fetch_page("No such article")
+
+        assert page.title == "Python (programming language)"
+        assert page.revid == 1250000001
+        assert page.url.endswith("/wiki/Python_(programming_language)")
+        assert "== History ==" in page.text
+        assert missing is None
+
+    @pytest.mark.asyncio
+    async def test_links_continue_past_one_batch(self) -> None:
+        article = DumpArticle(
+            title="Hub", text="Many links.", pageid=7, revid=70, links_count=750
+        )
+        client = client_for(FakeWikimedia([article]))
+
+        _, meta = await client.fetch_page_info("Hub")
+        first = await client.action_query(titles="Hub", prop="links", pllimit="max")
+        rest = await client.action_query(
+            titles="Hub",
+            prop="links",
+            pllimit="max",
+            plcontinue=first["continue"]["plcontinue"],
+        )
+
+        assert meta["links_count"] == 500
+        assert meta["links_count_exact"] is False
+        assert len(rest["query"]["pages"][0]["links"]) == 250
+        assert "continue" not in rest
+
+    @pytest.mark.asyncio
+    async def test_sections(self, fake: FakeWikimedia) -> None:
+        client = client_for(fake)
+
+        sections = await client.fetch_sections("Python (programming language)")
+        text = await client.fetch_section_text("Python (programming language)", "2")
+
+        assert [s["title"] for s in sections] == ["History", "Libraries"]
+        assert text == "Popular libraries include NumPy and pandas."
+        assert await client.fetch_sections("No such article") is None
+
+
+class TestFaults:
+    @pytest.mark.asyncio
+    async def test_latency_is_applied(self, fake: FakeWikimedia) -> None:
+        fake.configure(FaultConfig(latency_ms=50))
+
+        started = time.perf_counter()
+        await client_for(fake).fetch_page("NumPy")
+
+        assert time.perf_counter() - started >= 0.05
+
+    def test_latency_distribution_is_seeded(self, fake: FakeWikimedia) -> None:
+        fake.configure(FaultConfig(latency_ms=80, jitter=0.5, seed=3))
+        first = [fake.latency() for _ in range(200)]
+        fake.configure(FaultConfig(latency_ms=80, jitter=0.5, seed=3))
+
+        assert [fake.latency() for _ in range(200)] == first
+        assert 0.06 < sorted(first)[100] < 0.1
+
+    @pytest.mark.asyncio
+    async def test_injected_errors_are_retried(self, fake: FakeWikimedia) -> None:
+        fake.configure(FaultConfig(error_rate=1.0, error_status=503))
+        client = client_for(fake, retry=RetryPolicy(max_retries=2, base_delay=0.01))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.fetch_page("NumPy")
+
+        assert fake.stats == {"action": {"503": 3}}
+
+    @pytest.mark.asyncio
+    async def test_throttling_sends_retry_after(self, fake: FakeWikimedia) -> None:
+        fake.configure(FaultConfig(rate_limit=0.5, burst=1))
+        app = httpx.ASGITransport(create_app(fake))
+
+        async with httpx.AsyncClient(transport=app, base_url=BASE_URL) as http:
+            ok = await http.get("/w/api.php", params={"titles": "NumPy"})
+            throttled = await http.get("/w/api.php", params={"titles": "NumPy"})
+            stats = (await http.get("/__fake__/stats")).json()
+
+        assert ok.status_code == 200
+        assert throttled.status_code == 429
+        assert throttled.headers["Retry-After"] == "2"
+        assert stats["requests"] == {"action": {"200": 1, "429": 1}}
+
+    @pytest.mark.asyncio
+    async def test_runtime_configuration(self, fake: FakeWikimedia) -> None:
+        app = httpx.ASGITransport(create_app(fake))
+
+        async with httpx.AsyncClient(transport=app, base_url=BASE_URL) as http:
+            updated = await http.post("/__fake__/config", json={"error_rate": 1.0})
+            rejected = await http.post("/__fake__/config", json={"speed": 2})
+
+        assert updated.json()["faults"]["error_rate"] == 1.0
+        assert fake.faults.error_status == 503
+        assert rejected.status_code == 400
+
+
+def test_synthetic_articles_are_deterministic() -> None:
+    first, second = synthetic_articles(3, seed=1), synthetic_articles(3, seed=1)
+
+    assert first == second
+    assert first[0].text.count("== Section") == 7
+
+
+def test_client_can_target_a_fake_api(monkeypatch) -> None:
+    monkeypatch.setenv("WIKIPEDIA_API_URL", "http://127.0.0.1:8089/")
+
+    client = wikipedia_client.create_client_from_env()
+
+    assert client.core_api_url == "http://127.0.0.1:8089/core/v1/wikipedia/en"
+    assert client.action_api_url == "http://127.0.0.1:8089/w/api.php"
@@ -0,0 +1,166 @@
+import asyncio
+import socket
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from solution.servers.load_generator import (
+    RpcError,
+    Sample,
+    ToolCall,
+    build_report,
+    connect,
+    load_mix,
+    run_load,
+)
+
+SERVER = """
+import asyncio
+import sys
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("Load Test Server", port=int(sys.argv[1]) if len(sys.argv) > 1 else 8000)
+
+
+@mcp.tool()
+async def nap(seconds: float) -> str:
+    await asyncio.sleep(seconds)
+    return "rested"
+
+
+@mcp.tool()
+def fail() -> str:
+    raise ValueError("always fails")
+
+
+if __name__ == "__main__":
+    print("Starting load test server...")
+    mcp.run("streamable-http" if len(sys.argv) > 1 else "stdio")
+"""
+
+
+@pytest.fixture
+def server_script(tmp_path: Path) -> Path:
+    path = tmp_path / "server.py"
+    path.write_text(textwrap.dedent(SERVER))
+    return path
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestStdio:
+    @pytest.mark.asyncio
+    async def test_requests_are_pipelined(self, server_script: Path) -> None:
+        mix = [ToolCall("nap", {"seconds": 0.3})]
+
+        async with connect(str(server_script)) as connection:
+            report = await run_load(connection, mix, rate=0, requests=20)
+
+        assert connection.server_info["name"] == "Load Test Server"
+        # The startup banner on stdout is skipped, not treated as a response
+        assert connection.transport.non_json_lines == 1
+        assert report["completed"] == 20
+        assert report["errors"] == {}
+        # Twenty 0.3s calls in flight together, not one after another
+        assert report["elapsed_s"] < 2
+        assert report["latency"]["p50_ms"] >= 300
+
+    @pytest.mark.asyncio
+    async def test_max_rate_runs_for_the_duration(self, server_script: Path) -> None:
+        mix = [ToolCall("nap", {"seconds": 0.01})]
+
+        async with connect(str(server_script)) as connection:
+            report = await run_load(
+                connection, mix, rate=0, concurrency=4, duration=0.5
+            )
+
+        assert report["completed"] > 4
+        assert report["errors"] == {}
+        assert 0.5 <= report["elapsed_s"] < 2
+
+    @pytest.mark.asyncio
+    async def test_errors_and_timeouts_are_counted(self, server_script: Path) -> None:
+        mix = [ToolCall("fail"), ToolCall("nap", {"seconds": 1})]
+
+        async with connect(str(server_script)) as connection:
+            report = await run_load(
+                connection, mix, rate=100, requests=6, timeout=0.5, seed=1
+            )
+            with pytest.raises(RpcError):
+                await connection.request("no/such/method")
+
+        assert report["completed"] == 0
+        assert sum(report["errors"].values()) == 6
+        assert set(report["errors"]) == {"tool_error", "timeout"}
+        assert report["error_rate"] == 1.0
+
+
+class TestHttp:
+    @pytest.mark.asyncio
+    async def test_streamable_http(self, server_script: Path) -> None:
+        port = free_port()
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            str(server_script),
+            str(port),
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            for _ in range(100):
+                try:
+                    _, writer = await asyncio.open_connection("127.0.0.1", port)
+                    writer.close()
+                    break
+                except OSError:
+                    await asyncio.sleep(0.1)
+
+            async with connect(f"http://127.0.0.1:{port}/mcp") as connection:
+                report = await run_load(
+                    connection, [ToolCall("nap", {"seconds": 0.2})], 0, 10
+                )
+        finally:
+            process.terminate()
+            await process.wait()
+
+        assert report["completed"] == 10
+        assert report["elapsed_s"] < 1.5
+
+
+def test_report_percentiles_and_rates() -> None:
+    samples = [Sample("a", i / 1000, "ok") for i in range(1, 101)]
+    samples.append(Sample("b", 1.0, "timeout"))
+
+    report = build_report(samples, elapsed=2.0, settings={"target_rate": 50})
+
+    assert report["target_rate"] == 50
+    assert report["completed"] == 100
+    assert report["throughput_rps"] == 50
+    assert report["errors"] == {"timeout": 1}
+    assert report["latency"]["p50_ms"] == pytest.approx(50, abs=1)
+    assert report["latency"]["p99_ms"] == pytest.approx(99, abs=1)
+    assert report["tools"]["b"] == {
+        "requests": 1,
+        "errors": 1,
+        "latency": {
+            "p50_ms": 0.0,
+            "p90_ms": 0.0,
+            "p95_ms": 0.0,
+            "p99_ms": 0.0,
+            "max_ms": 0.0,
+            "mean_ms": 0.0,
+        },
+    }
+
+
+def test_example_mix_loads() -> None:
+    mix = load_mix(Path(__file__).parent / "fixtures" / "wikipedia_mix.json")
+
+    assert {call.tool for call in mix} >= {"search_wikipedia", "get_article_summary"}
@@ -0,0 +1,139 @@
+import bz2
+from pathlib import Path
+
+import pytest
+
+from solution.servers import local_corpus, wikipedia_client, wikipedia_server
+from solution.servers.local_corpus import (
+    LocalCorpus,
+    build_corpus,
+    read_dump,
+    wikitext_to_plain,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def corpus(tmp_path: Path):
+    dump = tmp_path / "sample_dump.xml.bz2"
+    dump.write_bytes(bz2.compress((FIXTURES / "sample_dump.xml").read_bytes()))
+    build_corpus(read_dump(dump), tmp_path / "corpus")
+
+    corpus = LocalCorpus(tmp_path / "corpus")
+    yield corpus
+    corpus.close()
+
+
+class TestBuildCorpus:
+    def test_skips_non_article_namespaces(self, corpus: LocalCorpus) -> None:
+        assert list(corpus.titles()) == [
+            "Amsterdam",
+            "Pandas (software)",
+            "Python (programming language)",
+            "Python language",
+        ]
+
+    def test_wikitext_is_reduced_to_plain_text(self) -> None:
+        text = wikitext_to_plain(
+            "{{Infobox|x=1}}'''Python''' is a [[programming language]]"
+            "<ref>cite</ref> by [[Guido van Rossum|Guido]].\n\n[[Category:X]]"
+        )
+
+        assert text == "Python is a programming language by Guido."
+
+    def test_parsed_pages_are_released(self, monkeypatch) -> None:
+        parsed = []
+        iterparse = local_corpus.ET.iterparse
+
+        def spy(source, events):
+            for event, elem in iterparse(source, events):
+                parsed.append(elem)
+                yield event, elem
+
+        monkeypatch.setattr(local_corpus.ET, "iterparse", spy)
+        articles = list(read_dump(FIXTURES / "sample_dump.xml"))
+
+        root = parsed[-1]  # the last element to end
+        assert len(articles) == 4
+        assert [child.tag for child in root if child.tag.endswith("page")] == []
+
+    def test_reads_jsonl_extracts(self, tmp_path: Path) -> None:
+        build_corpus(read_dump(FIXTURES / "sample_articles.jsonl"), tmp_path / "c")
+        corpus = LocalCorpus(tmp_path / "c")
+
+        assert list(corpus.titles()) == ["NumPy", "SciPy"]
+        corpus.close()
+
+
+class TestLocalCorpus:
+    @pytest.mark.asyncio
+    async def test_fetch_page_by_normalized_title(self, corpus: LocalCorpus) -> None:
+        page = await corpus.fetch_page("python_(programming language)")
+
+        assert page is not None
+        assert page.title == "Python (programming language)"
+        assert page.revid == 1250000001
+        assert page.summary.startswith("Python is a high-level")
+        assert "== History ==" in page.text
+
+    @pytest.mark.asyncio
+    async def test_follows_redirects(self, corpus: LocalCorpus) -> None:
+        page = await corpus.fetch_page("Python language")
+
+        assert page is not None
+        assert page.title == "Python (programming language)"
+
+    @pytest.mark.asyncio
+    async def test_missing_title(self, corpus: LocalCorpus) -> None:
+        assert await corpus.fetch_page("Rotterdam") is None
+        assert corpus.find("Zzz") is None
+
+    @pytest.mark.asyncio
+    async def test_info_from_dump_metadata(self, corpus: LocalCorpus) -> None:
+        page, meta = await corpus.fetch_page_info("Amsterdam")
+
+        assert page.title == "Amsterdam"
+        assert meta["categories"] == ["Category:Capitals in Europe"]
+        assert meta["links_count"] == 2
+
+    def test_text_view_is_zero_copy(self, corpus: LocalCorpus) -> None:
+        view = corpus.text_view(corpus.find("Amsterdam"))
+
+        assert isinstance(view, memoryview)
+        assert bytes(view[:9]) == b"Amsterdam"
+        view.release()
+
+
+class TestServerWithLocalBackend:
+    @pytest.fixture(autouse=True)
+    def local_backend(self, corpus: LocalCorpus, monkeypatch):
+        monkeypatch.setattr(wikipedia_server, "persistent_cache", None)
+        wikipedia_server.article_cache.clear()
+        wikipedia_client.set_client(corpus)
+        yield
+        wikipedia_client.set_client(None)
+        wikipedia_server.article_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_tools_serve_from_corpus(self) -> None:
+        titles = await wikipedia_server.search_wikipedia("python")
+        summary = await wikipedia_server.get_article_summary(titles[0], 1)
+        info = await wikipedia_server.get_article_info("Pandas (software)")
+
+        # BM25 ranks the article itself above Pandas, which only mentions Python
+        assert titles == ["Python (programming language)", "Pandas (software)"]
+        assert summary.startswith("Python is a high-level")
+        assert info["url"] == "https://en.wikipedia.org/wiki/Pandas_(software)"
+
+    def test_backend_selected_by_environment(
+        self, corpus: LocalCorpus, monkeypatch
+    ) -> None:
+        monkeypatch.setenv("WIKIPEDIA_BACKEND", "local")
+        monkeypatch.setenv("WIKIPEDIA_CORPUS", str(corpus.path))
+
+        backend = wikipedia_client.create_client_from_env()
+
+        assert isinstance(backend, LocalCorpus)
+        assert len(backend) == 4
+        backend.close()
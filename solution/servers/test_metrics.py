@@ -0,0 +1,151 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from solution.servers import wikipedia_server
+from solution.servers.metrics import Histogram, Metrics, metrics
+from solution.servers.wikipedia_client import WikipediaClient
+
+
+class TestHistogram:
+    def test_quantiles_fall_in_the_right_bucket(self) -> None:
+        histogram = Histogram()
+        for _ in range(90):
+            histogram.observe(0.001)
+        for _ in range(10):
+            histogram.observe(0.5)
+
+        assert histogram.quantile(0.5) == pytest.approx(0.001, rel=0.5)
+        assert histogram.quantile(0.99) == pytest.approx(0.5, rel=0.5)
+        summary = histogram.summary()
+        assert summary["count"] == 100
+        assert summary["mean_ms"] == pytest.approx(50.9)
+
+    def test_empty_histogram(self) -> None:
+        assert Histogram().summary() == {
+            "count": 0,
+            "mean_ms": 0.0,
+            "p50_ms": 0.0,
+            "p95_ms": 0.0,
+            "p99_ms": 0.0,
+        }
+
+
+class TestInstrument:
+    @pytest.mark.asyncio
+    async def test_counts_calls_errors_and_concurrency(self) -> None:
+        registry = Metrics()
+
+        @registry.instrument
+        async def tool(fail: bool = False) -> str:
+            await asyncio.sleep(0.01)
+            if fail:
+                raise ValueError("boom")
+            return "ok"
+
+        results = await asyncio.gather(
+            tool(), tool(), tool(fail=True), return_exceptions=True
+        )
+
+        assert results[:2] == ["ok", "ok"]
+        stats = await registry.snapshot()
+        assert stats["tools"]["tool"]["calls"] == 3
+        assert stats["tools"]["tool"]["errors"] == 1
+        assert stats["tools"]["tool"]["in_flight"] == 0
+        assert stats["peak_in_flight"] == 3
+        assert stats["tools"]["tool"]["latency"]["p50_ms"] >= 5
+
+    @pytest.mark.asyncio
+    async def test_nested_tool_calls_are_not_counted(self) -> None:
+        registry = Metrics()
+
+        @registry.instrument
+        async def inner() -> int:
+            return 1
+
+        @registry.instrument
+        async def outer() -> int:
+            return await inner() + await inner()
+
+        assert await outer() == 2
+        assert await inner() == 1
+        assert (await registry.snapshot())["tools"]["outer"]["calls"] == 1
+        assert (await registry.snapshot())["tools"]["inner"]["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sync_functions_keep_their_signature(self) -> None:
+        registry = Metrics()
+
+        @registry.instrument
+        def greet(name: str) -> str:
+            """Say hello."""
+            return f"Hello {name}"
+
+        assert greet("PyData") == "Hello PyData"
+        assert greet.__doc__ == "Say hello."
+        assert (await registry.snapshot())["tools"]["greet"]["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_overhead_is_microseconds(self) -> None:
+        registry = Metrics()
+
+        async def bare() -> None:
+            return None
+
+        instrumented = registry.instrument(bare)
+        calls = 5000
+
+        started = time.perf_counter()
+        for _ in range(calls):
+            await bare()
+        baseline = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(calls):
+            await instrumented()
+        overhead = (time.perf_counter() - started - baseline) / calls
+
+        assert overhead < 50e-6
+
+
+class TestExport:
+    @pytest.mark.asyncio
+    async def test_prometheus_text(self) -> None:
+        registry = Metrics()
+        registry.instrument(lambda: None)()
+        registry.observe_upstream("search", 0.2, "200")
+        registry.observe_upstream("search", 0.1, "429")
+        registry.register_source("cache", lambda: {"hits": 3, "memory": {"items": 1}})
+
+        async def disk() -> dict:
+            return {"pages": 2}
+
+        registry.register_source("disk", disk)
+
+        text = await registry.prometheus()
+
+        assert 'mcp_tool_calls_total{tool="<lambda>"} 1' in text
+        assert 'mcp_upstream_requests_total{endpoint="search",status="429"} 1' in text
+        assert 'mcp_upstream_duration_seconds_count{endpoint="search"} 2' in text
+        assert (
+            'mcp_upstream_duration_seconds_bucket{endpoint="search",le="+Inf"} 2'
+            in (text)
+        )
+        assert 'mcp_hits{source="cache"} 3' in text
+        assert 'mcp_memory_items{source="cache"} 1' in text
+        assert 'mcp_pages{source="disk"} 2' in text
+
+    @pytest.mark.asyncio
+    async def test_server_resource(self, client: WikipediaClient) -> None:
+        await wikipedia_server.get_article_summary("Python")
+        await wikipedia_server.get_article_summaries(["Python", "Python"])
+
+        contents = await wikipedia_server.mcp.read_resource("metrics://server")
+        snapshot = json.loads(list(contents)[0].content)
+
+        assert snapshot["tools"]["get_article_summary"]["calls"] == 1
+        assert snapshot["tools"]["get_article_summaries"]["calls"] == 1
+        assert snapshot["upstream"]["action"]["statuses"] == {"200": 1}
+        assert snapshot["sources"]["article_cache"]["hits"] >= 2
+        assert (await metrics.snapshot())["in_flight"] == 0
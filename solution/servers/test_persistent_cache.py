@@ -0,0 +1,188 @@
+import sqlite3
+import threading
+
+import httpx
+import pytest
+
+from solution.servers import wikipedia_client, wikipedia_server
+from solution.servers.persistent_cache import PersistentCache
+from solution.servers.test_wikipedia_client import ARTICLE_TEXT, fake_wikimedia
+from solution.servers.wikipedia_client import WikiPage, WikipediaClient
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def store(tmp_path, clock: FakeClock):
+    store = PersistentCache(tmp_path / "cache.db", ttl=60, clock=clock)
+    yield store
+    store.close()
+
+
+class TestPersistentCache:
+    def test_uses_wal_journal(self, store: PersistentCache) -> None:
+        mode = store.conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+        assert mode == "wal"
+
+    def test_page_round_trip_survives_reopen(
+        self, store: PersistentCache, tmp_path
+    ) -> None:
+        page = WikiPage(title="Python", url="u", text="Text", pageid=1, revid=7)
+        store.put_page("en", "python", page, {"links_count": 3})
+        store.close()
+
+        reopened = PersistentCache(tmp_path / "cache.db")
+        stored = reopened.get_page("en", "Python")
+        reopened.close()
+
+        assert stored is not None
+        assert stored.page == page
+        assert stored.meta == {"links_count": 3}
+
+    def test_search_results_expire(
+        self, store: PersistentCache, clock: FakeClock
+    ) -> None:
+        store.put_search("en", "Python", 5, ["Python"])
+
+        assert store.get_search("en", " python ", 5) == ["Python"]
+        clock.now += 61
+        assert store.get_search("en", "python", 5) is None
+
+    def test_prunes_oldest_pages_beyond_max_bytes(
+        self, tmp_path, clock: FakeClock
+    ) -> None:
+        store = PersistentCache(tmp_path / "small.db", max_bytes=25, clock=clock)
+        for title in ("A", "B", "C"):
+            page = WikiPage(title=title, url="u", text="x" * 10, pageid=1, revid=1)
+            store.put_page("en", title, page)
+            clock.now += 1
+        stats = store.stats()
+        oldest, newest = store.get_page("en", "A"), store.get_page("en", "C")
+        store.close()
+
+        assert oldest is None
+        assert newest is not None
+        assert stats["pages"] == 2
+        assert stats["bytes"] == 20
+        assert stats["evictions"] == 1
+
+    def test_adds_sizes_to_an_older_database(self, tmp_path) -> None:
+        conn = sqlite3.connect(tmp_path / "old.db")
+        conn.execute(
+            "CREATE TABLE pages (language TEXT NOT NULL, key TEXT NOT NULL, "
+            "title TEXT NOT NULL, url TEXT NOT NULL, text TEXT NOT NULL, "
+            "pageid INTEGER, revid INTEGER, meta TEXT, fetched_at REAL NOT NULL, "
+            "PRIMARY KEY (language, key))"
+        )
+        conn.execute(
+            "INSERT INTO pages VALUES ('en', 'Python', 'Python', 'u', 'Text', 1, 7, "
+            "NULL, 1.0)"
+        )
+        conn.commit()
+        conn.close()
+
+        store = PersistentCache(tmp_path / "old.db")
+        stats = store.stats()
+        stored = store.get_page("en", "Python")
+        store.close()
+
+        assert (stats["pages"], stats["bytes"]) == (1, 4)
+        assert stored is not None and stored.page.text == "Text"
+
+    def test_replacing_a_page_updates_the_size(self, store: PersistentCache) -> None:
+        for text in ("x" * 10, "y" * 4):
+            page = WikiPage(title="Python", url="u", text=text, pageid=1, revid=7)
+            store.put_page("en", "Python", page)
+
+        assert store.stats()["bytes"] == 4
+
+    def test_prunes_expired_searches(
+        self, store: PersistentCache, clock: FakeClock
+    ) -> None:
+        store.put_search("en", "old", 5, ["Old"])
+        clock.now += 61
+        page = WikiPage(title="Python", url="u", text="Text", pageid=1, revid=7)
+        store.put_page("en", "Python", page)
+
+        assert store.stats()["searches"] == 0
+
+    def test_page_batches(self, store: PersistentCache) -> None:
+        for title in ("A", "B", "C"):
+            page = WikiPage(title=title, url="u", text=title, pageid=1, revid=1)
+            store.put_page("en", title, page)
+
+        first = store.page_batch("en", limit=2)
+        rest = store.page_batch("en", after=first[-1][0], limit=2)
+
+        assert [title for _, title, _ in first + rest] == ["A", "B", "C"]
+        assert store.page_batch("de") == []
+
+    @pytest.mark.asyncio
+    async def test_run_uses_worker_thread(self, store: PersistentCache) -> None:
+        def current_thread() -> str:
+            return threading.current_thread().name
+
+        store.put_search("en", "Python", 5, ["Python"])
+
+        assert await store.run(store.get_search, "en", "python", 5) == ["Python"]
+        assert (await store.run(current_thread)).startswith("wikipedia-cache")
+
+
+class TestServerIntegration:
+    @pytest.fixture
+    def requests_seen(self, store: PersistentCache, monkeypatch):
+        seen: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return fake_wikimedia(request)
+
+        monkeypatch.setattr(wikipedia_server, "persistent_cache", store)
+        wikipedia_server.article_cache.clear()
+        wikipedia_client.set_client(
+            WikipediaClient(transport=httpx.MockTransport(handler))
+        )
+        yield seen
+        wikipedia_client.set_client(None)
+        wikipedia_server.article_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_cold_start_is_served_from_disk(
+        self, requests_seen: list[httpx.Request]
+    ) -> None:
+        await wikipedia_server.get_article_content("Python")
+        await wikipedia_server.search_wikipedia("python")
+        wikipedia_server.article_cache.clear()  # simulate a new server process
+
+        content = await wikipedia_server.get_article_content("Python")
+        titles = await wikipedia_server.search_wikipedia("python")
+
+        assert content == ARTICLE_TEXT
+        assert titles == ["Python", "Pandas"]
+        assert len(requests_seen) == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_page_is_revalidated_by_revision_id(
+        self, requests_seen: list[httpx.Request], clock: FakeClock
+    ) -> None:
+        await wikipedia_server.get_article_content("Python")
+        wikipedia_server.article_cache.clear()
+        clock.now += 120
+
+        content = await wikipedia_server.get_article_content("Python")
+
+        assert content == ARTICLE_TEXT
+        assert len(requests_seen) == 2
+        assert requests_seen[1].url.params["prop"] == "info"
@@ -0,0 +1,186 @@
+import asyncio
+
+import httpx
+import pytest
+
+from solution.servers import prefetch, wikipedia_server
+from solution.servers.prefetch import Prefetcher
+from solution.servers.wikipedia_client import WikipediaClient
+
+
+class FakeStore:
+    def __init__(self) -> None:
+        self.pages: set[str] = set()
+        self.loads: list[str] = []
+        self.stop = False
+
+    async def load(self, title: str) -> None:
+        self.loads.append(title)
+        await asyncio.sleep(0.01)
+        if title == "Missing":
+            raise ValueError("not found")
+        self.pages.add(title)
+
+    def prefetcher(self, top_k: int = 2) -> Prefetcher:
+        return Prefetcher(
+            load=self.load,
+            is_cached=lambda title: title in self.pages,
+            should_stop=lambda: self.stop,
+            top_k=top_k,
+        )
+
+
+class TestPrefetcher:
+    @pytest.mark.asyncio
+    async def test_fetches_top_k_uncached_titles(self) -> None:
+        store = FakeStore()
+        store.pages.add("A")
+        prefetcher = store.prefetcher(top_k=3)
+
+        prefetcher.schedule(["A", "B", "C", "D"])
+        await prefetcher.wait()
+
+        assert store.loads == ["B", "C"]
+        assert prefetcher.stats()["fetched"] == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self) -> None:
+        store = FakeStore()
+        prefetcher = store.prefetcher(top_k=0)
+
+        prefetcher.schedule(["A"])
+        await prefetcher.wait()
+
+        assert store.loads == []
+
+    @pytest.mark.asyncio
+    async def test_hits_and_waste(self) -> None:
+        store = FakeStore()
+        prefetcher = store.prefetcher()
+        prefetcher.schedule(["A", "B"])
+        await prefetcher.wait()
+
+        prefetcher.record_use("a")
+        prefetcher.record_use("a")
+        store.pages.discard("B")  # evicted before anyone read it
+        stats = prefetcher.stats()
+
+        assert stats["hits"] == 1
+        assert stats["wasted"] == 1
+        assert stats["hit_rate"] == stats["waste_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_request_joining_in_flight_prefetch_is_a_hit(self) -> None:
+        store = FakeStore()
+        prefetcher = store.prefetcher(top_k=1)
+        prefetcher.schedule(["A"])
+        await asyncio.sleep(0.001)
+
+        prefetcher.record_use("A")
+        await prefetcher.wait()
+
+        assert prefetcher.stats()["hits"] == 1
+        assert prefetcher.stats()["pending_use"] == 0
+
+    @pytest.mark.asyncio
+    async def test_untracked_unused_pages_are_waste(self, monkeypatch) -> None:
+        monkeypatch.setattr(prefetch, "MAX_TRACKED", 1)
+        store = FakeStore()
+        prefetcher = store.prefetcher()
+
+        prefetcher.schedule(["A", "B"])
+        await prefetcher.wait()
+        prefetcher.record_use("A")  # no longer tracked
+        stats = prefetcher.stats()
+
+        assert stats["hits"] == 0
+        assert stats["wasted"] == 1
+        assert stats["pending_use"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stops_when_told_to_back_off(self) -> None:
+        store = FakeStore()
+        store.stop = True
+        prefetcher = store.prefetcher()
+
+        prefetcher.schedule(["A", "B"])
+        await prefetcher.wait()
+
+        assert store.loads == []
+        assert prefetcher.stats()["cancelled"] == 2
+
+    @pytest.mark.asyncio
+    async def test_new_search_supersedes_old_prefetch(self) -> None:
+        store = FakeStore()
+        prefetcher = store.prefetcher()
+
+        prefetcher.schedule(["A", "B"])
+        await asyncio.sleep(0.001)
+        prefetcher.schedule(["C"])
+        await prefetcher.wait()
+
+        assert "B" not in store.loads
+        assert store.loads[-1] == "C"
+        assert prefetcher.stats()["cancelled"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted(self) -> None:
+        store = FakeStore()
+        prefetcher = store.prefetcher()
+
+        prefetcher.schedule(["Missing", "A"])
+        await prefetcher.wait()
+
+        assert prefetcher.stats()["failed"] == 1
+        assert prefetcher.stats()["fetched"] == 1
+
+
+class TestServerPrefetch:
+    @pytest.mark.asyncio
+    async def test_follow_up_summaries_are_cache_hits(
+        self,
+        client: WikipediaClient,
+        requests_seen: list[httpx.Request],
+        monkeypatch,
+    ) -> None:
+        monkeypatch.setattr(wikipedia_server.prefetcher, "top_k", 2)
+
+        titles = await wikipedia_server.search_wikipedia("python")
+        await wikipedia_server.prefetcher.wait()
+        fetched = len(requests_seen)
+        for title in titles:
+            await wikipedia_server.get_article_summary(title)
+
+        assert fetched == 3  # the search plus two prefetched pages
+        assert len(requests_seen) == fetched
+        assert wikipedia_server.prefetcher.stats()["hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_info_lookups_are_not_hits(
+        self, client: WikipediaClient, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(wikipedia_server.prefetcher, "top_k", 1)
+
+        titles = await wikipedia_server.search_wikipedia("python")
+        await wikipedia_server.prefetcher.wait()
+        await wikipedia_server.get_article_info(titles[0])
+        stats = wikipedia_server.prefetcher.stats()
+
+        assert stats["hits"] == 0
+        assert stats["pending_use"] == 1
+
+    @pytest.mark.asyncio
+    async def test_backs_off_when_limiter_is_saturated(
+        self,
+        client: WikipediaClient,
+        requests_seen: list[httpx.Request],
+        monkeypatch,
+    ) -> None:
+        monkeypatch.setattr(wikipedia_server.prefetcher, "top_k", 2)
+        client.limiters["action"].pause(1.0)
+
+        await wikipedia_server.search_wikipedia("python")
+        await wikipedia_server.prefetcher.wait()
+
+        assert len(requests_seen) == 1
+        assert wikipedia_server.prefetcher.stats()["cancelled"] == 2
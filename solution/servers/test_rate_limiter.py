@@ -0,0 +1,161 @@
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from solution.servers.rate_limiter import RateLimiter, RetryPolicy, parse_retry_after
+from solution.servers.test_wikipedia_client import fake_wikimedia
+from solution.servers.wikipedia_client import WikipediaClient
+
+
+def flaky(failures: list[httpx.Response], requests_seen: list[httpx.Request]):
+    """Transport handler answering with `failures` first, then normally."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        if failures:
+            return failures.pop(0)
+        return fake_wikimedia(request)
+
+    return httpx.MockTransport(handler)
+
+
+class TestRetryPolicy:
+    def test_parses_retry_after_seconds_and_dates(self) -> None:
+        later = datetime.now(UTC) + timedelta(seconds=30)
+
+        assert parse_retry_after("2") == 2.0
+        assert 25 < parse_retry_after(format_datetime(later, usegmt=True)) <= 30
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_backoff_is_jittered_and_capped(self) -> None:
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+
+        delays = [policy.delay(attempt) for attempt in range(6)]
+
+        assert all(
+            0 <= delay <= min(5.0, 2**attempt) for attempt, delay in enumerate(delays)
+        )
+
+    def test_honours_retry_after_up_to_max_delay(self) -> None:
+        policy = RetryPolicy(max_delay=5.0)
+
+        assert policy.delay(0, retry_after=3.0) == 3.0
+        assert policy.delay(0, retry_after=60.0) is None
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_burst_then_sustained_rate(self) -> None:
+        limiter = RateLimiter(rate=50, burst=2)
+
+        start = time.perf_counter()
+        for _ in range(5):
+            async with limiter:
+                pass
+        elapsed = time.perf_counter() - start
+
+        # Two requests go straight through, three wait 20ms each
+        assert 0.05 <= elapsed < 0.2
+        assert limiter.stats()["requests"] == 5
+
+    @pytest.mark.asyncio
+    async def test_caps_requests_in_flight(self) -> None:
+        limiter = RateLimiter(rate=1000, burst=100, max_concurrent=2)
+        in_flight = peak = 0
+
+        async def call() -> None:
+            nonlocal in_flight, peak
+            async with limiter:
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        await asyncio.gather(*(call() for _ in range(6)))
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_pause_halves_rate_and_recovers(self) -> None:
+        limiter = RateLimiter(rate=100, burst=5)
+        limiter.pause(0.05)
+
+        start = time.perf_counter()
+        await limiter.acquire()
+        limiter.release()
+
+        assert time.perf_counter() - start >= 0.05
+        assert limiter.rate == 50
+        for _ in range(20):
+            limiter.record_success()
+        assert limiter.rate == 100
+
+
+class TestClientRetries:
+    @pytest.mark.asyncio
+    async def test_retries_after_429_with_retry_after(self) -> None:
+        requests_seen = []
+        client = WikipediaClient(
+            transport=flaky(
+                [httpx.Response(429, headers={"Retry-After": "0.05"})], requests_seen
+            )
+        )
+
+        start = time.perf_counter()
+        titles = await client.search_pages("python")
+        elapsed = time.perf_counter() - start
+
+        assert [page["title"] for page in titles] == ["Python", "Pandas"]
+        assert len(requests_seen) == 2
+        assert elapsed >= 0.05
+        assert client.limiters["search"].stats()["throttled"] == 1
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_retries_transport_errors(self) -> None:
+        attempts = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            attempts.append(request)
+            if len(attempts) == 1:
+                raise httpx.ConnectError("connection reset", request=request)
+            return fake_wikimedia(request)
+
+        client = WikipediaClient(
+            transport=httpx.MockTransport(handler),
+            retry=RetryPolicy(base_delay=0.01),
+        )
+
+        page = await client.fetch_page("Python")
+
+        assert page is not None
+        assert len(attempts) == 2
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self) -> None:
+        requests_seen = []
+        client = WikipediaClient(
+            transport=flaky([httpx.Response(503)] * 5, requests_seen),
+            retry=RetryPolicy(max_retries=2, base_delay=0.01),
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.fetch_page("Python")
+        assert len(requests_seen) == 3
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self) -> None:
+        requests_seen = []
+        client = WikipediaClient(transport=flaky([httpx.Response(400)], requests_seen))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.fetch_page("Python")
+        assert len(requests_seen) == 1
+        await client.aclose()
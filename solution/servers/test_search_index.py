@@ -0,0 +1,248 @@
+import threading
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pytest
+
+from solution.servers import search_index, wikipedia_client, wikipedia_server
+from solution.servers.rate_limiter import RetryPolicy
+from solution.servers.search_index import (
+    SearchIndex,
+    _decode_postings,
+    _write_varint,
+    tokenize,
+)
+from solution.servers.test_wikipedia_client import ARTICLE_TEXT, fake_wikimedia
+from solution.servers.wikipedia_client import WikiPage, WikipediaClient
+
+DOCS = {
+    "Python (programming language)": "Python is a programming language. "
+    "Python code is readable and Python is popular.",
+    "Pandas (software)": "Pandas is a data analysis library written for Python.",
+    "Amsterdam": "Amsterdam is the capital of the Netherlands.",
+}
+
+
+@pytest.fixture
+def index() -> SearchIndex:
+    index = SearchIndex()
+    for title, text in DOCS.items():
+        index.add(title, text)
+    return index
+
+
+class TestSearchIndex:
+    def test_tokenize_drops_stopwords(self) -> None:
+        assert tokenize("The History of Python, 1991") == ["history", "python", "1991"]
+
+    def test_ranks_by_relevance(self, index: SearchIndex) -> None:
+        assert index.search("python") == [
+            "Python (programming language)",
+            "Pandas (software)",
+        ]
+        assert index.search("netherlands capital") == ["Amsterdam"]
+        assert index.search("rotterdam") == []
+
+    def test_title_terms_are_boosted(self) -> None:
+        index = SearchIndex()
+        index.add("Library", "A place holding books.")
+        index.add("Shelf", "Furniture found in a library.")
+
+        assert index.search("library") == ["Library", "Shelf"]
+
+    def test_limit_keeps_best_matches(self, index: SearchIndex) -> None:
+        assert index.search("python", limit=1) == ["Python (programming language)"]
+
+    def test_re_adding_replaces_document(self, index: SearchIndex) -> None:
+        index.add("Amsterdam", "Amsterdam has many canals.")
+
+        assert len(index) == 3
+        assert index.search("capital") == []
+        assert index.search("canals") == ["Amsterdam"]
+
+    def test_same_revision_is_not_reindexed(self) -> None:
+        index = SearchIndex()
+        index.add("Amsterdam", "The capital.", revid=1)
+        index.add("Amsterdam", "Has canals.", revid=1)
+
+        assert index.search("capital") == ["Amsterdam"]
+        assert index.stats()["tombstones"] == 0
+
+        index.add("Amsterdam", "Has canals.", revid=2)
+
+        assert index.search("canals") == ["Amsterdam"]
+        assert index.search("capital") == []
+
+    def test_replacing_updates_document_frequencies(self, index: SearchIndex) -> None:
+        index.add("Amsterdam", "Amsterdam has many canals.")
+
+        assert index._df["canals"] == 1
+        assert "capital" not in index._df
+        assert index._df["amsterdam"] == 1
+
+    def test_compacts_once_tombstones_outnumber_documents(self, monkeypatch) -> None:
+        monkeypatch.setattr(search_index, "COMPACT_MIN_TOMBSTONES", 2)
+        index = SearchIndex()
+        index.add("Python", "A programming language.")
+        index.add("Amsterdam", "The capital of the Netherlands.")
+        for text in ["Has canals.", "Has bridges.", "Has museums."]:
+            index.add("Amsterdam", text)
+
+        assert index.stats()["compactions"] == 1
+        assert index.stats()["tombstones"] <= len(index)
+        assert "capital" not in index._postings
+        assert index.search("museums") == ["Amsterdam"]
+        assert index.search("programming") == ["Python"]
+
+    def test_postings_bytes_stay_counted(self, monkeypatch, tmp_path: Path) -> None:
+        monkeypatch.setattr(search_index, "COMPACT_MIN_TOMBSTONES", 2)
+        index = SearchIndex()
+        for title, text in [*DOCS.items(), ("Amsterdam", "Has canals.")] * 2:
+            index.add(title, text)
+        index.save(tmp_path)
+        loaded = SearchIndex.load(tmp_path)
+        assert loaded is not None
+
+        for counted in (index, loaded):
+            actual = sum(len(p) for p in counted._postings.values())
+            assert counted.stats()["postings_bytes"] == actual
+        assert index.stats()["compactions"] >= 1
+
+    def test_stats_while_adding_on_another_thread(self) -> None:
+        index = SearchIndex()
+
+        def add_many() -> None:
+            for i in range(2000):
+                index.add(f"Title {i}", f"term{i} shared words {i * 7}")
+
+        adder = threading.Thread(target=add_many)
+        adder.start()
+        while adder.is_alive():
+            index.stats()
+        adder.join()
+
+        assert index.stats()["documents"] == 2000
+
+    def test_max_docs_drops_oldest_documents(self) -> None:
+        index = SearchIndex(max_docs=2)
+        for title, text in DOCS.items():
+            index.add(title, text)
+
+        assert len(index) == 2
+        assert "Python (programming language)" not in index
+        assert index.search("python") == ["Pandas (software)"]
+        assert index._df["python"] == 1
+        assert index.stats()["evictions"] == 1
+
+    def test_dropping_loaded_document_updates_frequencies(
+        self, index: SearchIndex, tmp_path: Path
+    ) -> None:
+        index.save(tmp_path)
+        loaded = SearchIndex.load(tmp_path)
+        assert loaded is not None
+
+        loaded.add("Pandas (software)", "A bear.")
+
+        assert loaded._df["python"] == 1
+        assert loaded.search("analysis") == []
+
+    def test_decodes_multi_byte_varints(self) -> None:
+        postings = bytearray()
+        for gap, freq in [(0, 1), (300, 2), (70000, 129)]:
+            _write_varint(gap, postings)
+            _write_varint(freq, postings)
+
+        docs, freqs = _decode_postings(postings)
+
+        assert docs.tolist() == [0, 300, 70300]
+        assert freqs.tolist() == [1, 2, 129]
+
+    def test_save_and_load_round_trip(self, index: SearchIndex, tmp_path: Path) -> None:
+        index.add("Amsterdam", "Amsterdam has many canals.")
+        index.save(tmp_path)
+
+        loaded = SearchIndex.load(tmp_path)
+
+        assert loaded is not None
+        assert len(loaded) == 3
+        for query in ["python", "canals", "capital"]:
+            assert loaded.search(query) == index.search(query)
+        assert np.array_equal(loaded._lengths, index._lengths)
+
+    def test_load_without_index(self, tmp_path: Path) -> None:
+        assert SearchIndex.load(tmp_path) is None
+
+
+class TestServerLocalSearch:
+    @pytest.mark.asyncio
+    async def test_local_mode_searches_cached_pages(self, monkeypatch) -> None:
+        monkeypatch.setattr(wikipedia_server, "local_search", True)
+        wikipedia_server.persistent_cache.put_page(
+            "en",
+            "Python",
+            WikiPage(
+                title="Python",
+                url="https://en.wikipedia.org/wiki/Python",
+                text=ARTICLE_TEXT,
+            ),
+        )
+        requests_seen = []
+        wikipedia_client.set_client(
+            WikipediaClient(transport=httpx.MockTransport(requests_seen.append))
+        )
+        try:
+            titles = await wikipedia_server.search_wikipedia("history of python")
+        finally:
+            wikipedia_client.set_client(None)
+
+        assert titles == ["Python"]
+        assert requests_seen == []
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_index_when_search_fails(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith("/search/page"):
+                return httpx.Response(503)
+            return fake_wikimedia(request)
+
+        wikipedia_client.set_client(
+            WikipediaClient(
+                transport=httpx.MockTransport(handler),
+                retry=RetryPolicy(max_retries=0),
+            )
+        )
+        try:
+            await wikipedia_server.get_article_summary("Python")
+            titles = await wikipedia_server.search_wikipedia("programming language")
+        finally:
+            wikipedia_client.set_client(None)
+
+        assert titles == ["Python"]
+
+    @pytest.mark.asyncio
+    async def test_warm_up_indexes_on_worker_thread(self, monkeypatch) -> None:
+        threads = []
+        index_pages = wikipedia_server._index_pages
+
+        def spy(rows: list) -> None:
+            threads.append(threading.current_thread())
+            index_pages(rows)
+
+        monkeypatch.setattr(wikipedia_server, "local_search", True)
+        monkeypatch.setattr(wikipedia_server, "_index_pages", spy)
+        wikipedia_server.persistent_cache.put_page(
+            "en", "Python", WikiPage(title="Python", url="u", text=ARTICLE_TEXT)
+        )
+        wikipedia_client.set_client(
+            WikipediaClient(transport=httpx.MockTransport(fake_wikimedia))
+        )
+        try:
+            titles = await wikipedia_server.search_wikipedia("history of python")
+            await wikipedia_server.search_wikipedia("python")
+        finally:
+            wikipedia_client.set_client(None)
+
+        assert titles == ["Python"]
+        assert len(threads) == 1
+        assert threads[0] is not threading.main_thread()
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from solution.servers.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_fetch(self) -> None:
+        flight = SingleFlight()
+        fetches = 0
+
+        async def fetch() -> str:
+            nonlocal fetches
+            fetches += 1
+            await asyncio.sleep(0.01)
+            return "page"
+
+        results = await asyncio.gather(*(flight.do("Python", fetch) for _ in range(5)))
+
+        assert results == ["page"] * 5
+        assert fetches == 1
+        assert flight.stats() == {
+            "calls": 5,
+            "coalesced": 4,
+            "abandoned": 0,
+            "in_flight": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared(self) -> None:
+        flight = SingleFlight()
+
+        async def fetch() -> str:
+            await asyncio.sleep(0.01)
+            raise ValueError("not found")
+
+        results = await asyncio.gather(
+            flight.do("Missing", fetch),
+            flight.do("Missing", fetch),
+            return_exceptions=True,
+        )
+
+        assert [str(result) for result in results] == ["not found", "not found"]
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_fetch_again(self) -> None:
+        flight = SingleFlight()
+
+        async def fetch() -> int:
+            return flight.calls
+
+        assert await flight.do("a", fetch) == 1
+        assert await flight.do("a", fetch) == 2
+        assert flight.coalesced == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self) -> None:
+        flight = SingleFlight()
+
+        async def fetch() -> str:
+            await asyncio.sleep(0.02)
+            return "page"
+
+        first = asyncio.create_task(flight.do("Python", fetch))
+        second = asyncio.create_task(flight.do("Python", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "page"
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_fetch_is_cancelled_with_its_last_caller(self) -> None:
+        flight = SingleFlight()
+        started = asyncio.Event()
+        fetch_cancelled = False
+
+        async def fetch() -> str:
+            nonlocal fetch_cancelled
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                fetch_cancelled = True
+                raise
+            return "page"
+
+        caller = asyncio.create_task(flight.do("Python", fetch))
+        await started.wait()
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        assert fetch_cancelled
+        assert len(flight) == 0
+        assert flight.stats()["abandoned"] == 1
@@ -0,0 +1,105 @@
+import threading
+
+import pytest
+
+from solution.servers.summary_memo import SamplingCost, SummaryMemo, prompt_hash
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture
+def memo(tmp_path):
+    memo = SummaryMemo(tmp_path / "cache.db", max_bytes=100, clock=FakeClock())
+    yield memo
+    memo.close()
+
+
+def cost(calls: int = 1, tokens: int = 50) -> SamplingCost:
+    return SamplingCost(calls=calls, tokens=tokens)
+
+
+class TestSummaryMemo:
+    def test_round_trip_survives_reopen(self, memo: SummaryMemo, tmp_path) -> None:
+        memo.put("en", "Python", 7, "abc", 800, "Summary.", cost())
+        memo.close()
+
+        reopened = SummaryMemo(tmp_path / "cache.db")
+        summary = reopened.get("en", "python", 7, "abc", 800)
+        reopened.close()
+
+        assert summary == "Summary."
+
+    def test_key_includes_revision_prompt_and_max_tokens(
+        self, memo: SummaryMemo
+    ) -> None:
+        memo.put("en", "Python", 7, "abc", 800, "Summary.", cost())
+
+        assert memo.get("en", "Python", 8, "abc", 800) is None
+        assert memo.get("en", "Python", 7, "def", 800) is None
+        assert memo.get("en", "Python", 7, "abc", 400) is None
+        assert memo.get("de", "Python", 7, "abc", 800) is None
+
+    def test_new_revision_replaces_old_ones(self, memo: SummaryMemo) -> None:
+        memo.put("en", "Python", 7, "abc", 800, "Old.", cost())
+        memo.put("en", "Python", 8, "abc", 800, "New.", cost())
+
+        assert memo.get("en", "Python", 7, "abc", 800) is None
+        assert memo.stats()["entries"] == 1
+
+    def test_hits_count_saved_calls_and_tokens(self, memo: SummaryMemo) -> None:
+        memo.put("en", "Python", 7, "abc", 800, "Summary.", cost(calls=5, tokens=900))
+
+        memo.get("en", "Python", 7, "abc", 800)
+        memo.get("en", "Python", 7, "abc", 800)
+        memo.get("en", "Java", 7, "abc", 800)
+
+        stats = memo.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+        assert stats["sampling_calls_saved"] == 10
+        assert stats["tokens_saved"] == 1800
+
+    def test_evicts_least_recently_used_beyond_max_bytes(
+        self, memo: SummaryMemo
+    ) -> None:
+        for title in ("A", "B"):
+            memo.put("en", title, 1, "abc", 800, "x" * 40, cost())
+        memo.get("en", "A", 1, "abc", 800)
+
+        memo.put("en", "C", 1, "abc", 800, "x" * 40, cost())
+
+        assert memo.get("en", "B", 1, "abc", 800) is None
+        assert memo.get("en", "A", 1, "abc", 800) is not None
+        assert memo.get("en", "C", 1, "abc", 800) is not None
+        stats = memo.stats()
+        assert (stats["entries"], stats["evictions"]) == (2, 1)
+        assert stats["bytes"] <= 100
+
+    @pytest.mark.asyncio
+    async def test_run_uses_worker_thread(self, memo: SummaryMemo) -> None:
+        def current_thread() -> str:
+            return threading.current_thread().name
+
+        await memo.run(memo.put, "en", "Python", 7, "abc", 800, "Summary.", cost())
+
+        assert await memo.run(memo.get, "en", "Python", 7, "abc", 800) == "Summary."
+        assert (await memo.run(current_thread)).startswith("summary-memo")
+
+
+def test_prompt_hash_changes_with_any_part() -> None:
+    assert prompt_hash("Summarize {text}", 800) == prompt_hash("Summarize {text}", 800)
+    assert prompt_hash("Summarize {text}", 800) != prompt_hash("Summarize {text}", 400)
+    assert prompt_hash("a", "bc") != prompt_hash("ab", "c")
+
+
+def test_sampling_cost_estimates_tokens() -> None:
+    spent = SamplingCost()
+    spent.add("x" * 400, "y" * 40)
+
+    assert (spent.calls, spent.tokens) == (1, 110)
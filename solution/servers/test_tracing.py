@@ -0,0 +1,150 @@
+import asyncio
+import gc
+import json
+from pathlib import Path
+
+import pytest
+from mcp import types
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from solution.servers import wikipedia_server
+from solution.servers.tracing import (
+    Tracer,
+    format_traceparent,
+    parse_traceparent,
+    tracer,
+)
+from solution.servers.wikipedia_client import WikipediaClient
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+def read_trace(path: Path) -> list[dict]:
+    """Load a trace file the way the viewers do, closing the open array."""
+    return json.loads(path.read_text().rstrip().rstrip(",") + "]")
+
+
+def spans(events: list[dict]) -> dict[str, dict]:
+    return {event["name"]: event for event in events if event["ph"] == "X"}
+
+
+@pytest.fixture
+def trace_file(tmp_path: Path):
+    path = tmp_path / "trace.json"
+    tracer.configure(path, service="test")
+    yield path
+    tracer.configure(None)
+
+
+class TestTraceparent:
+    def test_round_trip(self) -> None:
+        value = format_traceparent(TRACE_ID, PARENT_ID)
+
+        assert value == f"00-{TRACE_ID}-{PARENT_ID}-01"
+        assert parse_traceparent(value) == (TRACE_ID, PARENT_ID)
+
+    @pytest.mark.parametrize(
+        "value",
+        [None, 42, "", "00-abc-def-01", "00-" + "x" * 32 + "-" + "0" * 16 + "-01"],
+    )
+    def test_rejects_invalid_values(self, value: object) -> None:
+        assert parse_traceparent(value) is None
+
+
+class TestTracer:
+    def test_disabled_tracer_writes_nothing(self, tmp_path: Path) -> None:
+        disabled = Tracer()
+
+        with disabled.span("work") as span:
+            span.set(items=1)
+
+        assert disabled.inject() is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_nested_spans_share_the_trace(self, trace_file: Path) -> None:
+        with tracer.span("outer"):
+            with tracer.span("inner", size=3) as inner:
+                inner.set(status=200)
+
+        events = read_trace(trace_file)
+        outer, inner = spans(events)["outer"], spans(events)["inner"]
+        assert events[0]["ph"] == "M" and events[0]["args"]["name"] == "test"
+        assert inner["args"]["trace_id"] == outer["args"]["trace_id"]
+        assert inner["args"]["parent_id"] == outer["args"]["span_id"]
+        assert inner["args"]["size"] == 3 and inner["args"]["status"] == 200
+        assert outer["ts"] <= inner["ts"]
+        assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"] + 1
+
+    def test_errors_are_recorded(self, trace_file: Path) -> None:
+        with pytest.raises(ValueError), tracer.span("failing"):
+            raise ValueError("boom")
+
+        assert spans(read_trace(trace_file))["failing"]["args"]["error"] == "ValueError"
+
+    def test_inject_links_client_and_server_spans(self, trace_file: Path) -> None:
+        with tracer.span("call_tool search") as call:
+            meta = tracer.inject()
+        with tracer.span("tool search", meta["traceparent"]) as tool:
+            pass
+
+        assert tool.trace_id == call.trace_id
+        assert tool.parent_id == call.span_id
+        flows = [event for event in read_trace(trace_file) if event["ph"] in "sf"]
+        assert [(event["ph"], event["id"]) for event in flows] == [
+            ("s", call.span_id),
+            ("f", call.span_id),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_tasks_get_distinct_lanes(self, trace_file: Path) -> None:
+        async def work(name: str) -> None:
+            with tracer.span(name):
+                await asyncio.sleep(0)
+
+        long_running = asyncio.create_task(work("long"))
+        await asyncio.gather(work("a"), work("b"))
+        gc.collect()  # frees the finished tasks and their lanes
+        await asyncio.gather(work("c"), long_running)
+
+        lanes = {
+            name: span["tid"] for name, span in spans(read_trace(trace_file)).items()
+        }
+        assert len(set(lanes.values())) == 4
+
+
+class TestServerTracing:
+    @pytest.mark.asyncio
+    async def test_tool_span_continues_the_request_trace(
+        self, client: WikipediaClient, trace_file: Path
+    ) -> None:
+        request = types.ClientRequest(
+            types.CallToolRequest(
+                method="tools/call",
+                params=types.CallToolRequestParams.model_validate(
+                    {
+                        "name": "get_article_summary",
+                        "arguments": {"title": "Python", "sentences": 1},
+                        "_meta": {
+                            "traceparent": format_traceparent(TRACE_ID, PARENT_ID)
+                        },
+                    }
+                ),
+            )
+        )
+        async with create_connected_server_and_client_session(
+            wikipedia_server.mcp._mcp_server
+        ) as session:
+            result = await session.send_request(request, types.CallToolResult)
+
+        assert not result.isError
+        recorded = spans(read_trace(trace_file))
+        tool = recorded["tool get_article_summary"]
+        upstream = recorded["wikimedia action"]
+        attempt = recorded["GET action"]
+        assert tool["args"]["trace_id"] == TRACE_ID
+        assert tool["args"]["parent_id"] == PARENT_ID
+        assert upstream["args"]["trace_id"] == TRACE_ID
+        assert upstream["args"]["attempts"] == 1
+        assert attempt["args"]["parent_id"] == upstream["args"]["span_id"]
+        assert attempt["args"]["status"] == 200
@@ -0,0 +1,621 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from fastmcp import Context
+
+from solution.advanced import wikipedia_server as advanced_server
+from solution.servers import wikipedia_client, wikipedia_server
+from solution.servers.rate_limiter import RateLimiter, RetryPolicy
+from solution.servers.wikipedia_client import WikipediaClient
+
+ARTICLE_TEXT = (
+    "Python is a programming language. It is widely used.\n\n"
+    "== History ==\nPython was conceived in the late 1980s."
+)
+UPSTREAM_DELAY = 0.2
+
+
+def fake_wikimedia(request: httpx.Request) -> httpx.Response:
+    """Minimal stand-in for the Wikimedia search and action APIs."""
+    params = request.url.params
+    if request.method == "HEAD":
+        return httpx.Response(200)
+    if request.url.path.endswith("/search/page"):
+        python = {
+            "id": 1,
+            "key": "Python_(programming_language)",
+            "title": "Python",
+            "excerpt": '<span class="searchmatch">Python</span> is a high-level '
+            "language &amp; more",
+            "description": "General-purpose programming language",
+        }
+        return httpx.Response(200, json={"pages": [python, {"title": "Pandas"}]})
+    if params.get("action") == "parse":
+        return httpx.Response(200, json=fake_parse(params))
+    if params.get("titles") == "Missing":
+        return httpx.Response(
+            200, json={"query": {"pages": [{"title": "Missing", "missing": True}]}}
+        )
+    page = {
+        "pageid": 1,
+        "lastrevid": 42,
+        "title": "Python",
+        "fullurl": "https://en.wikipedia.org/wiki/Python",
+        "extract": ARTICLE_TEXT,
+    }
+    body = {"query": {"pages": [page]}}
+    prop = params.get("prop", "")
+    if "categories" in prop:
+        page["categories"] = [{"title": "Category:Languages"}]
+    if "links" in prop:
+        page["links"] = [{"title": "Guido"}, {"title": "Java"}, {"title": "C"}]
+        if params.get("titles") == "Huge":
+            body["continue"] = {"plcontinue": "1|0|D", "continue": "||"}
+    return httpx.Response(200, json=body)
+
+
+def fake_parse(params: httpx.QueryParams) -> dict:
+    """Answer action=parse section listings and per-section HTML."""
+    if params["page"] == "Missing":
+        return {"error": {"code": "missingtitle", "info": "The page doesn't exist."}}
+    if params["prop"] == "sections":
+        sections = [
+            {"line": "History", "level": "2", "index": "1"},
+            {"line": "<i>Legacy</i>", "level": "2", "index": "2"},
+        ]
+        return {"parse": {"title": "Python", "sections": sections}}
+    text = {
+        "1": '<div class="mw-heading mw-heading2"><h2 id="History">History</h2>'
+        '</div><table class="infobox"><tr><td>{{Infobox}}</td></tr></table>'
+        '<p>Python was conceived in the late <a href="/wiki/1980s">1980s</a>.'
+        '<sup class="reference"><a href="#cite-1">[1]</a></sup></p>',
+        "2": "<h2>Legacy</h2><p>Still &amp; always popular.</p>",
+    }[params["section"]]
+    return {"parse": {"title": "Python", "text": text}}
+
+
+async def slow_wikimedia(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(UPSTREAM_DELAY)
+    return fake_wikimedia(request)
+
+
+class TestWikipediaClient:
+    @pytest.mark.asyncio
+    async def test_search_uses_shared_client(
+        self, client: WikipediaClient, requests_seen: list[httpx.Request]
+    ) -> None:
+        async with wikipedia_client.wikipedia_lifespan(None):
+            pool = client.http
+            first = await wikipedia_server.search_wikipedia("python", 2)
+            second = await wikipedia_server.search_wikipedia("pandas", 2)
+            assert client.http is pool
+
+        assert first == second == ["Python", "Pandas"]
+        # One warm-up request per API host plus the two searches
+        assert [r.method for r in requests_seen] == ["HEAD", "HEAD", "GET", "GET"]
+        assert requests_seen[2].url.params["q"] == "python"
+
+    @pytest.mark.asyncio
+    async def test_search_http_error_raises_value_error(self) -> None:
+        failing = WikipediaClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(503)),
+            retry=RetryPolicy(max_retries=1, base_delay=0.01),
+        )
+        wikipedia_client.set_client(failing)
+        try:
+            with pytest.raises(ValueError, match="Failed to search Wikipedia"):
+                await wikipedia_server.search_wikipedia("python")
+        finally:
+            wikipedia_client.set_client(None)
+
+
+class TestPageTools:
+    @pytest.mark.asyncio
+    async def test_summary_uses_lead_section(self, client: WikipediaClient) -> None:
+        result = await wikipedia_server.get_article_summary("Python", 1)
+
+        assert result == "Python is a programming language."
+
+    @pytest.mark.asyncio
+    async def test_missing_article_raises(self, client: WikipediaClient) -> None:
+        with pytest.raises(ValueError, match="Article 'Missing' not found"):
+            await wikipedia_server.get_article_content("Missing")
+
+    @pytest.mark.asyncio
+    async def test_info_uses_single_batched_query(
+        self, client: WikipediaClient, requests_seen: list[httpx.Request]
+    ) -> None:
+        info = await wikipedia_server.get_article_info("Python")
+
+        assert len(requests_seen) == 1
+        assert requests_seen[0].url.params["prop"] == "extracts|info|categories|links"
+        assert info["url"] == "https://en.wikipedia.org/wiki/Python"
+        assert info["content_length"] == len(ARTICLE_TEXT)
+        assert info["categories"] == ["Category:Languages"]
+        assert info["links_count"] == 3
+        assert info["links_count_exact"] is True
+
+    @pytest.mark.asyncio
+    async def test_info_flags_partial_link_count(
+        self, client: WikipediaClient, requests_seen: list[httpx.Request]
+    ) -> None:
+        info = await wikipedia_server.get_article_info("Huge")
+
+        assert len(requests_seen) == 1
+        assert info["links_count_exact"] is False
+
+    @pytest.mark.asyncio
+    async def test_tools_share_cached_page(
+        self, client: WikipediaClient, requests_seen: list[httpx.Request]
+    ) -> None:
+        await wikipedia_server.get_article_info("Python")
+        await wikipedia_server.get_article_summary("python")
+        await wikipedia_server.get_article_content("Python")
+        await wikipedia_server.get_article_info("Python")
+
+        assert len(requests_seen) == 1
+        assert wikipedia_server.article_cache.stats()["hits"] >= 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_overlap(self) -> None:
+        wikipedia_client.set_client(
+            WikipediaClient(transport=httpx.MockTransport(slow_wikimedia))
+        )
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(wikipedia_server.get_article_summary(f"Python {i}") for i in range(8))
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            wikipedia_client.set_client(None)
+
+        assert len(results) == 8
+        # Eight calls complete in roughly the time of one upstream round trip
+        assert elapsed < UPSTREAM_DELAY * 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_are_coalesced(self) -> None:
+        requests_seen = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            requests_seen.append(request)
+            return await slow_wikimedia(request)
+
+        wikipedia_client.set_client(
+            WikipediaClient(transport=httpx.MockTransport(handler))
+        )
+        try:
+            await asyncio.gather(
+                wikipedia_server.get_article_summary("Python"),
+                wikipedia_server.get_article_content("python"),
+                wikipedia_server.get_article_summary("Python", 1),
+                wikipedia_server.search_wikipedia("python"),
+                wikipedia_server.search_wikipedia(" Python "),
+            )
+        finally:
+            wikipedia_client.set_client(None)
+
+        # One page fetch and one search, the rest waited on those
+        assert len(requests_seen) == 2
+        assert wikipedia_server.single_flight.stats()["coalesced"] == 3
+
+
+class TestBatchTools:
+    @pytest.mark.asyncio
+    async def test_summaries_report_per_title_errors(
+        self, client: WikipediaClient
+    ) -> None:
+        results = await wikipedia_server.get_article_summaries(
+            ["Python", "Missing"], sentences=1
+        )
+
+        assert results == [
+            {"title": "Python", "summary": "Python is a programming language."},
+            {"title": "Missing", "error": "Article 'Missing' not found on Wikipedia"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_contents_are_truncated(self, client: WikipediaClient) -> None:
+        results = await wikipedia_server.get_article_contents(["Python"], 100)
+
+        assert results[0]["content"].endswith("[Content truncated...]")
+
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_batches(self) -> None:
+        with pytest.raises(ValueError, match="Titles cannot be empty"):
+            await wikipedia_server.get_article_summaries([])
+        with pytest.raises(ValueError, match="At most 20 titles"):
+            await wikipedia_server.get_article_contents(["Python"] * 21)
+        with pytest.raises(ValueError, match="Sentences must be between"):
+            await wikipedia_server.get_article_summaries(["Python"], 0)
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, monkeypatch) -> None:
+        monkeypatch.setattr(wikipedia_server, "batch_concurrency", 2)
+        wikipedia_client.set_client(
+            WikipediaClient(transport=httpx.MockTransport(slow_wikimedia))
+        )
+        try:
+            start = time.perf_counter()
+            results = await wikipedia_server.get_article_summaries(
+                [f"Python {i}" for i in range(4)]
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            wikipedia_client.set_client(None)
+
+        assert all("summary" in result for result in results)
+        # Four titles two at a time take two upstream round trips, not one or four
+        assert UPSTREAM_DELAY * 2 <= elapsed < UPSTREAM_DELAY * 4
+
+
+class TestChunkedReading:
+    @pytest.mark.asyncio
+    async def test_cursor_walks_all_chunks_from_cache(
+        self, client: WikipediaClient, requests_seen: list[httpx.Request]
+    ) -> None:
+        chunks = []
+        cursor = None
+        while True:
+            result = await wikipedia_server.get_article_chunk("Python", cursor, 100)
+            chunks.append(result["chunk"])
+            cursor = result["next_cursor"]
+            if cursor is None:
+                break
+
+        assert result["total_chunks"] == len(chunks) == 2
+        assert chunks[0] == "Python is a programming language. It is widely used."
+        assert chunks[1].startswith("== History ==")
+        assert len(requests_seen) == 1
+
+    @pytest.mark.asyncio
+    async def test_rejects_bad_or_stale_cursors(self, client: WikipediaClient) -> None:
+        first = await wikipedia_server.get_article_chunk("Python", max_length=100)
+        page = await wikipedia_server.fetch_article("Python")
+        page.revid = 43
+
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            await wikipedia_server.get_article_chunk("Python", "not-a-cursor")
+        with pytest.raises(ValueError, match="has changed"):
+            await wikipedia_server.get_article_chunk("Python", first["next_cursor"])
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("length", [0, -1, 99, 10001])
+    async def test_rejects_forged_cursor_length(
+        self, client: WikipediaClient, length: int
+    ) -> None:
+        await wikipedia_server.get_article_chunk("Python", max_length=100)
+        page = await wikipedia_server.fetch_article("Python")
+        forged = wikipedia_server.encode_cursor(page.revid, 0, length)
+
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            await wikipedia_server.get_article_chunk("Python", forged)
+
+    @pytest.mark.asyncio
+    async def test_chunk_resource_template(self, client: WikipediaClient) -> None:
+        contents = await wikipedia_server.mcp.read_resource("wiki://Python/chunk/0")
+
+        # The whole test article fits in one resource chunk
+        assert list(contents)[0].content == ARTICLE_TEXT
+        with pytest.raises(ValueError, match="out of range"):
+            await wikipedia_server.mcp.read_resource("wiki://Python/chunk/1")
+
+
+class TestSectionTools:
+    @pytest.mark.asyncio
+    async def test_list_sections_reports_sizes(self, client: WikipediaClient) -> None:
+        result = await wikipedia_server.list_sections("Python")
+
+        assert result["lead_size"] == len(
+            "Python is a programming language. It is widely used."
+        )
+        assert result["sections"] == [
+            {
+                "title": "History",
+                "level": 2,
+                "size": len("Python was conceived in the late 1980s."),
+                "sentences": 1,
+                "subsections": [],
+            }
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cached_article_is_sliced_locally(
+        self, client: WikipediaClient, requests_seen: list[httpx.Request]
+    ) -> None:
+        await wikipedia_server.get_article_summary("Python")
+
+        result = await wikipedia_server.get_sections("Python", ["history", "Usage"])
+
+        assert result["sections"] == [
+            {
+                "title": "History",
+                "level": 2,
+                "text": "Python was conceived in the late 1980s.",
+            }
+        ]
+        assert result["missing"] == ["Usage"]
+        assert len(requests_seen) == 1
+
+    @pytest.mark.asyncio
+    async def test_uncached_article_fetches_only_requested_sections(
+        self, client: WikipediaClient, requests_seen: list[httpx.Request]
+    ) -> None:
+        result = await wikipedia_server.get_sections("Python", ["Legacy"])
+
+        assert result["sections"] == [
+            {"title": "Legacy", "level": 2, "text": "Still & always popular."}
+        ]
+        assert [r.url.params.get("section") for r in requests_seen] == [None, "2"]
+        assert all(r.url.params["action"] == "parse" for r in requests_seen)
+
+    @pytest.mark.asyncio
+    async def test_uncached_section_matches_cached_text(
+        self, client: WikipediaClient
+    ) -> None:
+        uncached = await wikipedia_server.get_sections("Python", ["History", " "])
+        await wikipedia_server.get_article_summary("Python")
+        cached = await wikipedia_server.get_sections("Python", ["History"])
+
+        assert uncached["sections"] == cached["sections"]
+        assert uncached["missing"] == []
+
+    @pytest.mark.asyncio
+    async def test_missing_article(self, client: WikipediaClient) -> None:
+        with pytest.raises(ValueError, match="Article 'Missing' not found"):
+            await wikipedia_server.get_sections("Missing", ["History"])
+        with pytest.raises(ValueError, match="Section names cannot be empty"):
+            await wikipedia_server.get_sections("Python", [" "])
+
+
+class TestSearchWithSummaries:
+    @pytest.mark.asyncio
+    async def test_uses_search_excerpts_and_cached_summaries(
+        self, client: WikipediaClient, requests_seen: list[httpx.Request]
+    ) -> None:
+        await wikipedia_server.get_article_summary("Python")
+
+        results = await wikipedia_server.search_with_summaries("python", sentences=1)
+
+        assert results == [
+            {
+                "title": "Python",
+                "key": "Python_(programming_language)",
+                "description": "General-purpose programming language",
+                "excerpt": "Python is a high-level language & more",
+                "summary": "Python is a programming language.",
+            },
+            {
+                "title": "Pandas",
+                "key": "Pandas",
+                "description": None,
+                "excerpt": None,
+                "summary": None,
+            },
+        ]
+        # The page fetch for the first summary and one search, nothing else
+        assert len(requests_seen) == 2
+
+    @pytest.mark.asyncio
+    async def test_records_survive_persistent_cache(
+        self, client: WikipediaClient, requests_seen: list[httpx.Request]
+    ) -> None:
+        first = await wikipedia_server.search_with_summaries("python", 5, False)
+        second = await wikipedia_server.search_with_summaries("python", 5, False)
+
+        assert first == second
+        assert "summary" not in first[0]
+        assert len(requests_seen) == 1
+
+
+def streaming_wikimedia(
+    chunk_delay: float, events: list[str], content_length: bool = True
+):
+    """Action API stand-in sending the page JSON in small delayed chunks."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = fake_wikimedia(request).content
+
+        async def chunks():
+            try:
+                for i in range(0, len(body), 16):
+                    events.append("chunk")
+                    yield body[i : i + 16]
+                    await asyncio.sleep(chunk_delay)
+            finally:
+                events.append("closed")
+
+        headers = {"Content-Length": str(len(body))} if content_length else {}
+        return httpx.Response(200, content=chunks(), headers=headers)
+
+    return handler
+
+
+class TestStreamingDownload:
+    @pytest.mark.asyncio
+    async def test_fetch_page_reports_bytes_against_content_length(self) -> None:
+        client = WikipediaClient(
+            transport=httpx.MockTransport(streaming_wikimedia(0, []))
+        )
+        progress: list[tuple[int, int | None]] = []
+
+        async def on_bytes(done: int, total: int | None) -> None:
+            progress.append((done, total))
+
+        page = await client.fetch_page("Python", progress=on_bytes)
+        await client.aclose()
+
+        assert page is not None and page.text == ARTICLE_TEXT
+        assert len(progress) > 3
+        total = progress[-1][1]
+        assert progress[-1] == (total, total)
+        assert [done for done, _ in progress] == sorted({d for d, _ in progress})
+
+    @pytest.mark.asyncio
+    async def test_progress_without_content_length_uses_expected_size(self) -> None:
+        client = WikipediaClient(
+            transport=httpx.MockTransport(
+                streaming_wikimedia(0, [], content_length=False)
+            )
+        )
+        progress: list[tuple[int, int | None]] = []
+
+        async def on_bytes(done: int, total: int | None) -> None:
+            progress.append((done, total))
+
+        await client.fetch_page("Python", progress=on_bytes, expected_size=100)
+        await client.aclose()
+
+        *streaming, (done, total) = progress
+        assert done == total
+        assert streaming[0][1] == 100
+        assert all(received < expected for received, expected in streaming)
+
+    @pytest.mark.asyncio
+    async def test_loads_without_listeners_are_not_streamed(self, monkeypatch) -> None:
+        client = WikipediaClient(transport=httpx.MockTransport(fake_wikimedia))
+        wikipedia_client.set_client(client)
+        seen = []
+        fetch_page = client.fetch_page
+
+        async def spy(title: str, progress=None, expected_size=None):
+            seen.append(progress)
+            return await fetch_page(title, progress, expected_size)
+
+        monkeypatch.setattr(client, "fetch_page", spy)
+        try:
+            await wikipedia_server.get_article_summary("Python")
+        finally:
+            wikipedia_client.set_client(None)
+            await client.aclose()
+
+        assert seen == [None]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_fetch_aborts_the_transfer(self) -> None:
+        events: list[str] = []
+        client = WikipediaClient(
+            transport=httpx.MockTransport(streaming_wikimedia(1.0, events))
+        )
+        wikipedia_client.set_client(client)
+        first_chunk = asyncio.Event()
+
+        async def on_bytes(done: int, total: int | None) -> None:
+            first_chunk.set()
+
+        task = asyncio.create_task(
+            wikipedia_server.fetch_article("Python", progress=on_bytes)
+        )
+        try:
+            await first_chunk.wait()
+            started = time.perf_counter()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(0)
+        finally:
+            wikipedia_client.set_client(None)
+            await client.aclose()
+
+        assert time.perf_counter() - started < 0.5
+        assert events == ["chunk", "closed"]
+        assert wikipedia_server.single_flight.stats()["abandoned"] == 1
+
+    @pytest.mark.asyncio
+    async def test_coalesced_callers_each_get_progress_until_they_leave(
+        self,
+    ) -> None:
+        client = WikipediaClient(
+            transport=httpx.MockTransport(streaming_wikimedia(0.01, []))
+        )
+        wikipedia_client.set_client(client)
+        first: list[int] = []
+        second: list[int] = []
+        second_started = asyncio.Event()
+
+        async def on_first(done: int, total: int | None) -> None:
+            first.append(done)
+
+        async def on_second(done: int, total: int | None) -> None:
+            second.append(done)
+            second_started.set()
+
+        leaving = asyncio.create_task(
+            wikipedia_server.fetch_article("Python", progress=on_first)
+        )
+        staying = asyncio.create_task(
+            wikipedia_server.fetch_article("Python", progress=on_second)
+        )
+        try:
+            async with asyncio.timeout(1):
+                await second_started.wait()
+            leaving.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leaving
+            reported_before_leaving = len(first)
+            page = await staying
+        finally:
+            staying.cancel()
+            wikipedia_client.set_client(None)
+            await client.aclose()
+
+        assert page.text == ARTICLE_TEXT
+        assert len(first) == reported_before_leaving
+        assert len(second) > reported_before_leaving
+        assert second[-1] == max(second)
+        assert wikipedia_server._progress_listeners == {}
+
+    @pytest.mark.asyncio
+    async def test_slow_progress_callback_does_not_hold_limiter_slot(self) -> None:
+        client = WikipediaClient(
+            transport=httpx.MockTransport(streaming_wikimedia(0, [])),
+            limiters={"action": RateLimiter(rate=1000, burst=1000, max_concurrent=1)},
+        )
+        limiter = client.limiters["action"]
+        gate = asyncio.Event()
+
+        async def on_bytes(done: int, total: int | None) -> None:
+            await gate.wait()
+
+        fetch = asyncio.create_task(client.fetch_page("Python", progress=on_bytes))
+        try:
+            # The body is fully received while the first callback still waits
+            async with asyncio.timeout(1):
+                while limiter.requests == 0 or limiter.saturated:
+                    await asyncio.sleep(0.001)
+            assert not fetch.done()
+            gate.set()
+            page = await fetch
+        finally:
+            fetch.cancel()
+            await client.aclose()
+
+        assert page is not None and page.text == ARTICLE_TEXT
+
+    @pytest.mark.asyncio
+    async def test_get_article_with_progress_reports_download(
+        self, monkeypatch
+    ) -> None:
+        client = WikipediaClient(
+            transport=httpx.MockTransport(streaming_wikimedia(0, []))
+        )
+        wikipedia_client.set_client(client)
+        monkeypatch.setattr(advanced_server, "PROGRESS_STEP_BYTES", 64)
+        ctx = AsyncMock(spec=Context)
+        try:
+            content = await advanced_server.get_article_with_progress.fn(ctx, "Python")
+        finally:
+            wikipedia_client.set_client(None)
+            await client.aclose()
+
+        assert content == ARTICLE_TEXT
+        calls = [call.args for call in ctx.report_progress.call_args_list]
+        assert calls[0] == (0,)
+        assert len(calls) > 3
+        received = [args[0] for args in calls]
+        assert received == sorted(received)
+        assert calls[-1] == (received[-1], received[-1])
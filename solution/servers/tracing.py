@@ -0,0 +1,304 @@
+"""
+End-to-end tracing from a CLI chat turn down to Wikimedia requests.
+
+A `Tracer` records nested spans and appends them to a local file in the Chrome
+trace event format, so one slow turn can be opened offline as a flame chart in
+https://ui.perfetto.dev or chrome://tracing:
+
+- the CLI client wraps each `agent.run` and each MCP tool call in a span, and
+  passes the tool call span to the server as a W3C `traceparent` in the MCP
+  request `_meta`;
+- the server starts each tool span as a child of that remote parent (see
+  `Metrics.instrument`), and the Wikipedia client adds spans for upstream
+  requests, including the time spent waiting for the rate limiter.
+
+Client and server append to the same file, each as its own process, and the
+client's tool call is linked to the server's tool span by a flow arrow. Time
+in `agent.run` not covered by a tool call is spent waiting on the model.
+
+Tracing is off unless `MCP_TRACE_FILE` is set (or `configure` is called); a
+disabled tracer costs one attribute check per span.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+import weakref
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+TRACEPARENT_VERSION = "00"
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def format_traceparent(trace_id: str, span_id: str) -> str:
+    """Format a W3C trace context header value."""
+    return f"{TRACEPARENT_VERSION}-{trace_id}-{span_id}-01"
+
+
+def parse_traceparent(value: Any) -> tuple[str, str] | None:
+    """Parse a W3C `traceparent` into (trace_id, span_id), or None if invalid."""
+    if not isinstance(value, str):
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2]
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None,
+        attributes: dict[str, Any],
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.remote_parent = False
+        self.linked = False
+        self.start_us = time.time_ns() // 1000
+        self._started = time.perf_counter()
+
+    def set(self, **attributes: Any) -> None:
+        """Add or update span attributes."""
+        self.attributes.update(attributes)
+
+    @property
+    def traceparent(self) -> str:
+        return format_traceparent(self.trace_id, self.span_id)
+
+
+class _NoopSpan:
+    """Stand-in yielded while tracing is disabled."""
+
+    traceparent = None
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class ChromeTraceExporter:
+    """Append spans to a Chrome trace event file.
+
+    The file is a JSON array without its closing bracket, which the trace
+    viewers accept, so several processes can append events to it. Each event
+    is written with a single `write` to a file opened in append mode.
+
+    Args:
+        path: Trace file, created on first use
+        service: Process name shown in the viewer
+    """
+
+    def __init__(self, path: str | Path, service: str):
+        self.path = Path(path).expanduser()
+        self.service = service
+        self.pid = os.getpid()
+        self._fd: int | None = None
+        self._lanes: weakref.WeakKeyDictionary[asyncio.Task, int] = (
+            weakref.WeakKeyDictionary()
+        )
+        # Never reused, so a new task can't share a row with a live one
+        self._next_lane = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _open(self) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if os.fstat(fd).st_size == 0:
+            os.write(fd, b"[\n")
+        self._fd = fd
+        self._write(
+            {
+                "ph": "M",
+                "name": "process_name",
+                "pid": self.pid,
+                "args": {"name": self.service},
+            }
+        )
+        return fd
+
+    def _write(self, event: dict[str, Any]) -> None:
+        line = json.dumps(event, default=str) + ",\n"
+        os.write(self._fd, line.encode())
+
+    def _lane(self) -> int:
+        """Viewer row for the current task, so concurrent spans don't overlap."""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is None:
+            return threading.get_native_id()
+        lane = self._lanes.get(task)
+        if lane is None:
+            lane = self._lanes[task] = next(self._next_lane)
+        return lane
+
+    def export(self, span: Span, duration_us: int) -> None:
+        tid = self._lane()
+        args = {
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            **span.attributes,
+        }
+        events = [
+            {
+                "name": span.name,
+                "cat": "mcp",
+                "ph": "X",
+                "ts": span.start_us,
+                "dur": duration_us,
+                "pid": self.pid,
+                "tid": tid,
+                "args": args,
+            }
+        ]
+        # Flow arrow from the client's tool call to the server's tool span
+        if span.linked:
+            events.append(self._flow("s", span.span_id, span.start_us, tid))
+        if span.remote_parent:
+            events.append(self._flow("f", span.parent_id, span.start_us, tid))
+        with self._lock:
+            if self._fd is None:
+                self._open()
+            for event in events:
+                self._write(event)
+
+    def _flow(self, phase: str, flow_id: str, ts: int, tid: int) -> dict[str, Any]:
+        event = {
+            "name": "mcp request",
+            "cat": "mcp",
+            "ph": phase,
+            "id": flow_id,
+            "ts": ts,
+            "pid": self.pid,
+            "tid": tid,
+        }
+        if phase == "f":
+            event["bp"] = "e"
+        return event
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporter, if any."""
+
+    def __init__(self, exporter: ChromeTraceExporter | None = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, path: str | Path | None, service: str | None = None) -> None:
+        """Start writing spans to `path` (or stop tracing if it is None)."""
+        if self.exporter is not None:
+            self.exporter.close()
+        service = service or Path(sys.argv[0]).stem or "python"
+        self.exporter = ChromeTraceExporter(path, service) if path else None
+
+    @contextmanager
+    def span(
+        self, name: str, traceparent: Any = None, **attributes: Any
+    ) -> Iterator[Span | _NoopSpan]:
+        """Time a block as a child of the current span.
+
+        Args:
+            name: Span name shown in the viewer
+            traceparent: W3C trace context of a remote parent, used when there
+                is no current span in this process
+            **attributes: Initial span attributes
+
+        Yields:
+            The span, whose attributes can still be updated
+        """
+        if self.exporter is None:
+            yield NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        remote = parse_traceparent(traceparent) if parent is None else None
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id, attributes)
+        elif remote is not None:
+            span = Span(name, remote[0], remote[1], attributes)
+            span.remote_parent = True
+        else:
+            span = Span(name, secrets.token_hex(16), None, attributes)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            duration_us = round((time.perf_counter() - span._started) * 1e6)
+            self.exporter.export(span, duration_us)
+
+    def inject(self) -> dict[str, str] | None:
+        """Trace context of the current span, for an outgoing request's `_meta`."""
+        span = _current_span.get()
+        if self.exporter is None or span is None:
+            return None
+        span.linked = True
+        return {"traceparent": span.traceparent}
+
+    @contextmanager
+    def tool_span(self, name: str) -> Iterator[Span | _NoopSpan]:
+        """Span for one MCP tool call, continuing the caller's trace."""
+        if self.exporter is None:
+            yield NOOP_SPAN
+            return
+        with self.span(f"tool {name}", request_traceparent(), tool=name) as span:
+            yield span
+
+
+def request_traceparent() -> str | None:
+    """The `traceparent` sent in the `_meta` of the MCP request being handled."""
+    try:
+        from mcp.server.lowlevel.server import request_ctx
+    except ImportError:
+        return None
+    try:
+        meta = request_ctx.get().meta
+    except LookupError:
+        return None
+    return getattr(meta, "traceparent", None) if meta is not None else None
+
+
+tracer = Tracer()
+if os.getenv("MCP_TRACE_FILE"):
+    tracer.configure(os.environ["MCP_TRACE_FILE"])
@@ -9,6 +9,10 @@ import wikipediaapi
 import requests
 from typing import Any
 
+# A Session keeps connections alive, so repeated calls skip the TLS handshake
+session = requests.Session()
+session.headers["User-Agent"] = "Wikipedia-API-Demo/1.0 (educational-purpose)"
+
 
 def demo_wikipedia_search(query: str) -> list[dict[str, Any]]:
     """Demonstrate Wikipedia search using REST API."""
@@ -18,7 +22,7 @@ def demo_wikipedia_search(query: str) -> list[dict[str, Any]]:
     params = {"q": query, "limit": 5}
 
     try:
-        response = requests.get(search_url, params=params, timeout=10)
+        response = session.get(search_url, params=params, timeout=10)
         response.raise_for_status()
 
         data = response.json()
@@ -94,7 +98,7 @@ def demo_error_handling():
     # Test network timeout (simulate with very short timeout)
     print("\n3. Network timeout simulation:")
     try:
-        response = requests.get(
+        response = session.get(
             "https://api.wikimedia.org/core/v1/wikipedia/en/search/title",
             params={"q": "test"},
             timeout=0.001,  # Very short timeout to force timeout
@@ -0,0 +1,742 @@
+"""
+Shared async HTTP client for the Wikimedia APIs.
+
+Every Wikipedia MCP server in this project talks to Wikimedia through a single
+long-lived httpx.AsyncClient. Keeping one pooled client alive for the lifetime
+of the server means keep-alive connections are reused across tool calls, so a
+search only pays for the request itself rather than a fresh DNS lookup, TCP
+connect and TLS handshake.
+
+Page content is fetched from the MediaWiki action API with the same client, so
+tool calls never block the event loop and concurrent requests overlap.
+
+Requests to each endpoint pass through a shared rate limiter, and throttled or
+transiently failing requests are retried with backoff (see rate_limiter).
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from solution.servers.metrics import metrics
+from solution.servers.rate_limiter import (
+    RETRY_STATUSES,
+    RateLimiter,
+    RetryPolicy,
+    parse_retry_after,
+)
+from solution.servers.tracing import tracer
+
+if TYPE_CHECKING:
+    from solution.servers.local_corpus import LocalCorpus
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "MCP-Wikipedia-Server/1.0 (educational-purpose)"
+CORE_API_URL = "https://api.wikimedia.org/core/v1/wikipedia/{language}"
+ACTION_API_URL = "https://{language}.wikipedia.org/w/api.php"
+
+# Section titles from the parse API may carry inline HTML such as <i>
+_TAG = re.compile(r"<[^>]+>")
+
+# Default (rate per second, burst) for each upstream endpoint
+DEFAULT_RATE_LIMITS = {"search": (5.0, 10), "action": (10.0, 20)}
+
+# Called with (bytes received, expected total or None) as a body streams in
+ProgressCallback = Callable[[int, int | None], Awaitable[None]]
+
+# Assumed size of a page download sent without Content-Length (compressed
+# responses usually are), when there is no earlier revision to go by
+EXPECTED_PAGE_BYTES = 64 * 1024
+
+
+def expect_total(progress: ProgressCallback, expected: int) -> ProgressCallback:
+    """Report progress against `expected` bytes when the total is unknown.
+
+    Past the estimate the total keeps a quarter ahead of the bytes received,
+    so progress never looks complete before the download is.
+    """
+
+    async def report(received: int, total: int | None) -> None:
+        if total is None:
+            total = max(expected, received + received // 4)
+        await progress(received, total)
+
+    return report
+
+
+class ProgressReporter:
+    """Passes download progress to a callback from its own task.
+
+    The download only records the latest byte count with `update`, so it never
+    waits for the callback while holding a rate limiter slot. A slow callback
+    skips intermediate counts rather than delaying the transfer. Leaving the
+    `async with` block normally delivers the final count; leaving it with an
+    error or cancellation stops reporting at once.
+    """
+
+    def __init__(self, callback: ProgressCallback):
+        self.callback = callback
+        self.latest: tuple[int, int | None] | None = None
+        self._reported: tuple[int, int | None] | None = None
+        self._changed = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+
+    def update(self, received: int, total: int | None) -> None:
+        self.latest = (received, total)
+        self._changed.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            if self.latest is not None and self.latest != self._reported:
+                self._reported = self.latest
+                await self.callback(*self.latest)
+            if self._closing:
+                return
+
+    async def __aenter__(self) -> "ProgressReporter":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type: Any, *exc_info: Any) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        if exc_type is None:
+            self._closing = True
+            self._changed.set()
+            await task
+        else:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+@dataclass
+class WikiPage:
+    """Plain-text extract of a Wikipedia article.
+
+    `text` uses wiki section formatting (`== History ==`), so the lead section
+    is everything before the first heading.
+    """
+
+    title: str
+    url: str
+    text: str
+    pageid: int | None = None
+    revid: int | None = None
+
+    @property
+    def summary(self) -> str:
+        """Lead section of the article (text before the first heading)."""
+        return self.text.split("\n==", 1)[0].strip()
+
+    @property
+    def size(self) -> int:
+        """Approximate in-memory cost of the page in bytes."""
+        return len(self.text.encode("utf-8")) + len(self.title) + len(self.url)
+
+
+PAGE_PARAMS: dict[str, Any] = {
+    "prop": "extracts|info",
+    "inprop": "url",
+    "explaintext": 1,
+    "exsectionformat": "wiki",
+}
+
+
+# Page furniture that TextExtracts leaves out of article text
+_SKIP_TAGS = frozenset({"table", "style", "script", "figure", "sup", "math"})
+_SKIP_CLASSES = frozenset(
+    {
+        "mw-editsection",
+        "reference",
+        "references",
+        "mw-references-wrap",
+        "navbox",
+        "infobox",
+        "hatnote",
+        "thumb",
+        "noprint",
+        "mw-empty-elt",
+    }
+)
+# Tags that start a new line of text, and heading tags with their levels
+_BLOCK_TAGS = frozenset({"p", "div", "li", "dd", "dt", "br", "ul", "ol", "dl"})
+_HEADING_TAGS = {"h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+
+class _HtmlText(HTMLParser):
+    """Collects the readable text of parse API HTML, like TextExtracts does.
+
+    Tables, references, figures, navigation boxes and similar page furniture
+    are dropped; headings are written in wiki format (`=== Name ===`).
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.lines: list[str] = []
+        self._line: list[str] = []
+        self._skip: tuple[str, int] | None = None
+        self._heading: int | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self._skip is not None:
+            if tag == self._skip[0]:
+                self._skip = (tag, self._skip[1] + 1)
+            return
+        classes = set((dict(attrs).get("class") or "").split())
+        if tag in _SKIP_TAGS or classes & _SKIP_CLASSES:
+            self._skip = (tag, 1)
+        elif tag in _HEADING_TAGS:
+            self._end_line()
+            self._heading = _HEADING_TAGS[tag]
+        elif tag in _BLOCK_TAGS:
+            self._end_line()
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._skip is not None:
+            if tag == self._skip[0]:
+                depth = self._skip[1] - 1
+                self._skip = (tag, depth) if depth else None
+            return
+        if tag in _HEADING_TAGS and self._heading is not None:
+            marks = "=" * self._heading
+            name = " ".join("".join(self._line).split())
+            self._line = []
+            self._heading = None
+            self.lines += ["", f"{marks} {name} {marks}"]
+        elif tag in _BLOCK_TAGS:
+            self._end_line()
+
+    def handle_data(self, data: str) -> None:
+        if self._skip is None:
+            self._line.append(data)
+
+    def _end_line(self) -> None:
+        line = " ".join("".join(self._line).split())
+        self._line = []
+        if line and self._heading is None:
+            self.lines.append(line)
+
+    def text(self) -> str:
+        self.close()
+        self._end_line()
+        return "\n".join(self.lines).strip()
+
+
+def html_to_text(markup: str) -> str:
+    """Plain text of parse API HTML, formatted like a TextExtracts extract."""
+    parser = _HtmlText()
+    parser.feed(markup)
+    return parser.text()
+
+
+def _parse_page(pages: list[dict[str, Any]]) -> WikiPage | None:
+    """Build a WikiPage from a formatversion=2 `pages` list."""
+    if not pages or pages[0].get("missing") or pages[0].get("invalid"):
+        return None
+
+    page = pages[0]
+    return WikiPage(
+        title=page["title"],
+        url=page.get("fullurl", ""),
+        text=page.get("extract", ""),
+        pageid=page.get("pageid"),
+        revid=page.get("lastrevid"),
+    )
+
+
+class WikipediaClient:
+    """Connection-pooled async client for the Wikimedia REST APIs.
+
+    The underlying httpx.AsyncClient is created lazily, so tools can be called
+    directly (e.g. from tests) without a running server lifespan. Inside a
+    server, `wikipedia_lifespan` opens and warms the pool at startup and closes
+    it on shutdown.
+
+    `limiters` maps the endpoint names "search" (Core API) and "action"
+    (MediaWiki action API) to their rate limiters; missing entries use
+    DEFAULT_RATE_LIMITS.
+    """
+
+    def __init__(
+        self,
+        language: str = "en",
+        core_api_url: str | None = None,
+        action_api_url: str | None = None,
+        user_agent: str = USER_AGENT,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        transport: httpx.AsyncBaseTransport | None = None,
+        limiters: dict[str, RateLimiter] | None = None,
+        retry: RetryPolicy | None = None,
+    ):
+        self.language = language
+        self.core_api_url = (
+            core_api_url or CORE_API_URL.format(language=language)
+        ).rstrip("/")
+        self.action_api_url = action_api_url or ACTION_API_URL.format(language=language)
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=60.0,
+        )
+        self.transport = transport
+        self.limiters = {
+            endpoint: RateLimiter(rate, burst, max_concurrent=max_connections)
+            for endpoint, (rate, burst) in DEFAULT_RATE_LIMITS.items()
+        }
+        self.limiters.update(limiters or {})
+        self.retry = retry or RetryPolicy()
+        self._http: httpx.AsyncClient | None = None
+        self._users = 0
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """The pooled httpx client, created on first use."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                headers={"User-Agent": self.user_agent, "Accept": "application/json"},
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self.transport,
+            )
+        return self._http
+
+    async def start(self, warm: bool = True) -> None:
+        """Open the connection pool and optionally warm it.
+
+        Warming sends one cheap request per API host so the TLS sessions are
+        already established when the first tool call arrives. A failed warm-up
+        is logged and ignored; the pool will connect on demand instead.
+        """
+        self._users += 1
+        if warm and self._users == 1:
+            await asyncio.gather(
+                self._warm(self.core_api_url), self._warm(self.action_api_url)
+            )
+
+    async def _warm(self, url: str) -> None:
+        try:
+            await self.http.head(url)
+            logger.info(f"Warmed connection to {url}")
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not warm connection to {url}: {e}")
+
+    async def aclose(self) -> None:
+        """Release the pool once the last server session using it has ended."""
+        self._users = max(self._users - 1, 0)
+        if self._users == 0 and self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _get(
+        self,
+        endpoint: str,
+        url: str,
+        params: dict[str, Any],
+        progress: ProgressCallback | None = None,
+    ) -> httpx.Response:
+        """Send a rate-limited GET, retrying throttled and transient failures.
+
+        A 429 or 5xx response pauses every request to the endpoint for the
+        backoff delay, so concurrent callers back off together; connection
+        errors only delay the failing call.
+
+        When tracing, the span covers rate limiter waits and retries, with a
+        child span per HTTP attempt.
+
+        Args:
+            endpoint: Rate limiter name, "search" or "action"
+            url: Request URL
+            params: Query parameters
+            progress: Streams the response body, reporting the bytes received
+                to this callback from outside the rate limiter slot (see
+                `ProgressReporter`)
+
+        Raises:
+            httpx.HTTPError: If the request still fails after all retries
+        """
+        with tracer.span(f"wikimedia {endpoint}", url=url) as span:
+            if progress is None:
+                return await self._get_with_retries(endpoint, url, params, span)
+            async with ProgressReporter(progress) as reporter:
+                return await self._get_with_retries(
+                    endpoint, url, params, span, reporter.update
+                )
+
+    async def _send(
+        self,
+        url: str,
+        params: dict[str, Any],
+        on_bytes: Callable[[int, int | None], None] | None,
+    ) -> httpx.Response:
+        """GET `url`, streaming the body through `on_bytes` if given.
+
+        Progress counts bytes as received on the wire, against Content-Length
+        when the server sends it. Without it, progress counts decoded bytes
+        with an unknown total, and reports the final size as the total once
+        the body is complete. If the caller is cancelled mid-transfer the
+        response is closed at once, which drops the connection instead of
+        reading the rest of the body.
+        """
+        if on_bytes is None:
+            return await self.http.get(url, params=params)
+
+        request = self.http.build_request("GET", url, params=params)
+        response = await self.http.send(request, stream=True)
+        try:
+            if not response.is_success:
+                await response.aread()
+                return response
+            length = response.headers.get("Content-Length")
+            total = int(length) if length and length.isdigit() else None
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                on_bytes(response.num_bytes_downloaded if total else len(body), total)
+            if total is None:
+                on_bytes(len(body), len(body))
+        finally:
+            await response.aclose()
+
+        # The body is already decoded, so drop the headers describing its
+        # encoding on the wire
+        headers = [
+            (name, value)
+            for name, value in response.headers.multi_items()
+            if name.lower() not in ("content-encoding", "content-length")
+        ]
+        return httpx.Response(
+            response.status_code, headers=headers, content=bytes(body), request=request
+        )
+
+    async def _get_with_retries(
+        self,
+        endpoint: str,
+        url: str,
+        params: dict[str, Any],
+        span: Any,
+        on_bytes: Callable[[int, int | None], None] | None = None,
+    ) -> httpx.Response:
+        limiter = self.limiters[endpoint]
+        attempt = 0
+        while True:
+            retry_after = None
+            span.set(attempts=attempt + 1)
+            try:
+                async with limiter:
+                    started = time.perf_counter()
+                    with tracer.span(f"GET {endpoint}") as request_span:
+                        try:
+                            response = await self._send(url, params, on_bytes)
+                        except httpx.TransportError:
+                            elapsed = time.perf_counter() - started
+                            metrics.observe_upstream(endpoint, elapsed, "error")
+                            raise
+                        request_span.set(status=response.status_code)
+                    elapsed = time.perf_counter() - started
+                    metrics.observe_upstream(
+                        endpoint, elapsed, str(response.status_code)
+                    )
+                response.raise_for_status()
+                limiter.record_success()
+                return response
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in RETRY_STATUSES:
+                    raise
+                error: httpx.HTTPError = e
+                retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+            except httpx.TransportError as e:
+                error = e
+
+            delay = self.retry.delay(attempt, retry_after)
+            if attempt >= self.retry.max_retries or delay is None:
+                raise error
+            attempt += 1
+            logger.warning(
+                f"Wikimedia {endpoint} request failed ({error}), "
+                f"retry {attempt} in {delay:.2f}s"
+            )
+            if isinstance(error, httpx.HTTPStatusError):
+                limiter.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+
+    async def search_pages(self, query: str, limit: int = 5) -> list[dict[str, Any]]:
+        """Run a Wikimedia Core API page search.
+
+        Args:
+            query: Search query string
+            limit: Maximum number of pages to return
+
+        Returns:
+            The raw `pages` list from the search response
+
+        Raises:
+            httpx.HTTPError: If the request fails or returns an error status
+        """
+        response = await self._get(
+            "search",
+            f"{self.core_api_url}/search/page",
+            {"q": query, "limit": limit},
+        )
+        return response.json().get("pages", [])
+
+    async def action_query(
+        self, progress: ProgressCallback | None = None, **params: Any
+    ) -> dict[str, Any]:
+        """Run a MediaWiki `action=query` request and return the full response.
+
+        Args:
+            progress: Called as the response body streams in (see `_get`)
+            **params: Query parameters
+
+        Raises:
+            httpx.HTTPError: If the request fails or returns an error status
+        """
+        response = await self._get(
+            "action",
+            self.action_api_url,
+            {
+                "action": "query",
+                "format": "json",
+                "formatversion": 2,
+                "redirects": 1,
+                **params,
+            },
+            progress,
+        )
+        return response.json()
+
+    async def action_parse(self, **params: Any) -> dict[str, Any]:
+        """Run a MediaWiki `action=parse` request and return the full response.
+
+        Raises:
+            httpx.HTTPError: If the request fails or returns an error status
+        """
+        response = await self._get(
+            "action",
+            self.action_api_url,
+            {
+                "action": "parse",
+                "format": "json",
+                "formatversion": 2,
+                "redirects": 1,
+                **params,
+            },
+        )
+        return response.json()
+
+    async def query(
+        self, progress: ProgressCallback | None = None, **params: Any
+    ) -> dict[str, Any]:
+        """Run a MediaWiki `action=query` request and return its `query` block."""
+        return (await self.action_query(progress, **params)).get("query", {})
+
+    async def fetch_page(
+        self,
+        title: str,
+        progress: ProgressCallback | None = None,
+        expected_size: int | None = None,
+    ) -> WikiPage | None:
+        """Fetch the plain-text extract and metadata of one article.
+
+        Args:
+            title: Wikipedia article title
+            progress: Called with the bytes received so far and the expected
+                total as the extract downloads
+            expected_size: Total to report progress against when the response
+                has no Content-Length, e.g. the size of an earlier revision
+                (default: EXPECTED_PAGE_BYTES)
+
+        Returns:
+            The page, or None if no article with that title exists
+        """
+        if progress is not None:
+            progress = expect_total(progress, expected_size or EXPECTED_PAGE_BYTES)
+        data = await self.query(progress, titles=title, **PAGE_PARAMS)
+        return _parse_page(data.get("pages", []))
+
+    async def fetch_revision_id(self, title: str) -> int | None:
+        """Return the current revision id of an article without its text."""
+        data = await self.query(titles=title, prop="info")
+        pages = data.get("pages", [])
+        if not pages or pages[0].get("missing"):
+            return None
+        return pages[0].get("lastrevid")
+
+    async def fetch_page_info(
+        self, title: str, category_limit: int = 10
+    ) -> tuple[WikiPage, dict[str, Any]] | None:
+        """Fetch an article together with its categories and link count.
+
+        Extract, URL, categories and links come back from a single batched
+        `action=query` request. Links are only counted, from one `pllimit=max`
+        batch; when an article has more links than fit in that batch the count
+        is a lower bound and `links_count_exact` is False, so the lookup never
+        costs more than one round trip.
+
+        Args:
+            title: Wikipedia article title
+            category_limit: Maximum number of categories to return
+
+        Returns:
+            The page and a metadata dict, or None if the article doesn't exist
+        """
+        data = await self.action_query(
+            titles=title,
+            **{**PAGE_PARAMS, "prop": "extracts|info|categories|links"},
+            cllimit=category_limit,
+            pllimit="max",
+        )
+        pages = data.get("query", {}).get("pages", [])
+        page = _parse_page(pages)
+        if page is None:
+            return None
+
+        meta = {
+            "categories": [c["title"] for c in pages[0].get("categories", [])][
+                :category_limit
+            ],
+            "links_count": len(pages[0].get("links", [])),
+            "links_count_exact": "plcontinue" not in data.get("continue", {}),
+        }
+        return page, meta
+
+    async def fetch_sections(self, title: str) -> list[dict[str, Any]] | None:
+        """List an article's sections without fetching their text.
+
+        Returns:
+            Dicts with `title`, `level` and the parse API section `index`, or
+            None if the article doesn't exist
+        """
+        data = await self.action_parse(page=title, prop="sections")
+        if data.get("error", {}).get("code") == "missingtitle":
+            return None
+        return [
+            {
+                "title": _TAG.sub("", section["line"]),
+                "level": int(section["level"]),
+                "index": section["index"],
+            }
+            for section in data["parse"]["sections"]
+        ]
+
+    async def fetch_section_text(self, title: str, index: str) -> str:
+        """Fetch the plain text of one section (with its subsections).
+
+        The section is rendered to HTML by the parse API and stripped to text
+        the way TextExtracts does it, so it reads like the same section of a
+        `fetch_page` extract. The heading line itself is left out.
+        """
+        data = await self.action_parse(
+            page=title, prop="text", section=index, disableeditsection=1
+        )
+        text = html_to_text(data["parse"]["text"])
+        if text.startswith("="):
+            text = text.partition("\n")[2]
+        return text.strip()
+
+
+_client: "WikipediaClient | LocalCorpus | None" = None
+
+
+def limiters_from_env() -> dict[str, RateLimiter]:
+    """Build per-endpoint rate limiters from the WIKIPEDIA_*_RATE options.
+
+    WIKIPEDIA_SEARCH_RATE / WIKIPEDIA_SEARCH_BURST configure the Core API
+    search endpoint, WIKIPEDIA_ACTION_RATE / WIKIPEDIA_ACTION_BURST the
+    MediaWiki action API, and WIKIPEDIA_MAX_CONCURRENT caps requests in
+    flight per endpoint.
+    """
+    max_concurrent = int(os.getenv("WIKIPEDIA_MAX_CONCURRENT", "10"))
+    limiters = {}
+    for endpoint, (rate, burst) in DEFAULT_RATE_LIMITS.items():
+        prefix = f"WIKIPEDIA_{endpoint.upper()}"
+        limiters[endpoint] = RateLimiter(
+            rate=float(os.getenv(f"{prefix}_RATE", str(rate))),
+            burst=int(os.getenv(f"{prefix}_BURST", str(burst))),
+            max_concurrent=max_concurrent,
+        )
+    return limiters
+
+
+def create_client_from_env() -> "WikipediaClient | LocalCorpus":
+    """Create the backend selected by the WIKIPEDIA_BACKEND startup option.
+
+    `live` (the default) talks to the Wikimedia APIs, or to a compatible
+    server such as `fake_wikimedia` at the base URL in WIKIPEDIA_API_URL;
+    `local` serves articles from the corpus directory named by
+    WIKIPEDIA_CORPUS.
+    """
+    backend = os.getenv("WIKIPEDIA_BACKEND", "live").lower()
+    if backend == "live":
+        language = os.getenv("WIKIPEDIA_LANGUAGE", "en")
+        core_api_url = action_api_url = None
+        base_url = os.getenv("WIKIPEDIA_API_URL", "").rstrip("/")
+        if base_url:
+            core_api_url = f"{base_url}/core/v1/wikipedia/{language}"
+            action_api_url = f"{base_url}/w/api.php"
+        return WikipediaClient(
+            language=language,
+            core_api_url=core_api_url,
+            action_api_url=action_api_url,
+            limiters=limiters_from_env(),
+            retry=RetryPolicy(
+                max_retries=int(os.getenv("WIKIPEDIA_MAX_RETRIES", "3")),
+                max_delay=float(os.getenv("WIKIPEDIA_MAX_RETRY_DELAY", "20")),
+            ),
+        )
+    if backend == "local":
+        from solution.servers.local_corpus import LocalCorpus
+
+        corpus_dir = os.getenv("WIKIPEDIA_CORPUS")
+        if not corpus_dir:
+            raise ValueError(
+                "WIKIPEDIA_CORPUS must be set when WIKIPEDIA_BACKEND=local"
+            )
+        return LocalCorpus(corpus_dir)
+    raise ValueError(f"Unknown WIKIPEDIA_BACKEND '{backend}' (expected live or local)")
+
+
+def get_client() -> "WikipediaClient | LocalCorpus":
+    """Return the process-wide Wikipedia backend, creating it if needed."""
+    global _client
+    if _client is None:
+        _client = create_client_from_env()
+    return _client
+
+
+def set_client(client: "WikipediaClient | LocalCorpus | None") -> None:
+    """Replace the process-wide Wikipedia client (used by tests)."""
+    global _client
+    _client = client
+
+
+@asynccontextmanager
+async def wikipedia_lifespan(
+    server: Any,
+) -> AsyncIterator["WikipediaClient | LocalCorpus"]:
+    """Server lifespan that owns the shared client's connection pool."""
+    client = get_client()
+    await client.start()
+    try:
+        yield client
+    finally:
+        await client.aclose()
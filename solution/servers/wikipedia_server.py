@@ -5,39 +5,446 @@ This server provides Wikipedia search and content retrieval capabilities
 through MCP tools, demonstrating real-world API integration.
 """
 
-from mcp.server.fastmcp import FastMCP
-import wikipediaapi
-import requests
+import asyncio
+import base64
+import binascii
+import hashlib
+import html
+import json
 import logging
+import os
+import re
+from collections.abc import Awaitable, Callable
+from typing import Any
+from urllib.parse import unquote
+
+import httpx
+from mcp.server.fastmcp import FastMCP
+
+from solution.servers.article_cache import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_TTL_SECONDS,
+    ArticleCache,
+    article_key,
+)
+from solution.servers.article_digest import ArticleDigest
+from solution.servers.metrics import expose_metrics, metrics
+from solution.servers.persistent_cache import (
+    DEFAULT_DB_PATH,
+    DEFAULT_DB_TTL_SECONDS,
+    PersistentCache,
+)
+from solution.servers.prefetch import Prefetcher
+from solution.servers.search_index import SearchIndex
+from solution.servers.single_flight import SingleFlight
+from solution.servers.wikipedia_client import (
+    ProgressCallback,
+    WikiPage,
+    get_client,
+    wikipedia_lifespan,
+)
 
 # Set up logging
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
-# Create MCP server
-mcp = FastMCP("Wikipedia Server")
+# Create MCP server; the lifespan owns the pooled Wikimedia HTTP client
+mcp = FastMCP("Wikipedia Server", lifespan=wikipedia_lifespan)
 
-# Initialize Wikipedia API client
-wiki = wikipediaapi.Wikipedia(
-    language="en",
-    extract_format=wikipediaapi.ExtractFormat.WIKI,
-    user_agent="MCP-Wikipedia-Server/1.0 (educational-purpose)",
+# Shared by every tool (and the advanced server) so repeated lookups of the
+# same article are served from memory
+article_cache = ArticleCache(
+    max_bytes=int(os.getenv("WIKIPEDIA_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+    ttl=float(os.getenv("WIKIPEDIA_CACHE_TTL", DEFAULT_TTL_SECONDS)),
 )
 
 
-@mcp.tool()
-def search_wikipedia(query: str, limit: int = 5) -> list[str]:
-    """Search Wikipedia articles by keyword.
+# Survives restarts and is shared between server processes; set
+# WIKIPEDIA_CACHE_DB to an empty string to disable it. The local corpus
+# backend is already on disk, so it never needs the persistent cache.
+_live_backend = os.getenv("WIKIPEDIA_BACKEND", "live").lower() == "live"
+_db_path = (
+    os.getenv("WIKIPEDIA_CACHE_DB", str(DEFAULT_DB_PATH)) if _live_backend else ""
+)
+persistent_cache = (
+    PersistentCache(
+        _db_path,
+        ttl=float(os.getenv("WIKIPEDIA_CACHE_DB_TTL", DEFAULT_DB_TTL_SECONDS)),
+        max_bytes=int(
+            float(os.getenv("WIKIPEDIA_CACHE_DB_MAX_MB", "256")) * 1024 * 1024
+        ),
+    )
+    if _db_path
+    else None
+)
+
+# BM25 index over every page that enters the caches. With
+# WIKIPEDIA_SEARCH=local it answers search_wikipedia on its own; otherwise it
+# is the fallback when the Wikimedia search endpoint is unreachable. The local
+# corpus backend ships its own index, so pages are only indexed when live.
+# It keeps the WIKIPEDIA_SEARCH_INDEX_MAX_DOCS most recently indexed pages.
+search_index = SearchIndex(
+    max_docs=int(os.getenv("WIKIPEDIA_SEARCH_INDEX_MAX_DOCS", "10000"))
+)
+local_search = os.getenv("WIKIPEDIA_SEARCH", "remote").lower() == "local"
+_search_index_warmed = False
+
+
+async def _index_stored_pages(language: str) -> None:
+    """Add every page in the persistent cache to the search index.
+
+    Pages are read in batches on the cache's worker thread and tokenized on
+    another one, so neither blocks the event loop.
+    """
+    after = 0
+    while rows := await persistent_cache.run(
+        persistent_cache.page_batch, language, after
+    ):
+        await asyncio.to_thread(_index_pages, rows)
+        after = rows[-1][0]
+
+
+def _index_pages(rows: list[tuple[int, str, str]]) -> None:
+    for _, title, text in rows:
+        if title not in search_index:
+            search_index.add(title, text)
+
+
+async def search_local(query: str, limit: int) -> list[str]:
+    """Search cached pages with the local BM25 index.
+
+    The first call also indexes everything already in the persistent cache,
+    off the event loop; concurrent first calls share that work.
+    """
+    global _search_index_warmed
+    if not _search_index_warmed and persistent_cache:
+        language = get_client().language
+        await single_flight.do(
+            ("warm_search_index", language),
+            lambda: _index_stored_pages(language),
+        )
+    _search_index_warmed = True
+    return search_index.search(query, limit)
+
+
+# Search excerpts mark query matches with <span class="searchmatch">
+_TAG = re.compile(r"<[^>]+>")
+
+# Concurrent calls for the same article or search share one upstream request
+single_flight = SingleFlight()
+
+# Progress callbacks of the callers waiting on each in-flight article load. The
+# shared download reports to every one of them, and a caller stops getting
+# updates as soon as it leaves (returns or is cancelled).
+_progress_listeners: dict[tuple, list[ProgressCallback]] = {}
+
+# Batch tools fetch at most this many titles per call, and at most
+# WIKIPEDIA_BATCH_CONCURRENCY of them at once
+BATCH_MAX_TITLES = 20
+batch_concurrency = int(os.getenv("WIKIPEDIA_BATCH_CONCURRENCY", 5))
+
+# Chunk size of the wiki://{title}/chunk/{n} resource
+RESOURCE_CHUNK_LENGTH = 4000
+
+
+async def load_article(
+    title: str, with_meta: bool = False, progress: ProgressCallback | None = None
+) -> tuple[WikiPage, dict | None]:
+    """Load an article from memory, from disk, or from Wikipedia.
+
+    Stale entries on disk are revalidated by comparing revision ids, so the
+    stored text is reused whenever the article hasn't been edited. Concurrent
+    loads of the same title are coalesced into one.
 
     Args:
-        query: Search query string
-        limit: Maximum number of results to return (default: 5, max: 10)
+        title: Wikipedia article title
+        with_meta: Also load categories and link count for get_article_info
+        progress: Called as the page text downloads, if it is downloaded,
+            including by a load already in flight that this call joins (as
+            long as that load was started with a progress callback)
 
     Returns:
-        List of article titles matching the query
+        The page and, if requested, its metadata dict
 
     Raises:
-        ValueError: If query is empty or limit is invalid
+        ValueError: If the article doesn't exist
+        httpx.HTTPError: If the upstream request fails
+    """
+    if not with_meta:
+        # A prefetched page has no metadata, so only plain loads can use it
+        prefetcher.record_use(title)
+    kind = "meta" if with_meta else "page"
+    key = article_key(title, get_client().language, kind)
+    if progress is None:
+        return await single_flight.do(key, lambda: _start_load(key, title, with_meta))
+
+    listeners = _progress_listeners.setdefault(key, [])
+    listeners.append(progress)
+    try:
+        return await single_flight.do(key, lambda: _start_load(key, title, with_meta))
+    finally:
+        listeners.remove(progress)
+        if not listeners and _progress_listeners.get(key) is listeners:
+            del _progress_listeners[key]
+
+
+def _start_load(
+    key: tuple, title: str, with_meta: bool
+) -> Awaitable[tuple[WikiPage, dict | None]]:
+    # Streaming the body costs time, so only loads someone watches do it
+    if not _progress_listeners.get(key):
+        return _load_article(title, with_meta)
+
+    async def report(received: int, total: int | None) -> None:
+        for callback in list(_progress_listeners.get(key, ())):
+            try:
+                await callback(received, total)
+            except Exception as e:
+                # One caller's broken callback must not fail the shared load
+                logger.warning(f"Progress callback for {title} failed: {e}")
+
+    return _load_article(title, with_meta, report)
+
+
+async def _prefetch_article(title: str) -> None:
+    key = article_key(title, get_client().language, "page")
+    await single_flight.do(key, lambda: _start_load(key, title, False))
+
+
+def _prefetch_should_stop() -> bool:
+    # A nearly full cache would evict pages in use to make room for guesses
+    if article_cache.bytes_used >= article_cache.max_bytes * 0.9:
+        return True
+    limiter = getattr(get_client(), "limiters", {}).get("action")
+    return limiter is not None and limiter.saturated
+
+
+# Loads the top WIKIPEDIA_PREFETCH_TOP_K search results in the background so
+# the usual follow-up summary calls are cache hits (0 disables prefetching)
+prefetcher = Prefetcher(
+    load=_prefetch_article,
+    is_cached=lambda title: article_key(title, get_client().language) in article_cache,
+    should_stop=_prefetch_should_stop,
+    top_k=int(os.getenv("WIKIPEDIA_PREFETCH_TOP_K", "0")) if _live_backend else 0,
+)
+
+
+async def _load_article(
+    title: str, with_meta: bool, progress: ProgressCallback | None = None
+) -> tuple[WikiPage, dict | None]:
+    client = get_client()
+    title = title.strip()
+    page_key = article_key(title, client.language)
+    meta_key = article_key(title, client.language, "meta")
+
+    page = article_cache.get(page_key)
+    meta = article_cache.get(meta_key) if with_meta else None
+    if page is not None and (meta is not None or not with_meta):
+        return page, meta
+
+    stored = (
+        await persistent_cache.run(persistent_cache.get_page, client.language, title)
+        if persistent_cache
+        else None
+    )
+    expected_size = None
+    if stored is not None and (stored.meta is not None or not with_meta):
+        if not persistent_cache.is_fresh(stored.fetched_at):
+            if await client.fetch_revision_id(stored.page.title) == stored.page.revid:
+                await persistent_cache.run(
+                    persistent_cache.touch_page, client.language, title
+                )
+            else:
+                # The new revision is likely about as long as the old one
+                expected_size = len(stored.page.text.encode())
+                stored = None
+    else:
+        stored = None
+
+    if stored is not None:
+        page, meta = stored.page, stored.meta
+    else:
+        if with_meta:
+            # One batched query returns the extract, categories and link count
+            result = await client.fetch_page_info(title, category_limit=10)
+            if result is None:
+                raise ValueError(f"Article '{title}' not found on Wikipedia")
+            page, meta = result
+        else:
+            page = await client.fetch_page(
+                title, progress=progress, expected_size=expected_size
+            )
+            if page is None:
+                raise ValueError(f"Article '{title}' not found on Wikipedia")
+        if persistent_cache:
+            await persistent_cache.run(
+                persistent_cache.put_page, client.language, title, page, meta
+            )
+
+    article_cache.put(page_key, page, page.size)
+    if _live_backend and (stored is None or page.title not in search_index):
+        search_index.add(page.title, page.text, page.revid)
+    if meta is not None:
+        article_cache.put(meta_key, meta, len(json.dumps(meta)))
+    return page, meta
+
+
+async def fetch_article(
+    title: str, progress: ProgressCallback | None = None
+) -> WikiPage:
+    """Fetch an article without blocking the event loop.
+
+    Pages are served from `article_cache` or `persistent_cache` when possible.
+
+    Args:
+        title: Wikipedia article title
+        progress: Called with the bytes received as the page downloads
+
+    Returns:
+        The fetched page
+
+    Raises:
+        ValueError: If the article doesn't exist
+        httpx.HTTPError: If the upstream request fails
+    """
+    page, _ = await load_article(title, progress=progress)
+    return page
+
+
+async def load_digest(title: str) -> ArticleDigest:
+    """Fetch an article and its digest, parsing the text once per revision.
+
+    Args:
+        title: Wikipedia article title
+
+    Returns:
+        The digest of the article's current revision
+
+    Raises:
+        ValueError: If the article doesn't exist
+        httpx.HTTPError: If the upstream request fails
+    """
+    return digest_of(await fetch_article(title))
+
+
+def digest_of(page: WikiPage) -> ArticleDigest:
+    """Return the digest of `page`, reusing the cached one for its revision.
+
+    Pages without a revision id (e.g. from a JSONL corpus) are cached under a
+    hash of their text instead.
+    """
+    kind = "digest"
+    if page.revid is None:
+        kind += ":" + hashlib.blake2b(page.text.encode(), digest_size=16).hexdigest()
+    key = article_key(page.title, get_client().language, kind)
+    digest = article_cache.get(key)
+    if digest is None or digest.revid != page.revid:
+        digest = ArticleDigest(page.text, revid=page.revid)
+        article_cache.put(key, digest, digest.size)
+    return digest
+
+
+async def cached_article(title: str) -> WikiPage | None:
+    """Return the article if memory or disk already holds a fresh copy."""
+    language = get_client().language
+    page = article_cache.get(article_key(title, language))
+    if page is None and persistent_cache:
+        stored = await persistent_cache.run(persistent_cache.get_page, language, title)
+        if stored is not None and persistent_cache.is_fresh(stored.fetched_at):
+            page = stored.page
+    return page
+
+
+# Per-tool and upstream metrics, plus the cache counters, at metrics://server
+expose_metrics(mcp)
+metrics.register_source("article_cache", lambda: article_cache.stats())
+metrics.register_source("single_flight", lambda: single_flight.stats())
+metrics.register_source("prefetch", lambda: prefetcher.stats())
+metrics.register_source("search_index", lambda: search_index.stats())
+
+
+async def _disk_stats() -> dict[str, Any]:
+    """Stats of the persistent cache, read on its worker thread."""
+    if not persistent_cache:
+        return {}
+    return await persistent_cache.run(persistent_cache.stats)
+
+
+metrics.register_source("disk", _disk_stats)
+metrics.register_source(
+    "rate_limits",
+    lambda: {
+        endpoint: limiter.stats()
+        for endpoint, limiter in getattr(get_client(), "limiters", {}).items()
+    },
+)
+
+
+@mcp.resource(
+    "wikipedia://cache/stats",
+    description="Hit, miss and eviction counters of the shared article cache, "
+    "the number of coalesced lookups and prefetch hit and waste rates",
+    mime_type="application/json",
+)
+async def cache_stats() -> str:
+    """Report the article cache counters."""
+    stats = {
+        "memory": article_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "prefetch": prefetcher.stats(),
+    }
+    if persistent_cache:
+        stats["disk"] = await _disk_stats()
+    return json.dumps(stats)
+
+
+def clean_excerpt(excerpt: str | None) -> str | None:
+    """Strip search-match markup and entities from a search excerpt."""
+    if not excerpt:
+        return None
+    return " ".join(html.unescape(_TAG.sub("", excerpt)).split())
+
+
+def search_record(page: dict | str) -> dict:
+    """Build a search result record from a search API page.
+
+    Plain titles (from the local index or searches cached by older versions)
+    become records without description or excerpt.
+    """
+    if isinstance(page, str):
+        page = {"title": page}
+    return {
+        "title": page["title"],
+        "key": page.get("key") or page["title"].replace(" ", "_"),
+        "description": page.get("description"),
+        "excerpt": clean_excerpt(page.get("excerpt")),
+    }
+
+
+async def _search_remote(query: str, limit: int) -> list[dict]:
+    client = get_client()
+    if persistent_cache:
+        cached = await persistent_cache.run(
+            persistent_cache.get_search, client.language, query, limit
+        )
+        if cached is not None:
+            return [search_record(page) for page in cached]
+
+    # Use Wikimedia Core API for search over the shared, pooled client
+    pages = await client.search_pages(query.strip(), limit)
+    records = [search_record(page) for page in pages]
+    if persistent_cache:
+        await persistent_cache.run(
+            persistent_cache.put_search, client.language, query, limit, records
+        )
+    return records
+
+
+async def search_records(query: str, limit: int) -> list[dict]:
+    """Validate and run a search, returning one record per result.
+
+    Raises:
+        ValueError: If query is empty, limit is invalid or the search fails
     """
     if not query or not query.strip():
         raise ValueError("Query cannot be empty")
@@ -45,25 +452,24 @@ def search_wikipedia(query: str, limit: int = 5) -> list[str]:
     if limit < 1 or limit > 10:
         raise ValueError("Limit must be between 1 and 10")
 
-    try:
-        # Use Wikimedia Core API for search
-        search_url = "https://api.wikimedia.org/core/v1/wikipedia/en/search/page"
-        params = {"q": query.strip(), "limit": limit}
-        headers = {
-            "User-Agent": "MCP-Wikipedia-Server/1.0 (educational-purpose)",
-            "Accept": "application/json",
-        }
-
-        response = requests.get(search_url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        data = response.json()
-        titles = [page["title"] for page in data.get("pages", [])]
+    if local_search:
+        records = [search_record(title) for title in await search_local(query, limit)]
+        prefetcher.schedule([record["title"] for record in records])
+        return records
 
-        logger.info(f"Found {len(titles)} results for query: {query}")
-        return titles
-
-    except requests.exceptions.RequestException as e:
+    try:
+        key = ("search", get_client().language, " ".join(query.lower().split()), limit)
+        records = await single_flight.do(key, lambda: _search_remote(query, limit))
+
+        logger.info(f"Found {len(records)} results for query: {query}")
+        prefetcher.schedule([record["title"] for record in records])
+        return records
+
+    except httpx.HTTPError as e:
+        fallback = await search_local(query, limit)
+        if fallback:
+            logger.warning(f"Search unavailable ({e}), answered from local index")
+            return [search_record(title) for title in fallback]
         logger.error(f"Error searching Wikipedia: {e}")
         raise ValueError(f"Failed to search Wikipedia: {str(e)}")
     except Exception as e:
@@ -72,7 +478,64 @@ def search_wikipedia(query: str, limit: int = 5) -> list[str]:
 
 
 @mcp.tool()
-def get_article_summary(title: str, sentences: int = 3) -> str:
+@metrics.instrument
+async def search_wikipedia(query: str, limit: int = 5) -> list[str]:
+    """Search Wikipedia articles by keyword.
+
+    Args:
+        query: Search query string
+        limit: Maximum number of results to return (default: 5, max: 10)
+
+    Returns:
+        List of article titles matching the query
+
+    Raises:
+        ValueError: If query is empty or limit is invalid
+    """
+    return [record["title"] for record in await search_records(query, limit)]
+
+
+@mcp.tool()
+@metrics.instrument
+async def search_with_summaries(
+    query: str, limit: int = 5, include_summaries: bool = True, sentences: int = 2
+) -> list[dict]:
+    """Search Wikipedia and describe each result in the same response.
+
+    Saves a get_article_summary call per result: every result carries the
+    short description and the matching excerpt from the search itself, plus
+    the lead sentences of articles the server has already cached.
+
+    Args:
+        query: Search query string
+        limit: Maximum number of results to return (default: 5, max: 10)
+        include_summaries: Add `summary` for articles already in the cache
+        sentences: Number of summary sentences (default: 2, max: 10)
+
+    Returns:
+        List of dicts with title, key (canonical title for URLs), description,
+        excerpt and, if requested, summary (None when the article isn't cached)
+
+    Raises:
+        ValueError: If query is empty or limit or sentences is invalid
+    """
+    if sentences < 1 or sentences > 10:
+        raise ValueError("Sentences must be between 1 and 10")
+
+    # Copies, since coalesced callers share the search result
+    results = [dict(record) for record in await search_records(query, limit)]
+    if include_summaries:
+        for result in results:
+            result["summary"] = None
+            if await cached_article(result["title"]) is not None:
+                digest = await load_digest(result["title"])
+                result["summary"] = digest.lead_sentences(sentences)
+    return results
+
+
+@mcp.tool()
+@metrics.instrument
+async def get_article_summary(title: str, sentences: int = 3) -> str:
     """Get a brief summary of a Wikipedia article.
 
     Args:
@@ -92,24 +555,13 @@ def get_article_summary(title: str, sentences: int = 3) -> str:
         raise ValueError("Sentences must be between 1 and 10")
 
     try:
-        page = wiki.page(title.strip())
-
-        if not page.exists():
-            raise ValueError(f"Article '{title}' not found on Wikipedia")
-
-        # Get summary with requested sentence count
-        summary = page.summary
+        digest = await load_digest(title)
 
-        if not summary:
+        if not digest.lead:
             raise ValueError(f"No summary available for article '{title}'")
 
-        # Split into sentences and limit
-        sentences_list = [s.strip() for s in summary.split(".") if s.strip()]
-        limited_sentences = sentences_list[:sentences]
-
-        result = ". ".join(limited_sentences)
-        if result and not result.endswith("."):
-            result += "."
+        # Sentence offsets are precomputed, so this is a binary search
+        result = digest.lead_sentences(sentences)
 
         logger.info(f"Retrieved summary for: {title}")
         return result
@@ -122,7 +574,8 @@ def get_article_summary(title: str, sentences: int = 3) -> str:
 
 
 @mcp.tool()
-def get_article_content(title: str, max_length: int = 2000) -> str:
+@metrics.instrument
+async def get_article_content(title: str, max_length: int = 2000) -> str:
     """Get the full content of a Wikipedia article (truncated if necessary).
 
     Args:
@@ -142,12 +595,9 @@ def get_article_content(title: str, max_length: int = 2000) -> str:
         raise ValueError("max_length must be between 100 and 10000")
 
     try:
-        page = wiki.page(title.strip())
-
-        if not page.exists():
-            raise ValueError(f"Article '{title}' not found on Wikipedia")
+        digest = await load_digest(title)
 
-        content = page.text
+        content = digest.text
 
         if not content:
             raise ValueError(f"No content available for article '{title}'")
@@ -155,17 +605,11 @@ def get_article_content(title: str, max_length: int = 2000) -> str:
         # Truncate if necessary
         if len(content) > max_length:
             # Find a good breaking point (end of sentence or paragraph)
-            truncated = content[:max_length]
-
-            # Try to break at sentence end
-            last_period = truncated.rfind(".")
-            last_newline = truncated.rfind("\n")
-
-            break_point = max(last_period, last_newline)
+            break_point = digest.break_before(max_length)
             if break_point > max_length * 0.8:  # Only use if reasonably close to limit
-                content = content[: break_point + 1] + "\n\n[Content truncated...]"
+                content = content[:break_point] + "\n\n[Content truncated...]"
             else:
-                content = truncated + "...\n\n[Content truncated...]"
+                content = content[:max_length] + "...\n\n[Content truncated...]"
 
         logger.info(f"Retrieved content for: {title} ({len(content)} chars)")
         return content
@@ -178,7 +622,8 @@ def get_article_content(title: str, max_length: int = 2000) -> str:
 
 
 @mcp.tool()
-def get_article_info(title: str) -> dict:
+@metrics.instrument
+async def get_article_info(title: str) -> dict:
     """Get basic information about a Wikipedia article.
 
     Args:
@@ -194,18 +639,16 @@ def get_article_info(title: str) -> dict:
         raise ValueError("Article title cannot be empty")
 
     try:
-        page = wiki.page(title.strip())
-
-        if not page.exists():
-            raise ValueError(f"Article '{title}' not found on Wikipedia")
+        page, meta = await load_article(title, with_meta=True)
 
         info = {
             "title": page.title,
-            "url": page.fullurl,
+            "url": page.url,
             "summary_length": len(page.summary),
             "content_length": len(page.text),
-            "categories": list(page.categories.keys())[:10],  # Limit categories
-            "links_count": len(page.links),
+            "categories": meta["categories"],
+            "links_count": meta["links_count"],
+            "links_count_exact": meta["links_count_exact"],
         }
 
         logger.info(f"Retrieved info for: {title}")
@@ -218,42 +661,362 @@ def get_article_info(title: str) -> dict:
         raise ValueError(f"Failed to get article info: {str(e)}")
 
 
-def test_server():
+async def run_batch(
+    titles: list[str], fetch: Callable[[str], Awaitable[str]], field: str
+) -> list[dict]:
+    """Run a single-article tool over several titles concurrently.
+
+    Args:
+        titles: Article titles, answered in the same order
+        fetch: Tool coroutine taking one title
+        field: Result key for successful lookups
+
+    Returns:
+        One dict per title with either `field` or `error` set
+
+    Raises:
+        ValueError: If the title list is empty or too long
+    """
+    if not titles:
+        raise ValueError("Titles cannot be empty")
+
+    if len(titles) > BATCH_MAX_TITLES:
+        raise ValueError(f"At most {BATCH_MAX_TITLES} titles per batch")
+
+    semaphore = asyncio.Semaphore(batch_concurrency)
+
+    async def run_one(title: str) -> dict:
+        async with semaphore:
+            try:
+                return {"title": title, field: await fetch(title)}
+            except ValueError as e:
+                return {"title": title, "error": str(e)}
+
+    return await asyncio.gather(*(run_one(title) for title in titles))
+
+
+@mcp.tool()
+@metrics.instrument
+async def get_article_summaries(titles: list[str], sentences: int = 3) -> list[dict]:
+    """Get summaries of several Wikipedia articles in one call.
+
+    Articles are fetched concurrently. A missing article does not fail the
+    batch; its entry carries an `error` message instead of a `summary`.
+
+    Args:
+        titles: Wikipedia article titles (max: 20)
+        sentences: Number of sentences per summary (default: 3, max: 10)
+
+    Returns:
+        List of {"title", "summary"} or {"title", "error"} dicts, in input order
+
+    Raises:
+        ValueError: If titles is empty or too long, or sentences is invalid
+    """
+    if sentences < 1 or sentences > 10:
+        raise ValueError("Sentences must be between 1 and 10")
+
+    return await run_batch(
+        titles, lambda title: get_article_summary(title, sentences), "summary"
+    )
+
+
+@mcp.tool()
+@metrics.instrument
+async def get_article_contents(titles: list[str], max_length: int = 2000) -> list[dict]:
+    """Get the content of several Wikipedia articles in one call.
+
+    Articles are fetched concurrently and truncated like get_article_content.
+    A missing article does not fail the batch; its entry carries an `error`
+    message instead of `content`.
+
+    Args:
+        titles: Wikipedia article titles (max: 20)
+        max_length: Maximum content length per article (default: 2000, max: 10000)
+
+    Returns:
+        List of {"title", "content"} or {"title", "error"} dicts, in input order
+
+    Raises:
+        ValueError: If titles is empty or too long, or max_length is invalid
+    """
+    if max_length < 100 or max_length > 10000:
+        raise ValueError("max_length must be between 100 and 10000")
+
+    return await run_batch(
+        titles, lambda title: get_article_content(title, max_length), "content"
+    )
+
+
+def normalize_section_name(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+@mcp.tool()
+@metrics.instrument
+async def list_sections(title: str) -> dict:
+    """List the sections of a Wikipedia article with their sizes.
+
+    Use this before get_sections to see which parts of a long article are
+    worth reading.
+
+    Args:
+        title: Wikipedia article title
+
+    Returns:
+        Dictionary with the lead section size and a tree of sections, each
+        with its title, level, size in characters (including subsections),
+        sentence count and subsections
+
+    Raises:
+        ValueError: If title is empty or article doesn't exist
+    """
+    if not title or not title.strip():
+        raise ValueError("Article title cannot be empty")
+
+    try:
+        digest = await load_digest(title)
+
+        tree: list[dict] = []
+        parents: list[tuple[int, dict]] = []
+        for section in digest.sections:
+            node = {
+                "title": section.title,
+                "level": section.level,
+                "size": section.end - section.body_start,
+                "sentences": digest.sentence_count(section.body_start, section.end),
+                "subsections": [],
+            }
+            while parents and parents[-1][0] >= section.level:
+                parents.pop()
+            (parents[-1][1]["subsections"] if parents else tree).append(node)
+            parents.append((section.level, node))
+
+        logger.info(f"Listed {len(digest.sections)} sections for: {title}")
+        return {"title": title.strip(), "lead_size": len(digest.lead), "sections": tree}
+
+    except Exception as e:
+        if "not found" in str(e).lower():
+            raise
+        logger.error(f"Error listing sections for {title}: {e}")
+        raise ValueError(f"Failed to list sections: {str(e)}")
+
+
+@mcp.tool()
+@metrics.instrument
+async def get_sections(title: str, names: list[str]) -> dict:
+    """Get only the named sections of a Wikipedia article.
+
+    Much smaller than get_article_content for long articles. Names are matched
+    case-insensitively against the titles from list_sections; a section's
+    text includes its subsections. Uncached articles are read section by
+    section, so the rest of the article is never downloaded.
+
+    Args:
+        title: Wikipedia article title
+        names: Section titles to return, e.g. ["History", "Applications"]
+
+    Returns:
+        Dictionary with the matching sections (title, level, text) in article
+        order and the requested names that matched no section
+
+    Raises:
+        ValueError: If title or names is empty or article doesn't exist
+    """
+    if not title or not title.strip():
+        raise ValueError("Article title cannot be empty")
+
+    wanted = {normalize_section_name(name) for name in names if name.strip()}
+    if not wanted:
+        raise ValueError("Section names cannot be empty")
+
+    try:
+        client = get_client()
+        if not _live_backend or await cached_article(title) is not None:
+            digest = await load_digest(title)
+            sections = [
+                {
+                    "title": s.title,
+                    "level": s.level,
+                    "text": digest.text[s.body_start : s.end].strip(),
+                }
+                for s in digest.sections
+                if normalize_section_name(s.title) in wanted
+            ]
+        else:
+            listed = await client.fetch_sections(title)
+            if listed is None:
+                raise ValueError(f"Article '{title}' not found on Wikipedia")
+            matches = [
+                s for s in listed if normalize_section_name(s["title"]) in wanted
+            ]
+            texts = await asyncio.gather(
+                *(client.fetch_section_text(title, s["index"]) for s in matches)
+            )
+            sections = [
+                {"title": s["title"], "level": s["level"], "text": text}
+                for s, text in zip(matches, texts, strict=True)
+            ]
+
+        found = {normalize_section_name(s["title"]) for s in sections}
+        missing = [
+            name
+            for name in names
+            if name.strip() and normalize_section_name(name) not in found
+        ]
+
+        logger.info(f"Retrieved {len(sections)} sections for: {title}")
+        return {"title": title.strip(), "sections": sections, "missing": missing}
+
+    except Exception as e:
+        if "not found" in str(e).lower():
+            raise
+        logger.error(f"Error retrieving sections for {title}: {e}")
+        raise ValueError(f"Failed to get sections: {str(e)}")
+
+
+def encode_cursor(revid: int | None, index: int, max_length: int) -> str:
+    """Encode a reading position as an opaque cursor string."""
+    state = json.dumps({"r": revid, "n": index, "l": max_length})
+    return base64.urlsafe_b64encode(state.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int | None, int, int]:
+    """Decode a cursor from `encode_cursor` into (revid, index, max_length).
+
+    Raises:
+        ValueError: If the cursor is malformed or its chunk length is out of
+            range
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded))
+        revid, index, max_length = state["r"], int(state["n"]), int(state["l"])
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor") from None
+    # Cursors come from clients, so the length gets the same bounds as the
+    # max_length argument
+    if max_length < 100 or max_length > 10000:
+        raise ValueError("Invalid cursor")
+    return revid, index, max_length
+
+
+@mcp.tool()
+@metrics.instrument
+async def get_article_chunk(
+    title: str, cursor: str | None = None, max_length: int = 4000
+) -> dict:
+    """Read a long Wikipedia article one chunk at a time.
+
+    Call without a cursor for the first chunk, then pass the returned
+    `next_cursor` to continue. Chunks break at sentence or paragraph ends and
+    are served from the cached article, so paging never re-downloads it.
+
+    Args:
+        title: Wikipedia article title
+        cursor: Cursor returned by the previous call (omit for the first chunk)
+        max_length: Maximum chunk length in characters (default: 4000,
+            max: 10000); ignored when a cursor is given
+
+    Returns:
+        Dictionary with the chunk text, its index, the total number of chunks
+        and `next_cursor` (None after the last chunk)
+
+    Raises:
+        ValueError: If the title, cursor or max_length is invalid, the article
+            doesn't exist, or it changed since the cursor was issued
+    """
+    if not title or not title.strip():
+        raise ValueError("Article title cannot be empty")
+
+    if max_length < 100 or max_length > 10000:
+        raise ValueError("max_length must be between 100 and 10000")
+
+    try:
+        digest = await load_digest(title)
+
+        index = 0
+        if cursor:
+            revid, index, max_length = decode_cursor(cursor)
+            if revid != digest.revid:
+                raise ValueError(
+                    f"Article '{title}' has changed since the cursor was issued; "
+                    "start again without a cursor"
+                )
+
+        ends = digest.chunk_ends(max_length)
+        if not 0 <= index < len(ends):
+            raise ValueError("Invalid cursor")
+
+        next_index = index + 1
+        logger.info(f"Retrieved chunk {index} of {len(ends)} for: {title}")
+        return {
+            "title": title,
+            "chunk": digest.chunk(index, max_length),
+            "index": index,
+            "total_chunks": len(ends),
+            "next_cursor": encode_cursor(digest.revid, next_index, max_length)
+            if next_index < len(ends)
+            else None,
+        }
+
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving chunk for {title}: {e}")
+        raise ValueError(f"Failed to get article chunk: {str(e)}")
+
+
+@mcp.resource(
+    "wiki://{title}/chunk/{n}",
+    description="Chunk n (0-based) of an article split into chunks of at most "
+    f"{RESOURCE_CHUNK_LENGTH} characters at sentence or paragraph ends",
+    mime_type="text/plain",
+)
+async def article_chunk(title: str, n: int) -> str:
+    """Return one chunk of an article; the title may be percent-encoded."""
+    digest = await load_digest(unquote(title))
+    if not 0 <= n < len(digest.chunk_ends(RESOURCE_CHUNK_LENGTH)):
+        raise ValueError(f"Chunk {n} is out of range")
+    return digest.chunk(n, RESOURCE_CHUNK_LENGTH)
+
+
+async def test_server():
     """Test all server functions."""
     print("Testing Wikipedia MCP Server...")
 
     try:
         # Test search
         print("\n1. Testing search...")
-        search_results = search_wikipedia("artificial intelligence", 3)
+        search_results = await search_wikipedia("artificial intelligence", 3)
         print(f"Search results: {search_results}")
 
         # Test summary
         if search_results:
             print(f"\n2. Testing summary for '{search_results[0]}'...")
-            summary = get_article_summary(search_results[0], 2)
+            summary = await get_article_summary(search_results[0], 2)
             print(f"Summary: {summary[:200]}...")
 
             # Test content
             print(f"\n3. Testing content for '{search_results[0]}'...")
-            content = get_article_content(search_results[0], 500)
+            content = await get_article_content(search_results[0], 500)
             print(f"Content length: {len(content)} chars")
             print(f"Content preview: {content[:100]}...")
 
             # Test info
             print("\n4. Testing article info...")
-            info = get_article_info(search_results[0])
+            info = await get_article_info(search_results[0])
             print(f"Article info: {info}")
 
         # Test error cases
         print("\n5. Testing error handling...")
         try:
-            search_wikipedia("")
+            await search_wikipedia("")
         except ValueError as e:
             print(f"✓ Empty search error: {e}")
 
         try:
-            get_article_summary("NonExistentArticle123456")
+            await get_article_summary("NonExistentArticle123456")
         except ValueError as e:
             print(f"✓ Missing article error: {e}")
 
@@ -20,6 +20,12 @@ wiki = wikipediaapi.Wikipedia(
 
 mcp = FastMCP("Wikipedia Advanced Workshop Server")
 
+# Reuse one keep-alive session so searches skip the TCP/TLS handshake
+session = requests.Session()
+session.headers["User-Agent"] = (
+    "MCP-Wikipedia-Advanced-Workshop/1.0 (educational-purpose)"
+)
+
 
 def search_wikipedia_articles(query: str, limit: int = 8) -> list[str]:
     """Search Wikipedia articles by keyword.
@@ -35,7 +41,7 @@ def search_wikipedia_articles(query: str, limit: int = 8) -> list[str]:
         search_url = "https://api.wikimedia.org/core/v1/wikipedia/en/search/page"
         params = {"q": query.strip(), "limit": limit}
 
-        response = requests.get(search_url, params=params, timeout=10)
+        response = session.get(search_url, params=params, timeout=10)
         response.raise_for_status()
 
         data = response.json()